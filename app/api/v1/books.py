@@ -2,11 +2,17 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from domain.models.book import Book
+from domain.models.book import Book, BookGroup, BookSearchFilters, BookSearchQuery, BookSuggestion
 from domain.services.book_service import BookService
 
 from .dependencies import get_book_service
-from .schemas.book_search import BooksSearchNoResultsResponse, BooksSearchTooManyResultsResponse
+from .schemas.book_search import (
+    BooksSearchBatchRequest,
+    BooksSearchBatchResponse,
+    BooksSearchNoResultsResponse,
+    BooksSearchPageResponse,
+    BooksSearchTooManyResultsResponse,
+)
 
 
 router = APIRouter(prefix="/books", tags=["books"])
@@ -14,7 +20,11 @@ router = APIRouter(prefix="/books", tags=["books"])
 
 @router.get(
     "/search",
-    response_model=List[Book] | BooksSearchNoResultsResponse | BooksSearchTooManyResultsResponse,
+    response_model=List[Book]
+    | List[BookGroup]
+    | BooksSearchPageResponse
+    | BooksSearchNoResultsResponse
+    | BooksSearchTooManyResultsResponse,
 )
 async def search_books(
     q: str | None = Query(
@@ -23,11 +33,52 @@ async def search_books(
     ),
     author: str | None = Query(None, description="Поиск по автору"),
     title: str | None = Query(None, description="Поиск по названию"),
+    paginate: bool = Query(
+        False,
+        description=(
+            "Постраничный режим: вместо ответа «слишком много» вернуть первую страницу (до 50 книг) "
+            "и next_cursor для следующей"
+        ),
+    ),
+    cursor: str | None = Query(
+        None,
+        description="next_cursor предыдущей страницы; включает постраничный режим, q/author/title при нём не нужны",
+    ),
+    grouped: bool = Query(
+        False,
+        description=(
+            "Группировать по произведениям: одна запись на произведение (автор + название) с его изданиями; "
+            "порог «слишком много» — 50 произведений. Только SEARCH_BACKEND=elasticsearch, без paginate/cursor"
+        ),
+    ),
+    genre: str | None = Query(None, description="Фильтр: точное значение жанра (например, из facets)"),
+    lang: str | None = Query(None, description="Фильтр: точное значение языка"),
+    year: str | None = Query(None, description="Фильтр: точное значение года издания"),
+    facets: bool = Query(
+        False,
+        description="Вернуть в ответе «слишком много» счётчики genre/lang/year, чтобы сузить запрос фильтрами",
+    ),
     service: BookService = Depends(get_book_service),
-) -> List[Book] | BooksSearchNoResultsResponse | BooksSearchTooManyResultsResponse:
+) -> (
+    List[Book]
+    | List[BookGroup]
+    | BooksSearchPageResponse
+    | BooksSearchNoResultsResponse
+    | BooksSearchTooManyResultsResponse
+):
     q_norm = q.strip() if q else None
     author_norm = author.strip() if author else None
     title_norm = title.strip() if title else None
+    cursor_norm = cursor.strip() if cursor else None
+    filters = _search_filters(genre=genre, lang=lang, year=year)
+
+    if grouped and (cursor_norm or paginate):
+        raise HTTPException(status_code=422, detail="grouped нельзя сочетать с paginate/cursor.")
+
+    if cursor_norm or paginate:
+        return await _search_books_page(
+            service, q=q_norm, author=author_norm, title=title_norm, cursor=cursor_norm, filters=filters
+        )
 
     if not q_norm and not author_norm and not title_norm:
         raise HTTPException(
@@ -36,12 +87,98 @@ async def search_books(
         )
 
     try:
-        return await service.search(q=q_norm, author=author_norm, title=title_norm)
+        if grouped:
+            return await service.search_grouped(q=q_norm, author=author_norm, title=title_norm, filters=filters)
+        return await service.search(q=q_norm, author=author_norm, title=title_norm, filters=filters, facets=facets)
     except Exception as e:  # noqa: BLE001
-        from domain.exceptions import BooksNotFoundError, TooManyResultsError
+        from domain.exceptions import BooksNotFoundError, TooManyResultsError, UnsupportedSearchOptionError
 
         if isinstance(e, TooManyResultsError):
-            return BooksSearchTooManyResultsResponse(detail=str(e))
+            return BooksSearchTooManyResultsResponse(detail=str(e), facets=e.facets)
         if isinstance(e, BooksNotFoundError):
             return BooksSearchNoResultsResponse(detail=str(e))
+        if isinstance(e, UnsupportedSearchOptionError):
+            raise HTTPException(status_code=422, detail=str(e))
         raise
+
+
+async def _search_books_page(
+    service: BookService,
+    *,
+    q: str | None,
+    author: str | None,
+    title: str | None,
+    cursor: str | None,
+    filters: BookSearchFilters | None,
+) -> BooksSearchPageResponse | BooksSearchNoResultsResponse:
+    from domain.exceptions import BooksNotFoundError, SearchCursorError, UnsupportedSearchOptionError
+
+    if not cursor and not q and not author and not title:
+        raise HTTPException(
+            status_code=422,
+            detail="Нужно указать хотя бы один параметр поиска: q, author или title (или cursor).",
+        )
+
+    try:
+        page = await service.search_pages(q=q, author=author, title=title, cursor=cursor, filters=filters)
+    except BooksNotFoundError as e:
+        return BooksSearchNoResultsResponse(detail=str(e))
+    except SearchCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnsupportedSearchOptionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return BooksSearchPageResponse(books=page.books, next_cursor=page.next_cursor)
+
+
+@router.get("/suggest", response_model=List[BookSuggestion])
+async def suggest_books(
+    prefix: str = Query(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Начало автора или названия (то, что пользователь уже набрал)",
+    ),
+    service: BookService = Depends(get_book_service),
+) -> List[BookSuggestion]:
+    """Автодополнение для поля поиска: до 10 подсказок {id, author, title}, без полных данных книг."""
+    prefix_norm = prefix.strip()
+    if not prefix_norm:
+        raise HTTPException(status_code=422, detail="prefix не должен быть пустым.")
+    return await service.suggest(prefix_norm)
+
+
+@router.post("/search/batch", response_model=BooksSearchBatchResponse)
+async def search_books_batch(
+    request: BooksSearchBatchRequest,
+    service: BookService = Depends(get_book_service),
+) -> BooksSearchBatchResponse:
+    """Несколько поисков за один HTTP-запрос (например, список книг для чтения) — один пакетный поиск."""
+    queries: list[BookSearchQuery] = []
+    for i, query in enumerate(request.queries):
+        normalized = BookSearchQuery(
+            q=_normalize_query_part(query.q),
+            author=_normalize_query_part(query.author),
+            title=_normalize_query_part(query.title),
+        )
+        if not normalized.q and not normalized.author and not normalized.title:
+            raise HTTPException(
+                status_code=422,
+                detail=f"queries[{i}]: нужно указать хотя бы один параметр поиска: q, author или title.",
+            )
+        queries.append(normalized)
+
+    return BooksSearchBatchResponse(results=await service.search_batch(queries))
+
+
+def _normalize_query_part(value: str | None) -> str | None:
+    normalized = value.strip() if value else None
+    return normalized or None
+
+
+def _search_filters(*, genre: str | None, lang: str | None, year: str | None) -> BookSearchFilters | None:
+    filters = BookSearchFilters(
+        genre=_normalize_query_part(genre),
+        lang=_normalize_query_part(lang),
+        year=_normalize_query_part(year),
+    )
+    return filters if filters.model_dump(exclude_none=True) else None
@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
 
+from domain.models.book import Book, BookSearchBatchItem, BookSearchFacets, BookSearchQuery
+from domain.services.book_service import SEARCH_BATCH_MAX_QUERIES
+
 
 class BooksSearchNoResultsResponse(BaseModel):
     detail: str = Field(..., description="Пояснение, почему результаты поиска отсутствуют")
@@ -7,3 +10,28 @@ class BooksSearchNoResultsResponse(BaseModel):
 
 class BooksSearchTooManyResultsResponse(BaseModel):
     detail: str = Field(..., description="Пояснение, что результатов слишком много и запрос нужно уточнить")
+    facets: BookSearchFacets | None = Field(
+        None,
+        description="При facets=true: счётчики genre/lang/year по всем совпадениям — значения для фильтров",
+    )
+
+
+class BooksSearchPageResponse(BaseModel):
+    books: list[Book] = Field(default_factory=list, description="Книги текущей страницы")
+    next_cursor: str | None = Field(
+        None,
+        description="Курсор следующей страницы (передай в cursor); null — это последняя страница",
+    )
+
+
+class BooksSearchBatchRequest(BaseModel):
+    queries: list[BookSearchQuery] = Field(
+        ...,
+        min_length=1,
+        max_length=SEARCH_BATCH_MAX_QUERIES,
+        description="Поисковые запросы; в каждом нужен хотя бы один из q, author, title",
+    )
+
+
+class BooksSearchBatchResponse(BaseModel):
+    results: list[BookSearchBatchItem] = Field(..., description="Исходы поиска в порядке запросов")
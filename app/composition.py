@@ -2,25 +2,109 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.config import settings
 from domain.interfaces.email_sender import IEmailSender
+from domain.interfaces.search_cache import ISearchCache, SearchOutcome, SuggestOutcome
 from domain.interfaces.storage import IFileStorage
 from domain.models.book import Book
 from domain.services.book_service import BookService
+from domain.util import SingleFlight
+from infrastructure.archives.zip_handles import ZipHandleCache
+from infrastructure.archives.zip_index import ZipArchiveIndex
+from infrastructure.cache.search_cache import InMemorySearchCache
+from infrastructure.db.db import sessionmanager
 from infrastructure.db.models.book_orm import BookORM
 from infrastructure.email.n8n_email_sender import N8nEmailSender
 from infrastructure.repositories.book_repo import BookRepo
+from infrastructure.search.books_index import books_index_generation
+from infrastructure.storage.object_manifest import S3ObjectManifest
 from infrastructure.storage.s3_storage import S3Storage
 
 
-def build_file_storage() -> IFileStorage:
+_search_cache: ISearchCache[SearchOutcome] | None = None
+_suggest_cache: ISearchCache[SuggestOutcome] | None = None
+_archive_handles: ZipHandleCache | None = None
+# Один S3-клиент (с пулом соединений) на процесс: открывается в lifespan, закрывается при остановке.
+_file_storage: S3Storage | None = None
+# Общий на процесс: схлопывает одинаковые одновременные поиски и экспорты из REST и MCP.
+_single_flight = SingleFlight()
+
+
+def get_search_cache() -> ISearchCache[SearchOutcome] | None:
+    """Кэш результатов поиска, общий для REST и MCP в рамках процесса (None, если выключен)."""
+    global _search_cache
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        _search_cache = InMemorySearchCache(
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            ttl_s=settings.SEARCH_CACHE_TTL_S,
+            negative_ttl_s=settings.SEARCH_CACHE_NEGATIVE_TTL_S,
+            generation=books_index_generation,
+        )
+    return _search_cache
+
+
+def get_suggest_cache() -> ISearchCache[SuggestOutcome] | None:
+    """Кэш подсказок автодополнения по префиксам — отдельный от кэша поиска (None, если кэш выключен)."""
+    global _suggest_cache
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    if _suggest_cache is None:
+        _suggest_cache = InMemorySearchCache(
+            max_entries=settings.SUGGEST_CACHE_MAX_ENTRIES,
+            ttl_s=settings.SEARCH_CACHE_TTL_S,
+            negative_ttl_s=settings.SEARCH_CACHE_NEGATIVE_TTL_S,
+            generation=books_index_generation,
+        )
+    return _suggest_cache
+
+
+def get_archive_handles() -> ZipHandleCache | None:
+    """Кэш открытых zip-архивов, общий на процесс для всех путей чтения книг (None, если выключен)."""
+    global _archive_handles
+    if settings.ARCHIVE_HANDLE_CACHE_MAX_HANDLES == 0:
+        return None
+    if _archive_handles is None:
+        _archive_handles = ZipHandleCache(
+            max_handles=settings.ARCHIVE_HANDLE_CACHE_MAX_HANDLES,
+            max_bytes=settings.ARCHIVE_HANDLE_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _archive_handles
+
+
+def close_archive_handles() -> None:
+    global _archive_handles
+    if _archive_handles is not None:
+        _archive_handles.close()
+        _archive_handles = None
+
+
+def build_file_storage() -> S3Storage:
     return S3Storage(
         endpoint_url=settings.S3_ENDPOINT,
         access_key=settings.S3_ACCESS_KEY,
         secret_key=settings.S3_SECRET_KEY,
         bucket=settings.S3_BUCKET,
         region=settings.S3_REGION,
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        multipart_chunk_bytes=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
     )
 
 
+def get_file_storage() -> S3Storage:
+    """S3-хранилище, общее для REST и MCP в рамках процесса (один клиент и пул соединений)."""
+    global _file_storage
+    if _file_storage is None:
+        _file_storage = build_file_storage()
+    return _file_storage
+
+
+async def close_file_storage() -> None:
+    global _file_storage
+    if _file_storage is not None:
+        await _file_storage.close()
+        _file_storage = None
+
+
 def build_email_sender() -> IEmailSender:
     return N8nEmailSender(
         webhook_url=settings.N8N_EMAIL_WEBHOOK_URL,
@@ -36,8 +120,16 @@ def build_book_service(
     repo: BookRepo = BookRepo(db, Book, BookORM)
     return BookService(
         repo,
-        storage or build_file_storage(),
+        storage or get_file_storage(),
         email_sender or build_email_sender(),
         archives_path=settings.BOOKS_ARCHIVES_PATH,
         s3_bucket=settings.S3_BUCKET,
+        search_cache=get_search_cache(),
+        single_flight=_single_flight,
+        suggest_cache=get_suggest_cache(),
+        archive_index=ZipArchiveIndex(db),
+        archive_handles=get_archive_handles(),
+        object_manifest=S3ObjectManifest(
+            sessionmanager.engine, bucket=settings.S3_BUCKET, ttl_s=settings.S3_OBJECT_TTL_DAYS * 86400
+        ),
     )
@@ -40,12 +40,64 @@ class Settings(BaseSettings):
     # Local books archive settings
     BOOKS_ARCHIVES_PATH: Path = Field(DEFAULT_BOOKS_ARCHIVES_PATH, description="Путь до папки с архивами книг")
 
+    CATALOG_SNAPSHOT_PATH: Path | None = Field(
+        None,
+        description=(
+            "Путь к снимку каталога (scripts/catalog_snapshot.py write). Если задан — книги по id и найденные "
+            "поиском читаются из mmap-снимка, а не из БД; файл делят все процессы через page cache"
+        ),
+    )
+
     # S3 / MinIO settings
     S3_ENDPOINT: str = Field("http://minio:9000", description="S3 endpoint URL (например, MinIO)")
     S3_ACCESS_KEY: str = Field("minioadmin", description="S3 access key")
     S3_SECRET_KEY: str = Field("minioadmin", description="S3 secret key")
     S3_BUCKET: str = Field("book-library", description="S3 bucket name")
     S3_REGION: str = Field("us-east-1", description="S3 region name (для SigV4)")
+    S3_MAX_POOL_CONNECTIONS: int = Field(
+        10,
+        ge=1,
+        description="Размер пула соединений общего S3-клиента (одновременных запросов к S3 на процесс)",
+    )
+    S3_OBJECT_TTL_DAYS: int = Field(
+        7,
+        ge=1,
+        description=(
+            "Через сколько дней объекты удаляются из бакета (ILM-правило minio-setup); "
+            "столько же действует запись манифеста загруженных объектов"
+        ),
+    )
+    S3_MULTIPART_CHUNK_MB: int = Field(
+        8,
+        ge=5,
+        description=(
+            "Размер части multipart upload при экспорте книги (МиБ): файлы не больше него уходят одним put_object, "
+            "в памяти на экспорт держится не больше одной части. Минимум S3 — 5 МиБ"
+        ),
+    )
+
+    SEARCH_BACKEND: Literal["elasticsearch", "sqlite_fts", "memory"] = Field(
+        "elasticsearch",
+        description=(
+            "Движок поиска книг: 'elasticsearch' — индекс в ES (нужен ELASTICSEARCH_URL), "
+            "'sqlite_fts' — локальный SQLite FTS5 (books_fts) в той же БД, без отдельного сервиса, "
+            "'memory' — инвертированный индекс в памяти процесса, строится при старте."
+        ),
+    )
+
+    SEARCH_FTS_FALLBACK: bool = Field(
+        True,
+        description=(
+            "sqlite_fts: если по словам ничего не найдено — искать подстрокой и с опечатками "
+            "по trigram-индексу books_fts_trigram в том же запросе"
+        ),
+    )
+    SEARCH_FTS_FUZZY_MIN_SIMILARITY: float = Field(
+        0.75,
+        gt=0,
+        le=1,
+        description="sqlite_fts: минимальное сходство слова запроса со словом книги при поиске с опечатками (0..1)",
+    )
 
     # Elasticsearch settings (поиск книг)
     ELASTICSEARCH_URL: str | None = Field(
@@ -57,7 +109,101 @@ class Settings(BaseSettings):
         True,
         description="Если true — при первом поиске создаёт индекс и индексирует книги из БД, если индекс пуст.",
     )
+    ELASTICSEARCH_DENORMALIZED: bool = Field(
+        False,
+        description=(
+            "Если true — индекс хранит поля для отображения (автор, название, жанр, язык, год, размер, архив, файл), "
+            "и поиск собирает книги прямо из ES без запроса в БД. После включения нужна переиндексация."
+        ),
+    )
+    ELASTICSEARCH_BULK_WORKERS: int = Field(4, ge=1, description="Число параллельных bulk-воркеров при индексации")
+    ELASTICSEARCH_BULK_CHUNK_DOCS: int = Field(1000, ge=1, description="Максимум документов в одном bulk-запросе")
+    ELASTICSEARCH_BULK_CHUNK_BYTES: int = Field(
+        5 * 1024 * 1024,
+        ge=1024,
+        description="Максимальный размер тела одного bulk-запроса (байт)",
+    )
+    ELASTICSEARCH_SYNC_ENABLED: bool = Field(
+        True,
+        description=(
+            "Если true — изменения таблицы books (журнал books_es_changes на триггерах) "
+            "фоново переносятся в индекс без полной переиндексации."
+        ),
+    )
+    ELASTICSEARCH_SYNC_INTERVAL_S: float = Field(
+        2.0,
+        gt=0,
+        description="Пауза между проверками журнала изменений книг (сек.)",
+    )
+    ELASTICSEARCH_SYNC_BATCH_SIZE: int = Field(
+        500,
+        ge=1,
+        description="Сколько изменений журнала переносить в ES за один bulk-запрос",
+    )
+    ELASTICSEARCH_PIT_KEEP_ALIVE: str = Field(
+        "2m",
+        description=(
+            "Сколько Elasticsearch держит point-in-time постраничного поиска между запросами страниц "
+            "(формат времени ES: 30s, 2m)"
+        ),
+    )
+    SEARCH_CURSOR_SECRET: str | None = Field(
+        None,
+        description=(
+            "Ключ HMAC-подписи курсоров постраничного поиска. Не задан — случайный ключ на процесс: курсор "
+            "действителен только в выдавшем его процессе; при нескольких воркерах задай общий ключ"
+        ),
+    )
     ELASTICSEARCH_REQUEST_TIMEOUT_S: float = Field(10.0, description="Timeout запросов к Elasticsearch (сек.)")
+    ELASTICSEARCH_CLIENT_MODE: Literal["sync", "async"] = Field(
+        "async",
+        description=(
+            "Режим клиента Elasticsearch: 'async' — нативный AsyncElasticsearch (aiohttp), "
+            "'sync' — sync-клиент, вызовы через asyncio.to_thread."
+        ),
+    )
+    ELASTICSEARCH_MAX_CONNECTIONS: int = Field(
+        10,
+        ge=1,
+        description="Размер пула соединений к каждому узлу Elasticsearch",
+    )
+    ELASTICSEARCH_KEEPALIVE_S: float = Field(
+        30.0,
+        gt=0,
+        description="Сколько секунд держать idle-соединение пула открытым (async-режим)",
+    )
+
+    # Search cache settings (кэш результатов BookService.search в памяти процесса)
+    SEARCH_CACHE_ENABLED: bool = Field(True, description="Если true — результаты поиска книг кэшируются (LRU + TTL)")
+    SEARCH_CACHE_MAX_ENTRIES: int = Field(1024, ge=1, description="Максимум запросов в кэше поиска")
+    SEARCH_CACHE_TTL_S: float = Field(300.0, ge=0, description="Сколько секунд хранить найденные книги")
+    SEARCH_CACHE_NEGATIVE_TTL_S: float = Field(
+        30.0,
+        ge=0,
+        description="Сколько секунд хранить исходы «ничего не найдено» и «слишком много результатов»",
+    )
+    SUGGEST_CACHE_MAX_ENTRIES: int = Field(
+        4096,
+        ge=1,
+        description="Максимум префиксов в кэше автодополнения (/books/suggest); TTL — SEARCH_CACHE_TTL_S",
+    )
+    SEARCH_CACHE_CATALOG_POLL_S: float = Field(
+        2.0,
+        gt=0,
+        description="Как часто проверять счётчик правок каталога для сброса кэша поиска (режимы без ES, сек.)",
+    )
+
+    # Кэш открытых zip-архивов книг (разобранных центральных каталогов) в памяти процесса
+    ARCHIVE_HANDLE_CACHE_MAX_HANDLES: int = Field(
+        32,
+        ge=0,
+        description="Сколько zip-архивов держать открытыми для экспорта (0 — кэш выключен)",
+    )
+    ARCHIVE_HANDLE_CACHE_MAX_MB: int = Field(
+        256,
+        ge=1,
+        description="Лимит памяти (оценка, МиБ) на разобранные каталоги открытых архивов",
+    )
 
     # n8n email webhook settings (отправка книги на e-mail)
     N8N_EMAIL_WEBHOOK_URL: str = Field(
@@ -161,5 +307,22 @@ class Settings(BaseSettings):
 
         return Path(normalized)
 
+    @field_validator("SEARCH_CURSOR_SECRET", mode="before")
+    @classmethod
+    def _parse_search_cursor_secret(cls, v):
+        # Пустое значение из docker-compose (`SEARCH_CURSOR_SECRET=`) — ключ на процесс.
+        if isinstance(v, str):
+            return v.strip() or None
+        return v
+
+    @field_validator("CATALOG_SNAPSHOT_PATH", mode="before")
+    @classmethod
+    def _parse_catalog_snapshot_path(cls, v):
+        # Пустое значение из docker-compose (`CATALOG_SNAPSHOT_PATH=`) — снимок выключен.
+        if isinstance(v, str):
+            normalized = v.strip().strip("'\"").strip()
+            return Path(normalized) if normalized else None
+        return v
+
 
 settings = Settings()
@@ -1,4 +1,9 @@
 from abc import ABC
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from domain.models.book import BookSearchFacets
 
 
 class DomainException(Exception, ABC):
@@ -20,13 +25,20 @@ class DoubleFoundError(RepositoryException):
     pass
 
 
+class SearchCursorError(RepositoryException):
+    """Курсор постраничного поиска повреждён или устарел (истёк point-in-time)."""
+
+
 # Service exceptions
 class ServiceException(DomainException, ABC):
     pass
 
 
 class TooManyResultsError(ServiceException):
-    pass
+    def __init__(self, message: str = "", facets: "BookSearchFacets | None" = None) -> None:
+        super().__init__(message)
+        # Счётчики genre/lang/year по всем совпадениям (если поиск их запрашивал) — чем сузить запрос.
+        self.facets = facets
 
 
 class BooksNotFoundError(ServiceException):
@@ -37,6 +49,10 @@ class ValueException(ServiceException):
     pass
 
 
+class UnsupportedSearchOptionError(ServiceException):
+    """Параметр поиска (фильтры, фасеты, группировка, курсор) не поддерживается движком SEARCH_BACKEND."""
+
+
 class PermissionException(ServiceException):
     pass
 
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Protocol, TypedDict
+
+
+class ArchiveMember(TypedDict):
+    """Положение файла в zip-архиве: смещение локального заголовка и параметры сжатия."""
+
+    header_offset: int
+    compress_size: int
+    file_size: int
+    compress_type: int
+    crc: int
+
+
+class IArchiveIndex(Protocol):
+    async def find_member(self, archive_path: Path, member_name: str) -> ArchiveMember | None: ...
+
+    # Блокирующий вызов (файловый ввод-вывод): вызывать через asyncio.to_thread.
+    def open_member(self, archive_path: Path, member_name: str, member: ArchiveMember) -> IO[bytes]: ...
+
+
+class IArchiveHandleCache(Protocol):
+    # Открывает файл в архиве: (поток распакованных байт, размер). Блокирующий вызов — через asyncio.to_thread.
+    def open_member(self, archive_path: Path, member_name: str) -> tuple[IO[bytes], int]: ...
@@ -7,7 +7,20 @@ from ..interfaces.mixins_repo_iface import (
     IRead,
 )
 from ..models.base_domain_model import TDomain
-from ..models.book import Book, BookDict, BookFields
+from ..models.book import (
+    Book,
+    BookDict,
+    BookFields,
+    BookGroup,
+    BookGroupPage,
+    BookSearchBatchItem,
+    BookSearchCapabilities,
+    BookSearchCursorPage,
+    BookSearchFilters,
+    BookSearchPage,
+    BookSearchQuery,
+    BookSuggestion,
+)
 
 
 class IBookRepoProtocol(
@@ -22,8 +35,59 @@ class IBookRepoProtocol(
         author: str | None = None,
         title: str | None = None,
         limit: int | None = None,
+        hydrate: bool | None = None,
     ) -> List[Book]: ...
 
+    async def search_page(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchPage: ...
+
+    async def search_page_many(
+        self,
+        queries: List[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None = None,
+    ) -> List[BookSearchPage]: ...
+
+    async def search_pages(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        cursor: str | None = None,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorPage: ...
+
+    async def search_groups(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookGroupPage: ...
+
+    async def suggest(self, prefix: str, *, limit: int) -> List[BookSuggestion]: ...
+
+    def search_capabilities(self) -> BookSearchCapabilities: ...
+
+    async def find_by_isbn(self, isbns: List[str], *, limit: int) -> List[Book]: ...
+
 
 class IBookService(ABC):
     @abstractmethod
@@ -39,8 +103,37 @@ class IBookService(ABC):
         q: str | None = None,
         author: str | None = None,
         title: str | None = None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
     ) -> List[Book]: ...
 
+    @abstractmethod
+    async def search_batch(self, queries: List[BookSearchQuery]) -> List[BookSearchBatchItem]: ...
+
+    @abstractmethod
+    async def search_pages(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        cursor: str | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorPage: ...
+
+    @abstractmethod
+    async def search_grouped(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> List[BookGroup]: ...
+
+    @abstractmethod
+    async def suggest(self, prefix: str) -> List[BookSuggestion]: ...
+
     @abstractmethod
     async def export_book_to_s3(self, book_id: int) -> dict[str, str | bool]: ...
 
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Protocol, TypedDict, TypeVar
+
+from domain.exceptions import ServiceException
+
+from ..models.book import Book, BookSuggestion
+
+
+# Нормализованный ключ поиска: (q, author, title), а для поиска с фильтрами/фасетами ещё (genre, lang, year, facets).
+SearchCacheKey = tuple[str | bool | None, ...]
+
+# Результат BookService.search: найденные книги либо «отрицательный» исход (TooManyResultsError/BooksNotFoundError).
+SearchOutcome = list[Book] | ServiceException
+# Результат BookService.suggest — у кэша подсказок свой тип значений.
+SuggestOutcome = list[BookSuggestion]
+
+TOutcome = TypeVar("TOutcome")
+
+
+class SearchCacheStats(TypedDict):
+    hits: int
+    misses: int
+    size: int
+    generation: int
+
+
+class ISearchCache(Protocol[TOutcome]):
+    def generation(self) -> int: ...
+
+    def get(self, key: SearchCacheKey) -> TOutcome | None: ...
+
+    def put(self, key: SearchCacheKey, outcome: TOutcome, *, generation: int) -> None: ...
+
+    def stats(self) -> SearchCacheStats: ...
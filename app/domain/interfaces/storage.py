@@ -1,16 +1,34 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Protocol
+from datetime import datetime
+from typing import IO, Protocol, TypedDict
+
+
+class StoredObject(TypedDict):
+    """Объект в хранилище: ключ, размер, ETag и время загрузки (от него отсчитывается срок жизни в бакете)."""
+
+    key: str
+    size: int
+    etag: str
+    uploaded_at: datetime
 
 
 class IFileStorage(Protocol):
-    async def file_exists(self, *, key: str) -> bool: ...
+    async def stat_object(self, *, key: str) -> StoredObject | None: ...
 
-    async def upload_file(
+    async def upload_stream(
         self,
         *,
         key: str,
-        path: Path,
+        stream: IO[bytes],
+        size: int,
         content_type: str | None = None,
-    ) -> None: ...
+    ) -> StoredObject: ...
+
+
+class IObjectManifest(Protocol):
+    """Локальный учёт загруженных объектов: проверка наличия объекта без запроса к хранилищу."""
+
+    async def get(self, key: str) -> StoredObject | None: ...
+
+    async def put(self, stored: StoredObject) -> None: ...
@@ -1,2 +1,2 @@
 from .base_domain_model import BaseDomainModel, TCovDomain, TDictFields, TDomain, TTypedDict  # noqa: F401, I001
-from .book import Book, BookDict, BookFields  # noqa: F401
+from .book import Book, BookDict, BookFields, BookSearchPage  # noqa: F401
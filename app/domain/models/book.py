@@ -25,6 +25,87 @@ class Book(BaseDomainModel):
     isbn: str | None = Field(None, description="ISBN")
 
 
+class BookSearchFilters(BaseDomainModel):
+    genre: str | None = Field(None, description="Точное значение жанра (как в фасетах)")
+    lang: str | None = Field(None, description="Точное значение языка (как в фасетах)")
+    year: str | None = Field(None, description="Точное значение года издания (как в фасетах)")
+
+
+class BookFacetValue(BaseDomainModel):
+    value: str = Field(..., description="Значение поля")
+    count: int = Field(..., description="Сколько найденных книг имеют это значение")
+
+
+class BookSearchFacets(BaseDomainModel):
+    genre: list[BookFacetValue] = Field(default_factory=list, description="Самые частые жанры среди найденных")
+    lang: list[BookFacetValue] = Field(default_factory=list, description="Самые частые языки среди найденных")
+    year: list[BookFacetValue] = Field(default_factory=list, description="Самые частые годы издания среди найденных")
+
+
+class BookSearchPage(BaseDomainModel):
+    books: list[Book] = Field(default_factory=list, description="Найденные книги (страница)")
+    total: int = Field(
+        ...,
+        description="Сколько книг нашлось; подсчёт ограничен порогом (limit + 1), выше порога число не точное",
+    )
+    facets: BookSearchFacets | None = Field(
+        None,
+        description="Счётчики genre/lang/year по всем совпадениям (только если запрошены)",
+    )
+
+
+class BookGroup(BaseDomainModel):
+    author: str | None = Field(None, description="Автор произведения (как у первого издания)")
+    title: str | None = Field(None, description="Название произведения (как у первого издания)")
+    editions: list[Book] = Field(
+        default_factory=list,
+        description="Издания произведения (форматы, издательства, размеры) по убыванию релевантности",
+    )
+    editions_total: int = Field(..., description="Сколько всего изданий нашлось (editions может быть короче)")
+
+
+class BookGroupPage(BaseDomainModel):
+    groups: list[BookGroup] = Field(default_factory=list, description="Найденные произведения (страница)")
+    total: int = Field(
+        ...,
+        description="Сколько произведений нашлось; выше порога (limit + 1) число приблизительное",
+    )
+
+
+class BookSuggestion(BaseDomainModel):
+    id: int = Field(..., description="ID книги")
+    author: str | None = Field(None, description="Автор")
+    title: str | None = Field(None, description="Название")
+
+
+class BookSearchQuery(BaseDomainModel):
+    q: str | None = Field(None, description="Общий поисковый запрос (по автору и названию)")
+    author: str | None = Field(None, description="Поиск по автору")
+    title: str | None = Field(None, description="Поиск по названию")
+
+
+class BookSearchBatchItem(BaseDomainModel):
+    status: Literal["ok", "no_results", "too_many_results"] = Field(..., description="Исход поиска по запросу")
+    books: list[Book] = Field(default_factory=list, description="Найденные книги (для статуса ok)")
+    detail: str | None = Field(None, description="Пояснение для статусов без результата")
+
+
+class BookSearchCapabilities(BaseDomainModel):
+    backend: str = Field(..., description="Движок поиска (SEARCH_BACKEND)")
+    filters: bool = Field(False, description="Точные фильтры genre/lang/year")
+    facets: bool = Field(False, description="Счётчики genre/lang/year в ответе «слишком много»")
+    grouped: bool = Field(False, description="Группировка изданий по произведениям")
+    paginate: bool = Field(False, description="Постраничный поиск по курсору")
+
+
+class BookSearchCursorPage(BaseDomainModel):
+    books: list[Book] = Field(default_factory=list, description="Книги текущей страницы")
+    next_cursor: str | None = Field(
+        None,
+        description="Непрозрачный курсор следующей страницы; None — это последняя страница",
+    )
+
+
 class BookDict(BaseCreateDict, total=False):
     id: int
     author: str | None
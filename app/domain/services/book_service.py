@@ -1,23 +1,69 @@
+import asyncio
 import hashlib
 import logging
 import mimetypes
 from pathlib import Path
 import re
-import tempfile
-from typing import List
+from typing import IO, Awaitable, Callable, Hashable, List, TypeVar
 import unicodedata
 import zipfile
 
-from domain.exceptions import ValueException
+from domain.exceptions import (
+    BooksNotFoundError,
+    NotFoundError,
+    ServiceException,
+    TooManyResultsError,
+    UnsupportedSearchOptionError,
+    ValueException,
+)
+from domain.interfaces.archive_index import IArchiveHandleCache, IArchiveIndex
 from domain.interfaces.email_sender import EmailSendResult, IEmailSender
-from domain.interfaces.storage import IFileStorage
+from domain.interfaces.search_cache import ISearchCache, SearchCacheKey, SearchOutcome, SuggestOutcome
+from domain.interfaces.storage import IFileStorage, IObjectManifest, StoredObject
+from domain.util import SingleFlight, book_id_from_query, isbn_lookup_keys
 
 from ..interfaces.book_ifaces import IBookRepoProtocol, IBookService
-from ..models.book import Book, BookDict
+from ..models.book import (
+    Book,
+    BookDict,
+    BookGroup,
+    BookSearchBatchItem,
+    BookSearchCursorPage,
+    BookSearchFilters,
+    BookSearchPage,
+    BookSearchQuery,
+    BookSuggestion,
+)
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Порог строгого поиска и размер страницы постраничного.
+SEARCH_LIMIT = 50
+# Сколько запросов можно передать в один пакетный поиск (search_batch).
+SEARCH_BATCH_MAX_QUERIES = 50
+# Сколько изданий показывать в группе произведения (search_grouped).
+SEARCH_GROUP_EDITIONS = 10
+# Сколько подсказок автодополнения отдавать (suggest).
+SUGGEST_LIMIT = 10
+
+_NOT_FOUND_MESSAGE = (
+    "По твоему запросу не найдено ни одной книги. "
+    "Попробуй измени строку поиска. Например оставь только имя автора или только название книги, "
+    "или часть названия, или часть фамилии автора. Можно попробовать удалить из строки поиска лишние символы "
+    "типа тире, если они есть."
+)
+
+# Параметры поиска, которые поддерживает не каждый движок (BookSearchCapabilities), — как они называются в API.
+_SEARCH_OPTION_LABELS = {
+    "filters": "фильтры genre/lang/year",
+    "facets": "facets",
+    "grouped": "grouped",
+    "paginate": "paginate/cursor",
+}
+
 
 class BookService(IBookService):
     repository: IBookRepoProtocol
@@ -30,11 +76,23 @@ class BookService(IBookService):
         *,
         archives_path: Path,
         s3_bucket: str,
+        search_cache: ISearchCache[SearchOutcome] | None = None,
+        single_flight: SingleFlight | None = None,
+        suggest_cache: ISearchCache[SuggestOutcome] | None = None,
+        archive_index: IArchiveIndex | None = None,
+        archive_handles: IArchiveHandleCache | None = None,
+        object_manifest: IObjectManifest | None = None,
     ) -> None:
         self.repository = repository
+        self.search_cache = search_cache
+        self.suggest_cache = suggest_cache
+        self.single_flight = single_flight
         self.storage = storage
         self.email_sender = email_sender
         self.archives_path = archives_path
+        self.archive_index = archive_index
+        self.archive_handles = archive_handles
+        self.object_manifest = object_manifest
         self.s3_bucket = s3_bucket
 
     async def read(self, filters: BookDict) -> Book:
@@ -49,31 +107,273 @@ class BookService(IBookService):
         q: str | None = None,
         author: str | None = None,
         title: str | None = None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
     ) -> List[Book]:
-        limit = 50
-        # Запрашиваем на 1 больше, чтобы понять, есть ли еще результаты
-        books = await self.repository.search(q=q, author=author, title=title, limit=limit + 1)
+        """
+        Строгий поиск: до SEARCH_LIMIT книг, иначе TooManyResultsError. filters сужают поиск точными
+        genre/lang/year; при facets=True TooManyResultsError несёт их счётчики, чтобы было чем сузить запрос.
+        Фильтры и фасеты на движке без их поддержки — UnsupportedSearchOptionError.
+        """
+        self._require_search_options(filters=filters, facets=facets)
+        if q and not (author or title or filters):
+            books = await self._find_by_identifier(q)
+            if books:
+                return books
+
+        key = self._search_key(q=q, author=author, title=title, filters=filters, facets=facets)
+
+        # Повторный запрос из кэша не ходит ни в поиск, ни в БД; отрицательные исходы кэшируются тоже.
+        generation = 0
+        if self.search_cache is not None:
+            cached = self.search_cache.get(key)
+            if isinstance(cached, TooManyResultsError):
+                raise TooManyResultsError(cached.message, facets=cached.facets)
+            if isinstance(cached, ServiceException):
+                raise type(cached)(cached.message)
+            if cached is not None:
+                return list(cached)
+            generation = self.search_cache.generation()
 
-        if not books:
-            from domain.exceptions import BooksNotFoundError
+        try:
+            # Одинаковые одновременные запросы выполняют один поиск и получают его результат.
+            books = await self._single_flight(
+                ("search", key),
+                lambda: self._search(q=q, author=author, title=title, filters=filters, facets=facets),
+            )
+        except (TooManyResultsError, BooksNotFoundError) as e:
+            if self.search_cache is not None:
+                self.search_cache.put(key, e, generation=generation)
+            raise
+
+        if self.search_cache is not None:
+            self.search_cache.put(key, books, generation=generation)
+        return list(books)
+
+    async def _find_by_identifier(self, q: str) -> List[Book]:
+        """
+        Быстрый путь для q, который целиком является ISBN или id книги: точный поиск по индексу БД
+        (isbn_norm / первичный ключ) вместо полнотекстового. Пустой список — не идентификатор или ничего
+        не нашлось; тогда запрос идёт обычным поиском.
+        """
+        isbns = isbn_lookup_keys(q)
+        if isbns is not None:
+            return await self.repository.find_by_isbn(isbns, limit=SEARCH_LIMIT)
+
+        book_id = book_id_from_query(q)
+        if book_id is not None:
+            try:
+                return [await self.repository.read({"id": book_id})]
+            except NotFoundError:
+                return []
+        return []
+
+    async def _search(
+        self,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> List[Book]:
+        # Один запрос к поиску с подсчётом совпадений (до limit + 1): при «слишком много» книги не собираются.
+        page = await self.repository.search_page(
+            q=q, author=author, title=title, limit=SEARCH_LIMIT, filters=filters, facets=facets
+        )
+        return self._page_books(page)
 
-            raise BooksNotFoundError(
-                "По твоему запросу не найдено ни одной книги. "
-                "Попробуй измени строку поиска. Например оставь только имя автора или только название книги, "
-                "или часть названия, или часть фамилии автора. Можно попробовать удалить из строки поиска лишние символы типа тире, "
-                "если они есть."
+    @staticmethod
+    def _page_books(page: BookSearchPage) -> List[Book]:
+        if page.total > SEARCH_LIMIT:
+            raise TooManyResultsError(
+                "Запрос поиска находит больше 50ти книг по запрошенным данным. Попробуй уточнить запрос.",
+                facets=page.facets,
             )
 
-        if len(books) > limit:
-            from domain.exceptions import TooManyResultsError
+        books = page.books
+        if not books:
+            raise BooksNotFoundError(_NOT_FOUND_MESSAGE)
+
+        return books
+
+    async def search_batch(self, queries: List[BookSearchQuery]) -> List[BookSearchBatchItem]:
+        """
+        Пакет поисков (например, список книг для чтения): исход по каждому запросу со статусами
+        ok/no_results/too_many_results, как у search. Результаты — в порядке queries.
+
+        Запросы, найденные в кэше, в поиск не идут; одинаковые запросы пакета выполняются один раз;
+        остальные — одним пакетным поиском репозитория (ES `_msearch` + общая гидратация).
+        """
+        keys = [self._search_key(q=query.q, author=query.author, title=query.title) for query in queries]
+        outcomes: dict[SearchCacheKey, SearchOutcome] = {}
+
+        generation = 0
+        if self.search_cache is not None:
+            for key in dict.fromkeys(keys):
+                cached = self.search_cache.get(key)
+                if cached is not None:
+                    outcomes[key] = cached
+            generation = self.search_cache.generation()
+
+        missing: dict[SearchCacheKey, BookSearchQuery] = {}
+        for key, query in zip(keys, queries):
+            if key not in outcomes:
+                missing.setdefault(key, query)
+        if missing:
+            pages = await self.repository.search_page_many(list(missing.values()), limit=SEARCH_LIMIT)
+            for key, page in zip(missing, pages):
+                outcome: SearchOutcome
+                try:
+                    outcome = self._page_books(page)
+                except (TooManyResultsError, BooksNotFoundError) as e:
+                    outcome = e
+                if self.search_cache is not None:
+                    self.search_cache.put(key, outcome, generation=generation)
+                outcomes[key] = outcome
+
+        return [self._batch_item(outcomes[key]) for key in keys]
+
+    @staticmethod
+    def _batch_item(outcome: SearchOutcome) -> BookSearchBatchItem:
+        if isinstance(outcome, TooManyResultsError):
+            return BookSearchBatchItem(status="too_many_results", detail=outcome.message)
+        if isinstance(outcome, ServiceException):
+            return BookSearchBatchItem(status="no_results", detail=outcome.message)
+        return BookSearchBatchItem(status="ok", books=list(outcome))
+
+    async def search_pages(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        cursor: str | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorPage:
+        """
+        Постраничный поиск (opt-in): вместо TooManyResultsError отдаёт страницы по SEARCH_LIMIT книг
+        и `next_cursor` для следующей. Курсор несёт сам запрос, поэтому со следующей страницы q/author/title
+        не нужны. Страницы не кэшируются: курсор привязан к point-in-time конкретного листания.
+        """
+        self._require_search_options(paginate=True, filters=filters)
+        page = await self.repository.search_pages(
+            q=q, author=author, title=title, limit=SEARCH_LIMIT, cursor=cursor, filters=filters
+        )
+        if cursor is None and not page.books:
+            raise BooksNotFoundError(_NOT_FOUND_MESSAGE)
+        return page
 
+    async def search_grouped(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> List[BookGroup]:
+        """
+        Поиск, сгруппированный по произведениям: одна группа на произведение (автор + название),
+        в ней — до SEARCH_GROUP_EDITIONS изданий. Порог «слишком много» считается по произведениям,
+        а не по файлам, поэтому запрос по популярному произведению с десятками изданий не отвергается.
+        """
+        self._require_search_options(grouped=True, filters=filters)
+        key = self._search_key(q=q, author=author, title=title, filters=filters)
+        page = await self._single_flight(
+            ("search_grouped", key),
+            lambda: self.repository.search_groups(
+                q=q, author=author, title=title, limit=SEARCH_LIMIT, editions=SEARCH_GROUP_EDITIONS, filters=filters
+            ),
+        )
+        if page.total > SEARCH_LIMIT:
             raise TooManyResultsError(
-                "Запрос поиска находит больше 50ти книг по запрошенным данным. Попробуй уточнить запрос."
+                "Запрос поиска находит больше 50ти произведений по запрошенным данным. Попробуй уточнить запрос."
             )
+        if not page.groups:
+            raise BooksNotFoundError(_NOT_FOUND_MESSAGE)
+        return list(page.groups)
 
-        return books
+    def _require_search_options(
+        self,
+        *,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+        grouped: bool = False,
+        paginate: bool = False,
+    ) -> None:
+        """UnsupportedSearchOptionError, если движок поиска не умеет запрошенные параметры (до похода в движок)."""
+        requested = {"filters": filters is not None, "facets": facets, "grouped": grouped, "paginate": paginate}
+        if not any(requested.values()):
+            return
+        capabilities = self.repository.search_capabilities()
+        unsupported = [name for name, on in requested.items() if on and not getattr(capabilities, name)]
+        if unsupported:
+            options = ", ".join(_SEARCH_OPTION_LABELS[name] for name in unsupported)
+            raise UnsupportedSearchOptionError(
+                f"Движок поиска {capabilities.backend} не поддерживает: {options}. "
+                "Эти параметры доступны только с SEARCH_BACKEND=elasticsearch."
+            )
+
+    async def suggest(self, prefix: str) -> List[BookSuggestion]:
+        """
+        Автодополнение по началу автора или названия: до SUGGEST_LIMIT лёгких подсказок (id, автор, название).
+
+        Частые префиксы отдаются из отдельного LRU-кэша в памяти процесса (suggest_cache), чтобы поток
+        нажатий клавиш не вытеснял из кэша поиска результаты полноценных запросов.
+        """
+        key = self._search_key(q=prefix, author=None, title=None)
+        generation = 0
+        if self.suggest_cache is not None:
+            cached = self.suggest_cache.get(key)
+            if cached is not None:
+                return list(cached)
+            generation = self.suggest_cache.generation()
+
+        suggestions = await self._single_flight(
+            ("suggest", key), lambda: self.repository.suggest(prefix, limit=SUGGEST_LIMIT)
+        )
+        if self.suggest_cache is not None:
+            self.suggest_cache.put(key, suggestions, generation=generation)
+        return list(suggestions)
+
+    @staticmethod
+    def _search_key(
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> SearchCacheKey:
+        """
+        Ключ поиска для кэша и схлопывания одинаковых запросов.
+
+        Пробелы схлопываются, регистр и `ё`/`е` не различаются, пустая строка == None.
+        Фильтры — точные значения, в ключ они попадают как есть.
+        """
+
+        def _norm(value: str | None) -> str | None:
+            if value is None:
+                return None
+            return " ".join(value.split()).lower().replace("ё", "е") or None
+
+        key: SearchCacheKey = (_norm(q), _norm(author), _norm(title))
+        if filters is None and not facets:
+            return key
+        filters = filters or BookSearchFilters()
+        return (*key, filters.genre, filters.lang, filters.year, facets)
+
+    async def _single_flight(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if self.single_flight is None:
+            return await fn()
+        return await self.single_flight.do(key, fn)
 
     async def export_book_to_s3(self, book_id: int) -> dict[str, str | bool]:
+        # Одновременные экспорты одной книги делают одну распаковку и одну загрузку в S3 (без гонки за ключ).
+        result = await self._single_flight(("export", book_id), lambda: self._export_book_to_s3(book_id))
+        return dict(result)
+
+    async def _export_book_to_s3(self, book_id: int) -> dict[str, str | bool]:
         book = await self.repository.read(filters={"id": book_id})
 
         if not book.archive_name:
@@ -83,24 +383,23 @@ class BookService(IBookService):
 
         object_key = self._build_object_key(book)
 
-        existed = await self.storage.file_exists(key=object_key)
+        existed = await self._stored_object(object_key) is not None
         if not existed:
             archive_path = self.archives_path / Path(book.archive_name).name
             member_name = book.file_name
 
             if not archive_path.exists():
                 raise ValueException(f"Архив не найден: {archive_path}")
-            if not zipfile.is_zipfile(archive_path):
-                raise ValueException(f"Неподдерживаемый формат архива: {archive_path}")
-
-            with tempfile.TemporaryDirectory(prefix="book_export_") as tmp_dir:
-                extracted_path = await self._extract_from_zip(
-                    archive_path=archive_path,
-                    member_name=member_name,
-                    dest_dir=Path(tmp_dir),
+
+            # Файл книги читается прямо из архива и потоком уходит в S3 — без распаковки во временный каталог.
+            stream, size = await self._open_archive_member(archive_path=archive_path, member_name=member_name)
+            with stream:
+                content_type, _ = mimetypes.guess_type(Path(member_name).name)
+                stored = await self.storage.upload_stream(
+                    key=object_key, stream=stream, size=size, content_type=content_type
                 )
-                content_type, _ = mimetypes.guess_type(extracted_path.name)
-                await self.storage.upload_file(key=object_key, path=extracted_path, content_type=content_type)
+            if self.object_manifest is not None:
+                await self.object_manifest.put(stored)
 
         return {"bucket": self.s3_bucket, "key": object_key, "existed": existed}
 
@@ -114,7 +413,7 @@ class BookService(IBookService):
         text: str,
     ) -> EmailSendResult:
         # Книгу можно отправлять только после экспорта в S3: проверяем, что файл действительно там есть.
-        if not await self.storage.file_exists(key=file_key):
+        if await self._stored_object(file_key) is None:
             raise ValueException(
                 "Файл книги не найден в S3. Сначала вызови export_book_to_s3 "
                 "и используй из его ответа bucket и key."
@@ -208,16 +507,50 @@ class BookService(IBookService):
 
         return f"{book.id}_{self._slug(author)}_{self._slug(title)}_{size_str}{ext}"
 
-    @staticmethod
-    async def _extract_from_zip(*, archive_path: Path, member_name: str, dest_dir: Path) -> Path:
-        def _extract() -> Path:
+    async def _stored_object(self, key: str) -> StoredObject | None:
+        """
+        Объект в S3: сначала из манифеста загруженных объектов (без запроса к S3), при промахе или истёкшей
+        записи — HEAD; найденный так объект записывается в манифест. Поэтому сценарий «экспорт → отправка»
+        делает не больше одного запроса метаданных к S3.
+        """
+        if self.object_manifest is not None:
+            known = await self.object_manifest.get(key)
+            if known is not None:
+                return known
+
+        stored = await self.storage.stat_object(key=key)
+        if stored is not None and self.object_manifest is not None:
+            await self.object_manifest.put(stored)
+        return stored
+
+    async def _open_archive_member(self, *, archive_path: Path, member_name: str) -> tuple[IO[bytes], int]:
+        """
+        Открывает файл книги в архиве: (поток распакованных байт, размер файла). Проиндексированный архив
+        (archive_index) читается сразу со смещения файла, без разбора центрального каталога zip;
+        остальные — через кэш открытых архивов (archive_handles), где каталог разобран при первом обращении.
+        """
+        if self.archive_index is not None:
+            member = await self.archive_index.find_member(archive_path, member_name)
+            if member is not None:
+                try:
+                    stream = await asyncio.to_thread(self.archive_index.open_member, archive_path, member_name, member)
+                    return stream, member["file_size"]
+                except zipfile.BadZipFile:
+                    logger.warning("Индекс архива %s не совпал с файлом — читаю через ZipFile", archive_path)
+        return await self._open_zip_member(archive_path=archive_path, member_name=member_name)
+
+    async def _open_zip_member(self, *, archive_path: Path, member_name: str) -> tuple[IO[bytes], int]:
+        def _open() -> tuple[IO[bytes], int]:
+            if self.archive_handles is not None:
+                return self.archive_handles.open_member(archive_path, member_name)
+            # Поток держит свою ссылку на файл архива: закрытие ZipFile его не закрывает.
             with zipfile.ZipFile(archive_path) as zf:
-                extracted = zf.extract(member_name, path=dest_dir)
-                return Path(extracted)
+                info = zf.getinfo(member_name)
+                return zf.open(info), info.file_size
 
         try:
-            import asyncio
-
-            return await asyncio.to_thread(_extract)
+            return await asyncio.to_thread(_open)
+        except zipfile.BadZipFile as ex:
+            raise ValueException(f"Неподдерживаемый формат архива: {archive_path}") from ex
         except KeyError as ex:
             raise ValueException(f"Файл не найден в архиве: {member_name}") from ex
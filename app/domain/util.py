@@ -1,4 +1,101 @@
 import asyncio
+import re
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
 
 
 stop_event = asyncio.Event()
+
+T = TypeVar("T")
+
+# ISBN после normalize_isbn: ISBN-10 (9 цифр + цифра или X) или ISBN-13.
+_ISBN_RE = re.compile(r"\d{9}[\dX]|\d{13}")
+# id книги в общем запросе — только с явной пометкой («id:123», «book_id=123», «#123»): голое число
+# может быть названием («1984», «2666» и т.п.) и уходит в обычный поиск.
+_BOOK_ID_RE = re.compile(r"(?:(?:book_?)?id\s*[:=]?\s*|#)(\d{1,9})", re.IGNORECASE)
+
+
+def normalize_isbn(value: str) -> str:
+    """ISBN без «ISBN», дефисов, пробелов и двоеточий, в верхнем регистре — как колонка books.isbn_norm."""
+    normalized = value.upper().replace("ISBN", "")
+    for separator in "- :":
+        normalized = normalized.replace(separator, "")
+    return normalized
+
+
+def isbn_lookup_keys(query: str) -> list[str] | None:
+    """
+    Если запрос — ISBN-10/13, возвращает значения isbn_norm для точного поиска: сам ISBN и его запись
+    в другом формате (ISBN-10 ↔ ISBN-13 с префиксом 978), иначе None.
+    """
+    isbn = normalize_isbn(query.strip())
+    if not _ISBN_RE.fullmatch(isbn):
+        return None
+    if len(isbn) == 10:
+        return [isbn, _isbn13_from_isbn10(isbn)]
+    if isbn.startswith("978"):
+        return [isbn, _isbn10_from_isbn13(isbn)]
+    return [isbn]
+
+
+def _isbn13_from_isbn10(isbn10: str) -> str:
+    body = "978" + isbn10[:9]
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(body))
+    return body + str(-total % 10)
+
+
+def _isbn10_from_isbn13(isbn13: str) -> str:
+    body = isbn13[3:12]
+    check = -sum(int(digit) * (10 - i) for i, digit in enumerate(body)) % 11
+    return body + ("X" if check == 10 else str(check))
+
+
+def book_id_from_query(query: str) -> int | None:
+    """id книги, если общий запрос — это id с явной пометкой («id:123», «#123»), иначе None."""
+    match = _BOOK_ID_RE.fullmatch(query.strip())
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+class SingleFlight:
+    """
+    Схлопывает одновременные одинаковые операции: пока операция с ключом key выполняется,
+    остальные вызовы do(key, ...) не запускают её заново, а ждут тот же результат (или ту же ошибку).
+
+    Если вызов-«лидер» отменён (например, клиент оборвал запрос), ожидающие не падают,
+    а один из них повторяет операцию сам. Отмена ожидающего не затрагивает лидера.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Лидер отменён — повторяем операцию сами.
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Помечаем исключение полученным: без ожидающих asyncio иначе пишет «exception was never retrieved».
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1 @@
+"""Работа с zip-архивами книг (индекс файлов в архивах и т.п.)."""
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import sys
+import threading
+from typing import IO, TypedDict
+import zipfile
+
+from domain.interfaces.archive_index import IArchiveHandleCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Грубая оценка памяти на файл архива сверх самого ZipInfo: запись в словаре NameToInfo и ссылка в filelist.
+_ENTRY_OVERHEAD_BYTES = 120
+
+
+class ZipHandleCacheStats(TypedDict):
+    handles: int
+    bytes: int
+    hits: int
+    misses: int
+
+
+@dataclass
+class _Handle:
+    zf: zipfile.ZipFile
+    stat: tuple[int, int]
+    size_bytes: int
+
+
+def _archive_stat(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _estimate_bytes(zf: zipfile.ZipFile) -> int:
+    return sum(
+        sys.getsizeof(info) + sys.getsizeof(info.filename) + len(info.extra) + _ENTRY_OVERHEAD_BYTES
+        for info in zf.filelist
+    )
+
+
+def _open(zf: zipfile.ZipFile, member_name: str) -> tuple[IO[bytes], int]:
+    info = zf.getinfo(member_name)
+    return zf.open(info), info.file_size
+
+
+class ZipHandleCache(IArchiveHandleCache):
+    """
+    LRU открытых zip-архивов (ZipFile с уже разобранным центральным каталогом), общий на процесс.
+
+    - Ограничен и числом архивов (max_handles), и оценкой памяти их каталогов (max_bytes); архив,
+      который один больше max_bytes, не кэшируется.
+    - Запись действительна, пока у файла архива те же mtime и размер; иначе архив открывается заново.
+    - Потокобезопасен: open_member вызывается из пула потоков. Поток файла держит свою ссылку на файл
+      архива, поэтому вытеснение (ZipFile.close) не обрывает уже открытые потоки.
+    """
+
+    def __init__(self, *, max_handles: int, max_bytes: int) -> None:
+        self._entries: OrderedDict[Path, _Handle] = OrderedDict()
+        self._max_handles = max_handles
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def open_member(self, archive_path: Path, member_name: str) -> tuple[IO[bytes], int]:
+        stat = _archive_stat(archive_path)
+        with self._lock:
+            handle = self._entries.get(archive_path)
+            if handle is not None and handle.stat == stat:
+                self._entries.move_to_end(archive_path)
+                self._hits += 1
+                # Открываем под блокировкой: иначе параллельное вытеснение может закрыть ZipFile раньше.
+                return _open(handle.zf, member_name)
+            if handle is not None:
+                self._evict(archive_path)
+            self._misses += 1
+
+        # Центральный каталог разбирается вне блокировки, чтобы не задерживать чтение других архивов.
+        zf = zipfile.ZipFile(archive_path)
+        try:
+            opened = _open(zf, member_name)
+        except BaseException:
+            zf.close()
+            raise
+
+        size_bytes = _estimate_bytes(zf)
+        with self._lock:
+            if archive_path not in self._entries and size_bytes <= self._max_bytes:
+                self._entries[archive_path] = _Handle(zf=zf, stat=stat, size_bytes=size_bytes)
+                self._bytes += size_bytes
+                while len(self._entries) > self._max_handles or self._bytes > self._max_bytes:
+                    self._evict(next(iter(self._entries)))
+                return opened
+        zf.close()
+        return opened
+
+    def _evict(self, archive_path: Path) -> None:
+        handle = self._entries.pop(archive_path)
+        self._bytes -= handle.size_bytes
+        handle.zf.close()
+
+    def stats(self) -> ZipHandleCacheStats:
+        with self._lock:
+            return ZipHandleCacheStats(
+                handles=len(self._entries), bytes=self._bytes, hits=self._hits, misses=self._misses
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            for archive_path in list(self._entries):
+                self._evict(archive_path)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+from pathlib import Path
+import struct
+import time
+from typing import IO, Any, TypedDict, cast
+import zipfile
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from domain.interfaces.archive_index import ArchiveMember, IArchiveIndex
+from infrastructure.db.models.archive_member_orm import ArchiveMemberORM
+
+
+logger = logging.getLogger(__name__)
+
+
+# Локальный заголовок файла zip (как zipfile.structFileHeader): сигнатура, версии, флаги, метод, время, дата,
+# CRC, размеры, длины имени и extra-поля.
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+# Шифрование, «compressed patched data», strong encryption — такие файлы читаются только через ZipFile.
+_UNSUPPORTED_FLAGS = 0x01 | 0x20 | 0x40
+
+
+class ArchiveIndexStats(TypedDict):
+    archives: int
+    indexed: int
+    skipped: int
+    failed: int
+    members: int
+    removed: int
+
+
+def _archive_stat(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def scan_zip_archive(path: Path) -> list[dict[str, Any]]:
+    """Строки archive_members для одного архива — за один разбор его центрального каталога."""
+    mtime_ns, size = _archive_stat(path)
+    with zipfile.ZipFile(path) as zf:
+        return [
+            {
+                "archive": path.name,
+                "member": info.filename,
+                "archive_mtime_ns": mtime_ns,
+                "archive_size": size,
+                "header_offset": info.header_offset,
+                "compress_size": info.compress_size,
+                "file_size": info.file_size,
+                "compress_type": info.compress_type,
+                "crc": info.CRC,
+            }
+            for info in zf.infolist()
+            if not info.is_dir() and not info.flag_bits & _UNSUPPORTED_FLAGS
+        ]
+
+
+def open_zip_member_at(archive_path: Path, member_name: str, member: ArchiveMember) -> zipfile.ZipExtFile:
+    """
+    Открывает файл архива по смещению из индекса: читает только его локальный заголовок, центральный
+    каталог не разбирается. Распаковка и проверка CRC — штатные (zipfile.ZipExtFile).
+    """
+    f = open(archive_path, "rb")
+    try:
+        f.seek(member["header_offset"])
+        header = f.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size:
+            raise zipfile.BadZipFile(f"{archive_path}: обрезанный заголовок файла {member_name}")
+        fields = _LOCAL_HEADER.unpack(header)
+        if fields[0] != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"{archive_path}: по смещению {member['header_offset']} нет файла {member_name}")
+        f.seek(fields[10] + fields[11], 1)
+
+        info = zipfile.ZipInfo(member_name)
+        info.compress_type = member["compress_type"]
+        info.compress_size = member["compress_size"]
+        info.file_size = member["file_size"]
+        info.CRC = member["crc"]
+        return zipfile.ZipExtFile(f, "r", info, None, close_fileobj=True)
+    except BaseException:
+        f.close()
+        raise
+
+
+class ZipArchiveIndex(IArchiveIndex):
+    """Индекс файлов в архивах из таблицы archive_members (см. index_zip_archives)."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def find_member(self, archive_path: Path, member_name: str) -> ArchiveMember | None:
+        """
+        Положение файла в архиве или None, если архив не проиндексирован, файла в индексе нет
+        или архив изменился после сканирования (другие mtime/размер).
+        """
+        try:
+            mtime_ns, size = _archive_stat(archive_path)
+        except OSError:
+            return None
+
+        orm = ArchiveMemberORM
+        stmt = select(orm.header_offset, orm.compress_size, orm.file_size, orm.compress_type, orm.crc).where(
+            orm.archive == archive_path.name,
+            orm.member == member_name,
+            orm.archive_mtime_ns == mtime_ns,
+            orm.archive_size == size,
+        )
+        try:
+            row = (await self.db.execute(stmt)).one_or_none()
+        except SQLAlchemyError:
+            # Индекс — только ускорение: без него файл читается через zipfile.ZipFile.
+            logger.warning("Индекс архивов недоступен — читаю %s через ZipFile", archive_path, exc_info=True)
+            return None
+        if row is None:
+            return None
+        values = dict(row._mapping)
+        return ArchiveMember(
+            header_offset=values["header_offset"],
+            compress_size=values["compress_size"],
+            file_size=values["file_size"],
+            compress_type=values["compress_type"],
+            crc=values["crc"],
+        )
+
+    def open_member(self, archive_path: Path, member_name: str, member: ArchiveMember) -> IO[bytes]:
+        # ZipExtFile — поток байт, как и то, что отдаёт ZipFile.open (в typeshed он тоже IO[bytes]).
+        return cast(IO[bytes], open_zip_member_at(archive_path, member_name, member))
+
+
+async def ensure_archive_index(engine: AsyncEngine) -> None:
+    """Создаёт таблицу archive_members, если её ещё нет."""
+    async with engine.begin() as conn:
+        await conn.run_sync(ArchiveMemberORM.__table__.create, checkfirst=True)  # type: ignore[attr-defined]
+
+
+async def index_zip_archives(session: AsyncSession, archives_path: Path, *, force: bool = False) -> ArchiveIndexStats:
+    """
+    Сканирует `*.zip` в archives_path и записывает положение их файлов в archive_members.
+
+    Архивы с теми же mtime и размером, что в индексе, пропускаются (force=True — пересканировать все);
+    записи об архивах, которых больше нет, удаляются. Каждый архив коммитится отдельно.
+    """
+    orm = ArchiveMemberORM
+    started = time.perf_counter()
+    indexed_archives = {
+        row.archive: (row.mtime_ns, row.size)
+        for row in await session.execute(
+            select(
+                orm.archive,
+                func.max(orm.archive_mtime_ns).label("mtime_ns"),
+                func.max(orm.archive_size).label("size"),
+            ).group_by(orm.archive)
+        )
+    }
+
+    archives = sorted(archives_path.glob("*.zip"))
+    stats = ArchiveIndexStats(archives=len(archives), indexed=0, skipped=0, failed=0, members=0, removed=0)
+    for path in archives:
+        if not force and indexed_archives.get(path.name) == _archive_stat(path):
+            stats["skipped"] += 1
+            continue
+        try:
+            rows = await asyncio.to_thread(scan_zip_archive, path)
+        except (OSError, zipfile.BadZipFile):
+            logger.exception("Не удалось прочитать архив %s — пропускаю", path)
+            stats["failed"] += 1
+            continue
+
+        await session.execute(delete(orm).where(orm.archive == path.name))
+        if rows:
+            await session.execute(insert(orm), rows)
+        await session.commit()
+        stats["indexed"] += 1
+        stats["members"] += len(rows)
+        logger.info("Архив %s проиндексирован: %d файлов", path.name, len(rows))
+
+    gone = indexed_archives.keys() - {path.name for path in archives}
+    if gone:
+        await session.execute(delete(orm).where(orm.archive.in_(gone)))
+        await session.commit()
+        stats["removed"] = len(gone)
+
+    logger.info("Индекс архивов обновлён за %.1f сек.: %s", time.perf_counter() - started, stats)
+    return stats
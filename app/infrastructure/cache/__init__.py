@@ -0,0 +1 @@
+"""Кэши уровня процесса (результаты поиска и т.п.)."""
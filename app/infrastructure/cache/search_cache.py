@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import time
+from typing import Callable, Generic
+
+from domain.interfaces.search_cache import SearchCacheKey, SearchCacheStats, TOutcome
+
+
+class InMemorySearchCache(Generic[TOutcome]):
+    """
+    LRU-кэш результатов BookService.search в памяти процесса.
+
+    - Не больше max_entries записей; при переполнении вытесняется давно не использованная.
+    - Положительные результаты живут ttl_s, отрицательные (TooManyResultsError/BooksNotFoundError) — negative_ttl_s.
+    - generation() — поколение индекса книг: при его смене (переиндексация, синхронизация правок)
+      кэш целиком сбрасывается.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_s: float,
+        negative_ttl_s: float,
+        generation: Callable[[], int] = lambda: 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: OrderedDict[SearchCacheKey, tuple[float, TOutcome]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._negative_ttl_s = negative_ttl_s
+        self._generation = generation
+        self._clock = clock
+        self._seen_generation = generation()
+        self._hits = 0
+        self._misses = 0
+
+    def _check_generation(self) -> None:
+        current = self._generation()
+        if current != self._seen_generation:
+            self._entries.clear()
+            self._seen_generation = current
+
+    def generation(self) -> int:
+        self._check_generation()
+        return self._seen_generation
+
+    def get(self, key: SearchCacheKey) -> TOutcome | None:
+        self._check_generation()
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, outcome = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return outcome
+
+    def put(self, key: SearchCacheKey, outcome: TOutcome, *, generation: int) -> None:
+        """
+        Сохраняет результат поиска, начатого в поколении generation.
+
+        Если поколение успело смениться, пока шёл поиск, результат может быть устаревшим и не сохраняется.
+        """
+        if generation != self.generation():
+            return
+
+        ttl = self._ttl_s if isinstance(outcome, list) else self._negative_ttl_s
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (self._clock() + ttl, outcome)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            size=len(self._entries),
+            generation=self._seen_generation,
+        )
@@ -0,0 +1,325 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+import json
+import logging
+import math
+import mmap
+import os
+from pathlib import Path
+import shutil
+import struct
+import tempfile
+from typing import IO, Any, Iterable, TypedDict, TypeVar
+
+from sqlalchemy import Float, Text, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.book_orm import BookORM
+
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_MAGIC = b"BOOKSNAP"
+SNAPSHOT_VERSION = 1
+# magic, версия формата, длина JSON-заголовка.
+_PREAMBLE = struct.Struct("<8sII")
+_ViewT = TypeVar("_ViewT", bound="memoryview[Any]")
+_ALIGN = 8
+
+_snapshot: "CatalogSnapshot | None" = None
+
+
+class CatalogSnapshotInfo(TypedDict):
+    path: str
+    version: int
+    rows: int
+    max_id: int
+    created_at: str
+    size_bytes: int
+
+
+def _string_columns() -> list[str]:
+    return [column.name for column in BookORM.__table__.columns if isinstance(column.type, Text)]
+
+
+def _float_columns() -> list[str]:
+    return [column.name for column in BookORM.__table__.columns if isinstance(column.type, Float)]
+
+
+class CatalogSnapshot:
+    """
+    Неизменяемый снимок таблицы `books`, открытый через mmap только на чтение.
+
+    Формат (версия SNAPSHOT_VERSION) — колоночный:
+    - преамбула `BOOKSNAP` + версия + длина заголовка, затем JSON-заголовок со списком колонок и смещениями секций;
+    - `id` — отсортированный `uint32[rows]` (поиск книги — bisect);
+    - числовые колонки — `float64[rows]`, NULL хранится как NaN;
+    - строковые колонки — `uint64[rows + 1]` смещений, битовая маска NULL и UTF-8 blob всех значений подряд.
+
+    Все секции — memoryview поверх mmap: ни чтение файла, ни поиск по id ничего не копируют,
+    строка декодируется прямо из страниц файла. Несколько процессов, открывших один файл,
+    делят одну копию в page cache.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: list[memoryview] = []
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self) -> None:
+        buf = memoryview(self._mmap)
+        self._views.append(buf)
+        if len(buf) < _PREAMBLE.size:
+            raise ValueError(f"{self.path}: файл слишком короткий для снимка каталога")
+        magic, version, header_len = _PREAMBLE.unpack_from(buf)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.path}: не снимок каталога (magic={magic!r})")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{self.path}: версия формата {version}, ожидается {SNAPSHOT_VERSION}")
+
+        header = json.loads(bytes(buf[_PREAMBLE.size : _PREAMBLE.size + header_len]))
+        self.version: int = version
+        self.rows: int = header["rows"]
+        self.max_id: int = header["max_id"]
+        self.created_at: str = header["created_at"]
+
+        def keep(view: _ViewT) -> _ViewT:
+            self._views.append(view)
+            return view
+
+        def section(name: str) -> memoryview:
+            offset, length = header["sections"][name]
+            return keep(buf[offset : offset + length])
+
+        self._ids = keep(section("id").cast("I"))
+        self._floats = {name: keep(section(name).cast("d")) for name in header["float_columns"]}
+        self._strings = {
+            name: (keep(section(f"{name}.offsets").cast("Q")), section(f"{name}.nulls"), section(f"{name}.data"))
+            for name in header["string_columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def info(self) -> CatalogSnapshotInfo:
+        return CatalogSnapshotInfo(
+            path=str(self.path),
+            version=self.version,
+            rows=self.rows,
+            max_id=self.max_id,
+            created_at=self.created_at,
+            size_bytes=len(self._mmap),
+        )
+
+    def _position(self, book_id: int) -> int | None:
+        i = bisect_left(self._ids, book_id)  # type: ignore[arg-type]
+        if i < self.rows and self._ids[i] == book_id:
+            return i
+        return None
+
+    def _row(self, i: int) -> dict[str, Any]:
+        row: dict[str, Any] = {"id": self._ids[i]}
+        for name, values in self._floats.items():
+            value = values[i]
+            row[name] = None if math.isnan(value) else value
+        for name, (offsets, nulls, data) in self._strings.items():
+            if nulls[i >> 3] & (1 << (i & 7)):
+                row[name] = None
+            else:
+                row[name] = str(data[offsets[i] : offsets[i + 1]], "utf-8")
+        return row
+
+    def get(self, book_id: int) -> dict[str, Any] | None:
+        """Строка книги (как колонки `books`) или None, если книги нет в снимке."""
+        i = self._position(book_id)
+        return None if i is None else self._row(i)
+
+    def get_many(self, book_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+        """Строки найденных в снимке книг по id; отсутствующих в снимке id в ответе нет."""
+        found: dict[int, dict[str, Any]] = {}
+        for book_id in book_ids:
+            i = self._position(book_id)
+            if i is not None:
+                found[book_id] = self._row(i)
+        return found
+
+    def close(self) -> None:
+        # mmap нельзя закрыть, пока на него смотрят memoryview: сначала освобождаем их (от производных к базовому).
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+
+class _StringColumnWriter:
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.nulls = bytearray()
+        # Значения пишутся во временный файл, чтобы не держать весь blob (аннотации) в памяти.
+        self.data: IO[bytes] = tempfile.TemporaryFile()
+        self._size = 0
+
+    def add(self, i: int, value: str | None) -> None:
+        if i & 7 == 0:
+            self.nulls.append(0)
+        if value is None:
+            self.nulls[i >> 3] |= 1 << (i & 7)
+        else:
+            encoded = value.encode("utf-8")
+            self.data.write(encoded)
+            self._size += len(encoded)
+        self.offsets.append(self._size)
+
+
+async def write_catalog_snapshot(session: AsyncSession, path: Path, *, partition_size: int = 10_000) -> int:
+    """
+    Пишет снимок `books` в path (формат — см. CatalogSnapshot) потоковым чтением таблицы по возрастанию id.
+
+    Файл собирается рядом под временным именем и подменяется атомарно (os.replace): процессы, которые уже
+    открыли прежний снимок, продолжают читать его до перезапуска. Возвращает число книг в снимке.
+    """
+    float_columns = _float_columns()
+    string_columns = _string_columns()
+    ids = array("I")
+    floats = {name: array("d") for name in float_columns}
+    strings = {name: _StringColumnWriter() for name in string_columns}
+
+    try:
+        result = await session.stream(select(BookORM.__table__).order_by(BookORM.id))
+        async for partition in result.partitions(partition_size):
+            for row in partition:
+                i = len(ids)
+                ids.append(int(row.id))
+                for name in float_columns:
+                    value = getattr(row, name)
+                    floats[name].append(math.nan if value is None else float(value))
+                for name in string_columns:
+                    strings[name].add(i, getattr(row, name))
+
+        sections: list[tuple[str, Any]] = [("id", ids)]
+        sections.extend(floats.items())
+        for name, column in strings.items():
+            sections.append((f"{name}.offsets", column.offsets))
+            sections.append((f"{name}.nulls", column.nulls))
+            sections.append((f"{name}.data", column.data))
+
+        _write_file(
+            path,
+            {
+                "rows": len(ids),
+                "max_id": ids[-1] if ids else 0,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "float_columns": float_columns,
+                "string_columns": string_columns,
+            },
+            sections,
+        )
+    finally:
+        for column in strings.values():
+            column.data.close()
+
+    logger.info("Снимок каталога записан: %s (%d книг)", path, len(ids))
+    return len(ids)
+
+
+def _section_size(payload: Any) -> int:
+    if isinstance(payload, array):
+        return payload.itemsize * len(payload)
+    if isinstance(payload, bytearray):
+        return len(payload)
+    return payload.seek(0, os.SEEK_END)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_file(path: Path, header: dict[str, Any], sections: list[tuple[str, Any]]) -> None:
+    sizes = [_section_size(payload) for _, payload in sections]
+
+    # Смещения секций зависят от длины заголовка, а заголовок содержит смещения: считаем, пока длина не сойдётся.
+    header_len = 0
+    while True:
+        offset = _aligned(_PREAMBLE.size + header_len)
+        layout: dict[str, list[int]] = {}
+        for (name, _), size in zip(sections, sizes):
+            layout[name] = [offset, size]
+            offset = _aligned(offset + size)
+        header_bytes = json.dumps({**header, "sections": layout}).encode("utf-8")
+        if len(header_bytes) == header_len:
+            break
+        header_len = len(header_bytes)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, payload in sections:
+            f.write(b"\0" * (layout[name][0] - f.tell()))
+            if isinstance(payload, (array, bytearray)):
+                f.write(payload)
+            else:
+                payload.seek(0)
+                shutil.copyfileobj(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def get_catalog_snapshot() -> CatalogSnapshot | None:
+    return _snapshot
+
+
+async def open_catalog_snapshot(session: AsyncSession, path: Path) -> CatalogSnapshot | None:
+    """
+    Открывает снимок и делает его текущим для гидратации результатов поиска (BookRepo._hydrate).
+
+    Без файла или с файлом другого формата приложение работает как раньше — из БД.
+    Снимок, который расходится с БД по max(id) или числу книг (книги добавлены или удалены после записи),
+    не используется: иначе поиск показывал бы удалённые книги. Правки существующих строк так не видны —
+    после массовых правок снимок нужно перезаписать (`scripts/catalog_snapshot.py write`).
+    """
+    global _snapshot
+    close_catalog_snapshot()
+    try:
+        snapshot = CatalogSnapshot(path)
+    except FileNotFoundError:
+        logger.warning("Снимок каталога %s не найден — книги читаются из БД", path)
+        return None
+    except (OSError, ValueError):
+        logger.exception("Не удалось открыть снимок каталога %s — книги читаются из БД", path)
+        return None
+
+    db_max_id, db_rows = (await session.execute(select(func.max(BookORM.id), func.count()))).one()
+    if (db_max_id or 0, db_rows) != (snapshot.max_id, snapshot.rows):
+        logger.warning(
+            "Снимок каталога %s устарел и не используется: в БД max(id)=%d, книг %d; в снимке %d и %d (от %s)",
+            path,
+            db_max_id or 0,
+            db_rows,
+            snapshot.max_id,
+            snapshot.rows,
+            snapshot.created_at,
+        )
+        snapshot.close()
+        return None
+
+    _snapshot = snapshot
+    logger.info("Снимок каталога открыт: %s (%d книг от %s)", path, snapshot.rows, snapshot.created_at)
+    return snapshot
+
+
+def close_catalog_snapshot() -> None:
+    global _snapshot
+    if _snapshot is not None:
+        _snapshot.close()
+        _snapshot = None
@@ -0,0 +1,53 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_VERSION_TABLE = "books_catalog_version"
+
+
+async def ensure_books_catalog_version(engine: AsyncEngine) -> bool:
+    """
+    Создаёт счётчик правок каталога `books_catalog_version` и триггеры на `books`, которые его увеличивают.
+
+    По счётчику кэш поиска узнаёт о правках каталога в режимах без Elasticsearch (см. catalog_watch.py):
+    триггеры срабатывают на любую запись в `books`, в том числе из внешних скриптов импорта.
+    Возвращает False, если счётчик не поддерживается (не SQLite).
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("Счётчик правок каталога пропущен: dialect=%s", engine.dialect.name)
+        return False
+
+    async with engine.begin() as conn:
+        try:
+            await conn.execute(
+                text(f"""
+                CREATE TABLE IF NOT EXISTS {CATALOG_VERSION_TABLE} (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                );
+            """)
+            )
+            await conn.execute(text(f"INSERT OR IGNORE INTO {CATALOG_VERSION_TABLE}(id, version) VALUES (1, 0);"))
+            for name, event in (("books_ver_ai", "INSERT"), ("books_ver_ad", "DELETE"), ("books_ver_au", "UPDATE")):
+                await conn.execute(
+                    text(f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON books BEGIN
+                      UPDATE {CATALOG_VERSION_TABLE} SET version = version + 1 WHERE id = 1;
+                    END;
+                """)
+                )
+        except SQLAlchemyError:
+            logger.exception("Не удалось создать %s или его триггеры", CATALOG_VERSION_TABLE)
+            raise
+
+    return True
+
+
+async def read_books_catalog_version(session: AsyncSession) -> int:
+    return int((await session.execute(text(f"SELECT version FROM {CATALOG_VERSION_TABLE} WHERE id = 1"))).scalar_one())
@@ -0,0 +1,158 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+
+CHANGELOG_TABLE = "books_es_changes"
+# Пауза синхронизации на время blue/green-переиндексации (reindex_books): одна строка, пока идёт сборка индекса.
+SYNC_PAUSE_TABLE = "books_es_sync_pause"
+
+_CREATE_SYNC_PAUSE_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {SYNC_PAUSE_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        reason TEXT NOT NULL,
+        paused_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+async def ensure_books_es_changelog(engine: AsyncEngine) -> bool:
+    """
+    Создаёт журнал изменений `books_es_changes` и триггеры на `books`, которые его наполняют.
+
+    Журнал читает фоновая синхронизация индекса Elasticsearch (infrastructure/search/index_sync.py).
+    Возвращает False, если журнал не поддерживается (не SQLite).
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("Журнал изменений для ES пропущен: dialect=%s", engine.dialect.name)
+        return False
+
+    async with engine.begin() as conn:
+        try:
+            exists = (
+                await conn.execute(
+                    text(f"SELECT 1 FROM sqlite_master WHERE type='table' AND name='{CHANGELOG_TABLE}' LIMIT 1;")
+                )
+            ).scalar_one_or_none()
+        except SQLAlchemyError:
+            logger.exception("Не удалось проверить существование таблицы %s", CHANGELOG_TABLE)
+            raise
+
+        # Таблица паузы появилась позже журнала — создаём её и на уже настроенных БД.
+        await conn.execute(text(_CREATE_SYNC_PAUSE_TABLE))
+        if exists:
+            return True
+
+        logger.info("Создаю журнал изменений %s и триггеры (первый запуск на этой БД)", CHANGELOG_TABLE)
+
+        try:
+            await conn.execute(
+                text(f"""
+                CREATE TABLE IF NOT EXISTS {CHANGELOG_TABLE} (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    book_id INTEGER NOT NULL,
+                    op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+                    changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            )
+
+            await conn.execute(
+                text(f"""
+                CREATE TRIGGER IF NOT EXISTS books_es_ai AFTER INSERT ON books BEGIN
+                  INSERT INTO {CHANGELOG_TABLE}(book_id, op) VALUES (new.id, 'upsert');
+                END;
+            """)
+            )
+            await conn.execute(
+                text(f"""
+                CREATE TRIGGER IF NOT EXISTS books_es_ad AFTER DELETE ON books BEGIN
+                  INSERT INTO {CHANGELOG_TABLE}(book_id, op) VALUES (old.id, 'delete');
+                END;
+            """)
+            )
+            await conn.execute(
+                text(f"""
+                CREATE TRIGGER IF NOT EXISTS books_es_au AFTER UPDATE ON books BEGIN
+                  INSERT INTO {CHANGELOG_TABLE}(book_id, op) SELECT old.id, 'delete' WHERE old.id <> new.id;
+                  INSERT INTO {CHANGELOG_TABLE}(book_id, op) VALUES (new.id, 'upsert');
+                END;
+            """)
+            )
+        except SQLAlchemyError:
+            logger.exception("Не удалось создать %s или его триггеры", CHANGELOG_TABLE)
+            raise
+
+    return True
+
+
+async def drop_books_es_changelog(engine: AsyncEngine) -> bool:
+    """
+    Удаляет триггеры `books_es_*` и журнал `books_es_changes`, если они есть.
+
+    Вызывается, когда синхронизация не запускается (другой SEARCH_BACKEND, ELASTICSEARCH_SYNC_ENABLED=false
+    или не задан ELASTICSEARCH_URL): иначе триггеры продолжали бы писать в журнал, который никто не читает,
+    и он рос бы без ограничений. Правки каталога за это время в индекс не попадут — после повторного
+    включения синхронизации нужна переиндексация (scripts/reindex_books.py).
+    Возвращает True, если журнал был и удалён.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    async with engine.begin() as conn:
+        if not await _changelog_exists(conn):
+            return False
+        for trigger in ("books_es_ai", "books_es_ad", "books_es_au"):
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {CHANGELOG_TABLE}"))
+    logger.warning(
+        "Синхронизация индекса книг выключена: удалены журнал %s и его триггеры. "
+        "После её включения перестрой индекс (scripts/reindex_books.py)",
+        CHANGELOG_TABLE,
+    )
+    return True
+
+
+async def _changelog_exists(conn: AsyncConnection) -> bool:
+    return (
+        await conn.execute(
+            text(f"SELECT 1 FROM sqlite_master WHERE type='table' AND name='{CHANGELOG_TABLE}' LIMIT 1;")
+        )
+    ).scalar_one_or_none() is not None
+
+
+async def pause_books_es_sync(engine: AsyncEngine, *, reason: str) -> bool:
+    """
+    Ставит фоновую синхронизацию индекса на паузу (в т.ч. в другом процессе — отметка хранится в БД).
+
+    Пока пауза стоит, записи журнала копятся и не удаляются; после снятия паузы синхронизация
+    применит их к тому индексу, на который к тому времени указывает алиас.
+    Возвращает False, если журнала нет (синхронизация не настроена) — тогда и паузить нечего.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    async with engine.begin() as conn:
+        if not await _changelog_exists(conn):
+            return False
+        await conn.execute(text(_CREATE_SYNC_PAUSE_TABLE))
+        await conn.execute(
+            text(f"INSERT OR REPLACE INTO {SYNC_PAUSE_TABLE}(id, reason) VALUES (1, :reason)"),
+            {"reason": reason},
+        )
+    logger.info("Синхронизация индекса книг на паузе: %s", reason)
+    return True
+
+
+async def resume_books_es_sync(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM {SYNC_PAUSE_TABLE}"))
+    logger.info("Синхронизация индекса книг снята с паузы")
+
+
+async def books_es_sync_pause_reason(session: AsyncSession) -> str | None:
+    """Причина паузы синхронизации (см. pause_books_es_sync) или None, если пауза не стоит."""
+    return (await session.execute(text(f"SELECT reason FROM {SYNC_PAUSE_TABLE} LIMIT 1"))).scalar_one_or_none()
@@ -1,4 +1,5 @@
 import logging
+from typing import Callable
 
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
@@ -8,6 +9,37 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 logger = logging.getLogger(__name__)
 
 
+# build_fts5_match_query превращает каждое слово от 2 символов в префиксный запрос ("терм"*):
+# префиксные индексы на 2–4 символа отвечают на такие запросы без сканирования диапазона термов.
+BOOKS_FTS_PREFIX = "2 3 4"
+# detail=column меньше на диске, но на запросах с фильтром по колонке (author:/title:) и bm25 медленнее full
+# (см. scripts/bench_fts_prefix.py), поэтому оставляем full.
+BOOKS_FTS_DETAIL = "full"
+
+
+def books_fts_ddl(
+    *,
+    name: str = "books_fts",
+    prefix: str | None = BOOKS_FTS_PREFIX,
+    detail: str = BOOKS_FTS_DETAIL,
+) -> str:
+    options = [
+        "title",
+        "author",
+        "content='books'",
+        "content_rowid='id'",
+        f"detail={detail}",
+    ]
+    if prefix:
+        options.append(f"prefix='{prefix}'")
+    return f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5({', '.join(options)});"
+
+
+def _books_fts_is_current(create_sql: str) -> bool:
+    normalized = " ".join(create_sql.split())
+    return f"prefix='{BOOKS_FTS_PREFIX}'" in normalized and f"detail={BOOKS_FTS_DETAIL}" in normalized
+
+
 async def ensure_books_fts(engine: AsyncEngine) -> None:
     if engine.dialect.name != "sqlite":
         logger.info("Инициализация FTS пропущена: dialect=%s", engine.dialect.name)
@@ -15,55 +47,174 @@ async def ensure_books_fts(engine: AsyncEngine) -> None:
 
     async with engine.begin() as conn:
         try:
-            exists = (
+            create_sql = (
                 await conn.execute(
-                    text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='books_fts' LIMIT 1;")
+                    text("SELECT sql FROM sqlite_master WHERE type='table' AND name='books_fts' LIMIT 1;")
                 )
             ).scalar_one_or_none()
         except SQLAlchemyError:
             logger.exception("Не удалось проверить существование таблицы books_fts")
             raise
 
+        if create_sql is not None and _books_fts_is_current(create_sql):
+            return
+
+        try:
+            if create_sql is not None:
+                # Таблица старого формата (без префиксных индексов): пересоздаём, триггеры остаются прежними.
+                logger.info("Пересоздаю books_fts с prefix='%s', detail=%s", BOOKS_FTS_PREFIX, BOOKS_FTS_DETAIL)
+                await conn.execute(text("DROP TABLE books_fts;"))
+            else:
+                logger.info("Создаю FTS5 виртуальную таблицу books_fts (первый запуск на этой БД)")
+
+            await conn.execute(text(books_fts_ddl()))
+            await conn.execute(text("INSERT INTO books_fts(books_fts) VALUES('rebuild');"))
+
+            await conn.execute(
+                text("""
+                CREATE TRIGGER IF NOT EXISTS books_ai AFTER INSERT ON books BEGIN
+                  INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                END;
+            """)
+            )
+            await conn.execute(
+                text("""
+                CREATE TRIGGER IF NOT EXISTS books_ad AFTER DELETE ON books BEGIN
+                  INSERT INTO books_fts(books_fts, rowid, title, author) VALUES('delete', old.id, old.title, old.author);
+                END;
+            """)
+            )
+            await conn.execute(
+                text("""
+                CREATE TRIGGER IF NOT EXISTS books_au AFTER UPDATE ON books BEGIN
+                  INSERT INTO books_fts(books_fts, rowid, title, author) VALUES('delete', old.id, old.title, old.author);
+                  INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                END;
+            """)
+            )
+        except SQLAlchemyError:
+            logger.exception("Не удалось создать books_fts или триггеры FTS")
+            raise
+
+
+async def ensure_books_fts_trigram(engine: AsyncEngine) -> None:
+    """
+    Создаёт books_fts_trigram — FTS5 с tokenize='trigram' по тем же колонкам, что books_fts.
+
+    Нужна для поиска подстрокой из середины слова и поиска с опечатками (fallback SqliteFtsBookSearch,
+    когда books_fts ничего не нашёл). Синхронизируется с books собственными триггерами books_tri_*.
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("Инициализация trigram-FTS пропущена: dialect=%s", engine.dialect.name)
+        return
+
+    async with engine.begin() as conn:
+        try:
+            exists = (
+                await conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='books_fts_trigram' LIMIT 1;")
+                )
+            ).scalar_one_or_none()
+        except SQLAlchemyError:
+            logger.exception("Не удалось проверить существование таблицы books_fts_trigram")
+            raise
+
         if exists:
             return
 
-        logger.info("Создаю FTS5 виртуальную таблицу books_fts (первый запуск на этой БД)")
+        logger.info("Создаю FTS5 trigram-таблицу books_fts_trigram (первый запуск на этой БД)")
 
         try:
             await conn.execute(
                 text("""
-                CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                CREATE VIRTUAL TABLE IF NOT EXISTS books_fts_trigram USING fts5(
                     title,
                     author,
                     content='books',
-                    content_rowid='id'
+                    content_rowid='id',
+                    tokenize='trigram'
                 );
             """)
             )
-            await conn.execute(text("INSERT INTO books_fts(books_fts) VALUES('rebuild');"))
+            await conn.execute(text("INSERT INTO books_fts_trigram(books_fts_trigram) VALUES('rebuild');"))
 
             await conn.execute(
                 text("""
-                CREATE TRIGGER IF NOT EXISTS books_ai AFTER INSERT ON books BEGIN
-                  INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                CREATE TRIGGER IF NOT EXISTS books_tri_ai AFTER INSERT ON books BEGIN
+                  INSERT INTO books_fts_trigram(rowid, title, author) VALUES (new.id, new.title, new.author);
                 END;
             """)
             )
             await conn.execute(
                 text("""
-                CREATE TRIGGER IF NOT EXISTS books_ad AFTER DELETE ON books BEGIN
-                  INSERT INTO books_fts(books_fts, rowid, title, author) VALUES('delete', old.id, old.title, old.author);
+                CREATE TRIGGER IF NOT EXISTS books_tri_ad AFTER DELETE ON books BEGIN
+                  INSERT INTO books_fts_trigram(books_fts_trigram, rowid, title, author)
+                  VALUES('delete', old.id, old.title, old.author);
                 END;
             """)
             )
             await conn.execute(
                 text("""
-                CREATE TRIGGER IF NOT EXISTS books_au AFTER UPDATE ON books BEGIN
-                  INSERT INTO books_fts(books_fts, rowid, title, author) VALUES('delete', old.id, old.title, old.author);
-                  INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                CREATE TRIGGER IF NOT EXISTS books_tri_au AFTER UPDATE ON books BEGIN
+                  INSERT INTO books_fts_trigram(books_fts_trigram, rowid, title, author)
+                  VALUES('delete', old.id, old.title, old.author);
+                  INSERT INTO books_fts_trigram(rowid, title, author) VALUES (new.id, new.title, new.author);
                 END;
             """)
             )
         except SQLAlchemyError:
-            logger.exception("Не удалось создать books_fts или триггеры FTS")
+            logger.exception("Не удалось создать books_fts_trigram или её триггеры")
             raise
+
+
+BOOKS_FTS_TABLES = ("books_fts", "books_fts_trigram")
+
+
+async def optimize_books_fts(engine: AsyncEngine, *, table: str = "books_fts") -> None:
+    """
+    Сливает все сегменты FTS-таблицы (books_fts или books_fts_trigram) в один (FTS5 'optimize').
+
+    Одна длинная транзакция: на время работы БД заблокирована на запись.
+    Для постепенного слияния без долгой блокировки — merge_books_fts.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(f"INSERT INTO {_fts_table(table)}({table}) VALUES('optimize');"))
+
+
+async def merge_books_fts(
+    engine: AsyncEngine,
+    *,
+    table: str = "books_fts",
+    pages: int = 500,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Постепенно сливает сегменты FTS-таблицы (FTS5 'merge'): каждый шаг — отдельная короткая транзакция,
+    которая записывает примерно `pages` страниц. Шаги повторяются, пока слияние не перестанет менять индекс.
+
+    on_progress(шаг, записано_страниц_всего) вызывается после каждого шага. Возвращает число шагов.
+    """
+    steps = 0
+    written = 0
+    while True:
+        async with engine.begin() as conn:
+            before = (await conn.execute(text("SELECT total_changes();"))).scalar_one()
+            await conn.execute(
+                text(f"INSERT INTO {_fts_table(table)}({table}, rank) VALUES('merge', :pages);"),
+                # Отрицательное N на первом шаге сливает сегменты всех уровней, не дожидаясь порога usermerge.
+                {"pages": -pages if steps == 0 else pages},
+            )
+            changed = (await conn.execute(text("SELECT total_changes();"))).scalar_one() - before
+        steps += 1
+        written += changed
+        if on_progress is not None:
+            on_progress(steps, written)
+        # FTS5: если 'merge' почти ничего не записал (меньше 2 страниц), сливать больше нечего.
+        if changed < 2:
+            return steps
+
+
+def _fts_table(table: str) -> str:
+    if table not in BOOKS_FTS_TABLES:
+        raise ValueError(f"Unsupported FTS table: {table}")
+    return table
@@ -99,3 +99,64 @@ def _build_fts5_query_part(user_query: str | None, *, column: str | None) -> str
         return f"({' OR '.join(qualified_terms)})"
 
     return " AND ".join(_build_token_expr(token) for token in tokens)
+
+
+_TRIGRAM_LEN = 3
+
+
+def build_books_trigram_match_query(
+    *,
+    author: str | None = None,
+    title: str | None = None,
+    q: str | None = None,
+    fuzzy: bool = False,
+) -> str:
+    """
+    Собирает MATCH-запрос для books_fts_trigram (FTS5 с tokenize='trigram').
+
+    - fuzzy=False — поиск подстрокой: каждое слово (от 3 символов) должно встречаться в колонке
+      как подстрока, в любом месте слова («кунин» находит «Акунин»). Слова короче 3 символов пропускаются:
+      trigram-индекс их не различает.
+    - fuzzy=True — кандидаты для поиска с опечатками: OR по всем триграммам слов. Такой запрос находит
+      много лишнего, поэтому результат нужно дополнительно отфильтровать по сходству (см. SqliteFtsBookSearch).
+    """
+    parts: list[str] = []
+    for value, column in ((author, "author"), (title, "title"), (q, None)):
+        part = _build_trigram_query_part(value, column=column, fuzzy=fuzzy)
+        if part:
+            parts.append(part)
+
+    return (" OR " if fuzzy else " AND ").join(parts)
+
+
+def _build_trigram_query_part(user_query: str | None, *, column: str | None, fuzzy: bool) -> str:
+    tokens = [token.casefold() for token in _TOKEN_RE.findall(user_query or "") if len(token) >= _TRIGRAM_LEN]
+    if not tokens:
+        return ""
+
+    def _term(value: str) -> str:
+        quoted = '"' + value.replace('"', '""') + '"'
+        return quoted if column is None else f"{column}:{quoted}"
+
+    if fuzzy:
+        trigrams = sorted(
+            {
+                variant[i : i + _TRIGRAM_LEN]
+                for token in tokens
+                for variant in (token, token.replace(_CYRILLIC_YO, _CYRILLIC_E))
+                for i in range(len(variant) - _TRIGRAM_LEN + 1)
+            }
+        )
+        return " OR ".join(_term(trigram) for trigram in trigrams)
+
+    def _token_expr(token: str) -> str:
+        variants = {token, token.replace(_CYRILLIC_YO, _CYRILLIC_E), token.replace(_CYRILLIC_E, _CYRILLIC_YO)}
+        terms = [_term(v) for v in sorted(variants)]
+        return terms[0] if len(terms) == 1 else f"({' OR '.join(terms)})"
+
+    return " AND ".join(_token_expr(token) for token in tokens)
+
+
+def fold_query_tokens(value: str | None) -> list[str]:
+    """Слова пользовательского ввода в нижнем регистре и с `ё` → `е` (для сравнения строк в Python)."""
+    return [token.casefold().replace(_CYRILLIC_YO, _CYRILLIC_E) for token in _TOKEN_RE.findall(value or "")]
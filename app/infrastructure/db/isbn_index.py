@@ -0,0 +1,41 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .models.book_orm import ISBN_NORM_SQL
+
+
+logger = logging.getLogger(__name__)
+
+
+ISBN_INDEX = "ix_books_isbn_norm"
+
+
+async def ensure_books_isbn_index(engine: AsyncEngine) -> None:
+    """
+    Добавляет в `books` колонку `isbn_norm` (виртуальная, GENERATED ALWAYS AS ISBN_NORM_SQL) и индекс по ней.
+
+    Нужна точному поиску по ISBN (BookRepo.find_by_isbn) — `isbn` сам по себе не индексирован.
+    Виртуальная колонка не пересобирает таблицу и не требует триггеров: значение считается из `isbn`,
+    а индекс SQLite поддерживает сам. В BookORM колонки нет (её читает только find_by_isbn через
+    literal_column), поэтому и БД, созданная через create_all, получает её здесь.
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("Индекс ISBN пропущен: dialect=%s", engine.dialect.name)
+        return
+
+    async with engine.begin() as conn:
+        try:
+            # table_xinfo (а не table_info) показывает и вычисляемые колонки.
+            columns = {row[1] for row in (await conn.execute(text("PRAGMA table_xinfo(books);"))).all()}
+            if "isbn_norm" not in columns:
+                logger.info("Добавляю в books колонку isbn_norm и индекс %s (первый запуск на этой БД)", ISBN_INDEX)
+                await conn.execute(
+                    text(f"ALTER TABLE books ADD COLUMN isbn_norm TEXT GENERATED ALWAYS AS ({ISBN_NORM_SQL}) VIRTUAL;")
+                )
+            await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {ISBN_INDEX} ON books (isbn_norm);"))
+        except SQLAlchemyError:
+            logger.exception("Не удалось создать колонку isbn_norm или индекс %s", ISBN_INDEX)
+            raise
@@ -1,2 +1,4 @@
+from .archive_member_orm import ArchiveMemberORM  # noqa: F401
 from .base_model_orm import BaseORMModel  # noqa: F401
 from .book_orm import BookORM  # noqa: F401
+from .s3_object_orm import S3ObjectORM  # noqa: F401
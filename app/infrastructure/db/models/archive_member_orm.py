@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Text
+
+from .base_model_orm import BaseORMModel
+
+
+class ArchiveMemberORM(BaseORMModel):
+    """
+    Индекс файлов в zip-архивах книг (заполняет scripts/index_archives.py).
+
+    Запись действительна, пока у архива те же mtime и размер, что при сканировании.
+    """
+
+    __tablename__ = "archive_members"
+
+    archive = Column(Text, primary_key=True)
+    member = Column(Text, primary_key=True)
+    archive_mtime_ns = Column(Integer, nullable=False)
+    archive_size = Column(Integer, nullable=False)
+    # Смещение локального заголовка файла в архиве и всё, что нужно для распаковки без центрального каталога.
+    header_offset = Column(Integer, nullable=False)
+    compress_size = Column(Integer, nullable=False)
+    file_size = Column(Integer, nullable=False)
+    compress_type = Column(Integer, nullable=False)
+    crc = Column(Integer, nullable=False)
@@ -3,6 +3,12 @@ from sqlalchemy import Column, Float, Integer, Text
 from .base_model_orm import BaseORMModel
 
 
+# Нормализованный ISBN: без «ISBN», дефисов, пробелов и двоеточий, в верхнем регистре (как domain.util.normalize_isbn).
+# Колонка books.isbn_norm с этим выражением добавляется в БД (ensure_books_isbn_index), но в модель не входит:
+# скрипты, которые читают BookORM без lifespan, не должны падать на старой БД без этой колонки.
+ISBN_NORM_SQL = "replace(replace(replace(replace(upper(isbn), 'ISBN', ''), '-', ''), ' ', ''), ':', '')"
+
+
 class BookORM(BaseORMModel):
     __tablename__ = "books"
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Integer, Text
+
+from .base_model_orm import BaseORMModel
+
+
+class S3ObjectORM(BaseORMModel):
+    """Манифест загруженных в S3 объектов (см. infrastructure/storage/object_manifest.py)."""
+
+    __tablename__ = "s3_objects"
+
+    bucket = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    size = Column(Integer, nullable=False)
+    etag = Column(Text, nullable=False)
+    # Unix time (UTC) загрузки объекта: от него отсчитывается срок жизни объекта в бакете.
+    uploaded_at = Column(Float, nullable=False)
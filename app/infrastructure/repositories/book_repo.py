@@ -1,15 +1,24 @@
-import asyncio
-from typing import Any, Generic
+from typing import Generic
 
-from sqlalchemy import select
+from sqlalchemy import literal_column, select
 from sqlalchemy.exc import SQLAlchemyError
 
-from config.config import settings
 from domain.exceptions import RepositoryException
 from domain.models.base_domain_model import TDomain, TTypedDict
-from domain.models.book import BookDict, BookFields
-from infrastructure.search.books_index import build_books_search_query, ensure_books_index
-from infrastructure.search.es_client import elasticsearch_enabled, get_elasticsearch
+from domain.models.book import (
+    BookDict,
+    BookFields,
+    BookGroup,
+    BookGroupPage,
+    BookSearchCapabilities,
+    BookSearchCursorPage,
+    BookSearchFilters,
+    BookSearchPage,
+    BookSearchQuery,
+    BookSuggestion,
+)
+from infrastructure.db.catalog_snapshot import get_catalog_snapshot
+from infrastructure.search.backend import get_book_search_backend
 
 from ..db.models.base_model_orm import TOrm
 from .sqlalchemy_mixins import ListMixin, ReadMixin
@@ -27,34 +36,243 @@ class BookRepo(
         author: str | None = None,
         title: str | None = None,
         limit: int | None = None,
+        hydrate: bool | None = None,
     ) -> list[TDomain]:
-        try:
-            if not elasticsearch_enabled():
-                raise RepositoryException(
-                    "Поиск недоступен: не задан ELASTICSEARCH_URL (или он пуст). "
-                    "Подними Elasticsearch и задай переменную окружения."
-                )
+        """
+        Ищет книги движком SEARCH_BACKEND (Elasticsearch или SQLite FTS5) с сохранением порядка релевантности.
+
+        hydrate=None — режим из настроек: при ELASTICSEARCH_DENORMALIZED=true книги собираются прямо
+        из `_source` индекса (без запроса в БД), иначе полные записи подтягиваются из БД по id.
+        hydrate=True принудительно берёт данные из БД (для вызовов, которым важна консистентность с БД).
+        SQLite FTS5 возвращает полные строки books тем же запросом, поэтому hydrate на нём не влияет.
+        """
+        page = await self._search(q=q, author=author, title=title, limit=limit or 50, hydrate=hydrate, count=False)
+        return page.books  # type: ignore[return-value]
+
+    async def search_page(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchPage:
+        """
+        Поиск с подсчётом совпадений одним запросом (ES: `track_total_hits` = limit + 1, FTS5: LIMIT limit + 1).
+
+        Если совпадений больше limit, книги не собираются (ни `_source`, ни запроса в БД):
+        возвращается пустая страница с total > limit — этого достаточно для вердикта «слишком много».
+        filters сужают поиск точными genre/lang/year; facets=True добавляет их счётчики (и при total > limit).
+        """
+        return await self._search(
+            q=q,
+            author=author,
+            title=title,
+            limit=limit,
+            hydrate=hydrate,
+            count=True,
+            filters=filters,
+            facets=facets,
+        )
+
+    async def search_page_many(
+        self,
+        queries: list[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None = None,
+    ) -> list[BookSearchPage]:
+        """
+        Пакет поисков с подсчётом (как search_page на каждый запрос), страницы — в порядке queries.
+
+        Движок выполняет пакет одним обращением (ES `_msearch`), а книги всех запросов, которые не
+        превысили limit и пришли без `_source`, подтягиваются вместе: одним IN-запросом в БД по id.
+        """
+        batch = await get_book_search_backend().search_many(self.db, queries, limit=limit, hydrate=hydrate)
+
+        to_hydrate = [
+            book_id for hits in batch if hits["total"] <= limit and hits["sources"] is None for book_id in hits["ids"]
+        ]
+        hydrated = await self._hydrate_by_id(list(dict.fromkeys(to_hydrate)))
 
-            await ensure_books_index(self.db)
-            client = get_elasticsearch()
+        pages: list[BookSearchPage] = []
+        for hits in batch:
+            if hits["total"] > limit:
+                pages.append(BookSearchPage(total=hits["total"]))
+                continue
+            if hits["sources"] is not None:
+                books = await self._books(hits["ids"], hits["sources"])
+            else:
+                books = [hydrated[book_id] for book_id in hits["ids"] if book_id in hydrated]
+            pages.append(BookSearchPage(books=books, total=hits["total"]))  # type: ignore[arg-type]
+        return pages
+
+    async def search_pages(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        cursor: str | None = None,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorPage:
+        """
+        Постраничный поиск по курсору (keyset, без порога «слишком много»): cursor=None — первая страница,
+        дальше — `next_cursor` предыдущей страницы. Курсор несёт запрос, q/author/title при нём не нужны.
+        Повреждённый или устаревший курсор — SearchCursorError.
+        """
+        hits = await get_book_search_backend().search_after(
+            self.db,
+            q=q,
+            author=author,
+            title=title,
+            limit=limit,
+            cursor=cursor,
+            hydrate=hydrate,
+            filters=filters,
+        )
+        books = await self._books(hits["ids"], hits["sources"])
+        return BookSearchCursorPage(books=books, next_cursor=hits["next_cursor"])  # type: ignore[arg-type]
 
-            query = build_books_search_query(q=q, author=author, title=title)
-            resp: dict[str, Any] = await asyncio.to_thread(
-                client.search,
-                index=settings.ELASTICSEARCH_INDEX,
-                body={"query": query, "size": limit or 50, "_source": False},
+    async def search_groups(
+        self,
+        *,
+        q: str | None = None,
+        author: str | None = None,
+        title: str | None = None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None = None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookGroupPage:
+        """
+        Поиск, сгруппированный по произведениям (work_key): до limit групп, в каждой — до editions изданий.
+        Произведений больше limit — страница без групп с total (как search_page).
+        Издания всех групп без `_source` подтягиваются одним IN-запросом в БД.
+        """
+        hits = await get_book_search_backend().search_groups(
+            self.db,
+            q=q,
+            author=author,
+            title=title,
+            limit=limit,
+            editions=editions,
+            hydrate=hydrate,
+            filters=filters,
+        )
+        if hits["total"] > limit:
+            return BookGroupPage(total=hits["total"])
+
+        to_hydrate = [book_id for group in hits["groups"] if group["sources"] is None for book_id in group["ids"]]
+        hydrated = await self._hydrate_by_id(list(dict.fromkeys(to_hydrate)))
+
+        groups: list[BookGroup] = []
+        for group in hits["groups"]:
+            if group["sources"] is not None:
+                books = await self._books(group["ids"], group["sources"])
+            else:
+                books = [hydrated[book_id] for book_id in group["ids"] if book_id in hydrated]
+            if not books:
+                continue
+            groups.append(
+                BookGroup(
+                    author=books[0].author,  # type: ignore[attr-defined]
+                    title=books[0].title,  # type: ignore[attr-defined]
+                    editions=books,  # type: ignore[arg-type]
+                    editions_total=max(group["total"], len(books)),
+                )
             )
-            hits = resp.get("hits", {}).get("hits", [])
-            ids = [int(hit["_id"]) for hit in hits if "_id" in hit]
-            if not ids:
-                return []
-
-            # Тянем полные книги из БД по id и сохраняем порядок релевантности из Elasticsearch.
-            rows = (await self.db.execute(select(self.orm_class).where(self.orm_class.id.in_(ids)))).scalars().all()
-            by_id = {row.id: row for row in rows}
-            ordered = [by_id[i] for i in ids if i in by_id]
-            return [self.domain_model.model_validate(row) for row in ordered]
+        return BookGroupPage(groups=groups, total=hits["total"])
+
+    def search_capabilities(self) -> BookSearchCapabilities:
+        """Какие параметры поиска (фильтры, фасеты, группировка, курсор) поддерживает движок SEARCH_BACKEND."""
+        return get_book_search_backend().capabilities
+
+    async def suggest(self, prefix: str, *, limit: int) -> list[BookSuggestion]:
+        """Подсказки автодополнения (только id/author/title) — без гидратации книг из БД."""
+        hits = await get_book_search_backend().suggest(self.db, prefix=prefix, limit=limit)
+        return [BookSuggestion.model_validate(hit) for hit in hits]
+
+    async def find_by_isbn(self, isbns: list[str], *, limit: int) -> list[TDomain]:
+        """
+        Книги с точным ISBN (значения — как после normalize_isbn) по индексу ix_books_isbn_norm, без поискового
+        движка. Из индекса берутся только id, сами книги — из снимка каталога или БД (как при гидратации поиска).
+        Колонки isbn_norm нет в BookORM (её добавляет ensure_books_isbn_index), поэтому она указана по имени.
+        """
+        stmt = (
+            select(self.orm_class.id)
+            .where(literal_column("isbn_norm").in_(isbns))
+            .order_by(self.orm_class.id)
+            .limit(limit)
+        )
+        try:
+            ids = list((await self.db.execute(stmt)).scalars().all())
+            return await self._hydrate(ids)
+        except SQLAlchemyError as ex:
+            raise RepositoryException(str(ex))
+
+    async def _search(
+        self,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        hydrate: bool | None,
+        count: bool,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchPage:
+        hits = await get_book_search_backend().search(
+            self.db,
+            q=q,
+            author=author,
+            title=title,
+            limit=limit,
+            count=count,
+            hydrate=hydrate,
+            filters=filters,
+            facets=facets,
+        )
+        if hits["total"] > limit:
+            return BookSearchPage(total=hits["total"], facets=hits.get("facets"))
+
+        books = await self._books(hits["ids"], hits["sources"])
+        return BookSearchPage(books=books, total=hits["total"], facets=hits.get("facets"))  # type: ignore[arg-type]
+
+    async def _books(self, ids: list[int], sources: list[dict] | None) -> list[TDomain]:
+        try:
+            if sources is not None:
+                return [
+                    self.domain_model.model_validate({**source, "id": book_id}) for book_id, source in zip(ids, sources)
+                ]
+            return await self._hydrate(ids)
+        except SQLAlchemyError as ex:
+            raise RepositoryException(str(ex))
+
+    async def _hydrate(self, ids: list[int]) -> list[TDomain]:
+        by_id = await self._hydrate_by_id(ids)
+        return [by_id[i] for i in ids if i in by_id]
+
+    async def _hydrate_by_id(self, ids: list[int]) -> dict[int, TDomain]:
+        if not ids:
+            return {}
+
+        # Книги берём из снимка каталога, недостающие — из БД по id.
+        # Снимок — только для отображения найденного: read (в т.ч. экспорт с путём к файлу) всегда читает БД.
+        try:
+            snapshot = get_catalog_snapshot()
+            by_id: dict[int, object] = dict(snapshot.get_many(ids)) if snapshot is not None else {}
+            missing = [i for i in ids if i not in by_id]
+            if missing:
+                stmt = select(self.orm_class).where(self.orm_class.id.in_(missing))
+                rows = (await self.db.execute(stmt)).scalars().all()
+                by_id.update((row.id, row) for row in rows)
         except SQLAlchemyError as ex:
             raise RepositoryException(str(ex))
-        except Exception as ex:  # noqa: BLE001
-            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+        return {i: self.domain_model.model_validate(by_id[i]) for i in ids if i in by_id}
@@ -0,0 +1,156 @@
+from typing import Any, Iterable, NotRequired, Protocol, TypedDict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import settings
+from domain.models.book import BookSearchCapabilities, BookSearchFacets, BookSearchFilters, BookSearchQuery
+
+
+# Во сколько раз больше подсказок брать у движка: издания одной книги схлопываются уже после ответа.
+SUGGEST_OVERFETCH = 3
+
+
+class BookSearchHits(TypedDict):
+    # Сколько книг нашлось; при count=True подсчёт ограничен limit + 1.
+    total: int
+    # id найденных книг в порядке релевантности.
+    ids: list[int]
+    # Поля книг в том же порядке, если движок уже их вернул (иначе None — BookRepo подтянет книги из БД по ids).
+    sources: list[dict[str, Any]] | None
+    # Счётчики фасетов по всем совпадениям — только при search(facets=True).
+    facets: NotRequired[BookSearchFacets]
+
+
+class BookSearchCursorHits(TypedDict):
+    # id книг страницы в порядке релевантности.
+    ids: list[int]
+    # Поля книг в том же порядке или None (см. BookSearchHits.sources).
+    sources: list[dict[str, Any]] | None
+    # Непрозрачный курсор следующей страницы; None — страница последняя.
+    next_cursor: str | None
+
+
+class BookSearchGroupHits(TypedDict):
+    # Сколько произведений (групп изданий) нашлось.
+    total: int
+    # Группы по убыванию релевантности: total — изданий в группе, ids/sources — возвращённые издания.
+    groups: list[BookSearchHits]
+
+
+class BookSuggestHit(TypedDict):
+    id: int
+    author: str | None
+    title: str | None
+
+
+class BookSearchBackend(Protocol):
+    name: str
+    # Что движок умеет сверх простого поиска: по этому BookService отвергает неподдерживаемые параметры
+    # до обращения к движку (методы движка на них всё равно отвечают RepositoryException).
+    capabilities: BookSearchCapabilities
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        count: bool,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchHits:
+        """
+        Ищет книги и возвращает не больше limit результатов по убыванию релевантности.
+
+        filters — точные значения genre/lang/year; facets=True — ещё и счётчики этих полей по всем совпадениям.
+        Ошибки движка поднимаются как RepositoryException.
+        """
+        ...
+
+    async def search_many(
+        self,
+        db: AsyncSession,
+        queries: list[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None,
+    ) -> list[BookSearchHits]:
+        """
+        Пакет независимых поисков с подсчётом (как search(count=True)); результаты — в порядке queries.
+        Движок выполняет пакет одним обращением, если умеет (ES `_msearch`), иначе по очереди.
+        """
+        ...
+
+    async def search_groups(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchGroupHits:
+        """
+        Группированный поиск: не больше limit произведений (по `work_key`), в каждом до editions изданий.
+        Число произведений считается так же, как у search(count=True): выше limit книги не нужны.
+        """
+        ...
+
+    async def suggest(self, db: AsyncSession, *, prefix: str, limit: int) -> list[BookSuggestHit]:
+        """
+        Автодополнение: до limit книг, у которых автор или название начинается с prefix, — только id/author/title.
+        Издания одной книги (тот же автор и название) схлопываются в одну подсказку.
+        """
+        ...
+
+    async def search_after(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        cursor: str | None,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorHits:
+        """
+        Постраничный поиск по курсору (keyset): cursor=None — первая страница, иначе страница после курсора.
+        Курсор несёт и сам запрос, поэтому при cursor q/author/title/filters игнорируются.
+
+        Повреждённый или устаревший курсор — SearchCursorError.
+        """
+        ...
+
+
+def unique_suggestions(hits: Iterable[BookSuggestHit], limit: int) -> list[BookSuggestHit]:
+    """Оставляет первую подсказку на пару (автор, название) — издания одной книги не дублируют подсказки."""
+    unique: dict[tuple[str | None, str | None], BookSuggestHit] = {}
+    for hit in hits:
+        unique.setdefault((hit["author"], hit["title"]), hit)
+        if len(unique) >= limit:
+            break
+    return list(unique.values())
+
+
+def get_book_search_backend() -> BookSearchBackend:
+    """Движок поиска книг по настройке SEARCH_BACKEND."""
+    if settings.SEARCH_BACKEND == "sqlite_fts":
+        from .fts_backend import sqlite_fts_backend
+
+        return sqlite_fts_backend
+    if settings.SEARCH_BACKEND == "memory":
+        from .memory_backend import memory_backend
+
+        return memory_backend
+
+    from .es_backend import elasticsearch_backend
+
+    return elasticsearch_backend
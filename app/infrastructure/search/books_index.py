@@ -1,20 +1,88 @@
 import asyncio
+import contextlib
+from datetime import datetime, timezone
+import logging
+import time
 from typing import Any
 
-from elasticsearch.helpers import bulk
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from config.config import settings
+from infrastructure.db.db import sessionmanager
+from infrastructure.db.es_changelog import pause_books_es_sync, resume_books_es_sync
+from infrastructure.db.fts_query import fold_query_tokens
 from infrastructure.db.models.book_orm import BookORM
 
-from .es_client import get_elasticsearch
+from .bulk_indexer import ProgressCallback, parallel_bulk_index
+from .es_client import es_call, get_elasticsearch
 
 
+logger = logging.getLogger(__name__)
+
+
+# Поля книги, которые в денормализованном режиме (ELASTICSEARCH_DENORMALIZED) хранятся в _source индекса.
+BOOK_SOURCE_FIELDS = ("author", "title", "genre", "lang", "year", "file_size_mb", "archive_name", "file_name")
+# Поля-фасеты: keyword-поля индекса для точных фильтров (bool.filter) и счётчиков (terms-агрегации).
+BOOK_FACET_FIELDS = ("genre", "lang", "year")
+# Версия маппинга индекса (хранится в `_meta.mapping_version`). Повышать при изменении полей, которые нужны
+# запросам: индекс со старой версией перестраивается (или приложение не стартует, см. _check_books_index).
+# 2 — поля work_key (группировка), фасеты genre/lang/year и completion-поле suggest.
+BOOKS_INDEX_MAPPING_VERSION = 2
+
 _index_lock = asyncio.Lock()
+# Готовность индекса кэшируется на процесс: после первого успешного ensure_books_index
+# поиск не делает служебных запросов к ES (indices.exists/count) и не берёт _index_lock.
+_index_ready = False
+# Идёт фоновая первичная загрузка пустого индекса (start_books_auto_index): поиск не ждёт её на _index_lock.
+_auto_index_running = False
+# Маппинг индекса за алиасом старее BOOKS_INDEX_MAPPING_VERSION: вместо дозагрузки нужна переиндексация.
+_index_outdated = False
+# Фоновая загрузка/переиндексация (start_books_auto_index); lifespan отменяет её через stop_books_auto_index.
+_auto_index_task: asyncio.Task[None] | None = None
+# Поколение данных индекса: растёт при каждом изменении содержимого (переиндексация, синхронизация правок).
+# По нему сбрасывается кэш результатов поиска (infrastructure/cache/search_cache.py).
+_index_generation = 0
+# Индексы за алиасом при последней проверке (см. refresh_books_index_generation).
+_alias_snapshot: tuple[str, ...] | None = None
+
+
+def books_index_ready() -> bool:
+    return _index_ready
+
+
+def books_index_generation() -> int:
+    return _index_generation
+
+
+def bump_books_index_generation() -> None:
+    """Отмечает, что содержимое индекса изменилось (результаты поиска из кэша больше не актуальны)."""
+    global _index_generation
+    _index_generation += 1
+
+
+class BooksIndexOutdatedError(RuntimeError):
+    """Маппинг индекса книг старее BOOKS_INDEX_MAPPING_VERSION, а автоиндексация выключена."""
+
+
+def invalidate_books_index() -> None:
+    """
+    Сбрасывает закэшированную готовность индекса.
+
+    Вызывать после удаления/пересоздания индекса: следующий поиск снова выполнит ensure_books_index.
+    """
+    global _index_ready
+    _index_ready = False
+    bump_books_index_generation()
 
 
-def build_books_search_query(*, q: str | None, author: str | None, title: str | None) -> dict[str, Any]:
+def build_books_search_query(
+    *,
+    q: str | None,
+    author: str | None,
+    title: str | None,
+    filters: dict[str, str] | None = None,
+) -> dict[str, Any]:
     """
     Строит Query DSL для поиска книг (as-you-type + русская нормализация).
 
@@ -22,6 +90,9 @@ def build_books_search_query(*, q: str | None, author: str | None, title: str |
     - поддержка префиксного поиска по термам (type-ahead);
     - AND-логика по словам внутри одного параметра;
     - возможность комбинировать author/title/q.
+
+    filters — точные значения фасетов (BOOK_FACET_FIELDS): идут в `bool.filter` как `term`, не влияют на
+    релевантность и кэшируются ES как битсеты, поэтому сужение широкого запроса почти бесплатно.
     """
 
     def _bool_prefix(fields: list[str], query: str) -> dict[str, Any]:
@@ -55,7 +126,47 @@ def build_books_search_query(*, q: str | None, author: str | None, title: str |
     if title:
         must.append(_bool_prefix(["title", "title._2gram", "title._3gram"], title))
 
-    return {"bool": {"must": must}} if must else {"match_none": {}}
+    if not must:
+        return {"match_none": {}}
+    query: dict[str, Any] = {"bool": {"must": must}}
+    if filters:
+        query["bool"]["filter"] = [{"term": {field: value}} for field, value in filters.items()]
+    return query
+
+
+def build_books_facets_aggs(size: int) -> dict[str, Any]:
+    """terms-агрегации по полям-фасетам: до size самых частых значений каждого поля по всем совпадениям."""
+    return {field: {"terms": {"field": field, "size": size}} for field in BOOK_FACET_FIELDS}
+
+
+def book_work_key(author: str | None, title: str | None) -> str:
+    """
+    Ключ произведения для группировки изданий (поле `work_key`, collapse в группированном поиске).
+
+    Автор и название сворачиваются как в fts_query.py (регистр, `ё`/`е`, пунктуация не различаются);
+    слова имени автора сортируются, поэтому «Акунин Борис» и «Борис Акунин» — одно произведение.
+    """
+    author_key = " ".join(sorted(fold_query_tokens(author)))
+    title_key = " ".join(fold_query_tokens(title))
+    return f"{author_key}|{title_key}"
+
+
+def book_suggest_inputs(author: str | None, title: str | None) -> list[str]:
+    """
+    Входы completion-поля `suggest` (автодополнение /books/suggest): название, автор и автор с именем впереди.
+
+    Completion-подсказчик сопоставляет префикс с началом входа, поэтому для автора из двух-трёх слов
+    добавляются перестановки: «Акунин Борис» находится и по «аку», и по «бор».
+    """
+    inputs: list[str] = []
+    for value in (title, author):
+        value = " ".join((value or "").split())
+        if value:
+            inputs.append(value)
+    words = (author or "").split()
+    if 2 <= len(words) <= 3:
+        inputs.extend(" ".join(words[i:] + words[:i]) for i in range(1, len(words)))
+    return list(dict.fromkeys(inputs))
 
 
 def _books_index_body() -> dict[str, Any]:
@@ -85,76 +196,383 @@ def _books_index_body() -> dict[str, Any]:
                         "char_filter": ["yo_mapping"],
                         "tokenizer": "standard",
                         "filter": ["lowercase", "russian_stop", "russian_stemmer"],
-                    }
+                    },
+                    # Для completion-поля: без стемминга и стоп-слов, иначе префикс «в» или «война» потеряется.
+                    "suggest_text": {
+                        "type": "custom",
+                        "char_filter": ["yo_mapping"],
+                        "tokenizer": "standard",
+                        "filter": ["lowercase"],
+                    },
                 },
             },
         },
         "mappings": {
-            "properties": {
-                "id": {"type": "integer"},
-                "author": {"type": "search_as_you_type", "analyzer": "ru_text"},
-                "title": {"type": "search_as_you_type", "analyzer": "ru_text"},
-            }
+            "_meta": {"mapping_version": BOOKS_INDEX_MAPPING_VERSION},
+            "properties": _books_index_properties(),
         },
     }
 
 
+def _books_index_properties() -> dict[str, Any]:
+    properties: dict[str, Any] = {
+        "id": {"type": "integer"},
+        "author": {"type": "search_as_you_type", "analyzer": "ru_text"},
+        "title": {"type": "search_as_you_type", "analyzer": "ru_text"},
+        # Ключ произведения (book_work_key): по нему группированный поиск схлопывает издания.
+        "work_key": {"type": "keyword"},
+        # Фасеты: точные фильтры и счётчики (doc_values нужны terms-агрегациям).
+        **{field: {"type": "keyword"} for field in BOOK_FACET_FIELDS},
+        # Автодополнение (book_suggest_inputs): FST в памяти узла, префикс ищется без обхода документов.
+        "suggest": {"type": "completion", "analyzer": "suggest_text"},
+    }
+    if settings.ELASTICSEARCH_DENORMALIZED:
+        # Поля для отображения: хранятся только в _source, по ним не ищем.
+        stored_only = {"type": "keyword", "index": False, "doc_values": False}
+        properties.update(
+            {
+                "archive_name": stored_only,
+                "file_name": stored_only,
+                "file_size_mb": {"type": "float", "index": False, "doc_values": False},
+            }
+        )
+    return properties
+
+
+def book_index_source(row: Any) -> dict[str, Any]:
+    """Документ индекса книг из строки, выбранной по books_index_columns (загрузка и синхронизация правок)."""
+    source: dict[str, Any] = {
+        "id": int(row.id),
+        "author": row.author or "",
+        "title": row.title or "",
+        "work_key": book_work_key(row.author, row.title),
+        **{field: getattr(row, field) for field in BOOK_FACET_FIELDS},
+        "suggest": book_suggest_inputs(row.author, row.title),
+    }
+    if settings.ELASTICSEARCH_DENORMALIZED:
+        source.update({field: getattr(row, field) for field in BOOK_SOURCE_FIELDS if field not in source})
+    return source
+
+
+def books_index_columns() -> list[Any]:
+    """Колонки books, нужные для документа индекса (с учётом ELASTICSEARCH_DENORMALIZED)."""
+    base = ("id", "author", "title", *BOOK_FACET_FIELDS)
+    columns = [getattr(BookORM, field) for field in base]
+    if settings.ELASTICSEARCH_DENORMALIZED:
+        columns += [getattr(BookORM, field) for field in BOOK_SOURCE_FIELDS if field not in base]
+    return columns
+
+
 async def ensure_books_index(session: AsyncSession) -> None:
     """
     Создаёт индекс книг при необходимости и (опционально) индексирует данные из БД, если индекс пуст.
 
     Важно: индексирование происходит из переданной SQLAlchemy-сессии, чтобы в тестах
     работала in-memory БД через dependency override.
+
+    Пока идёт фоновая первичная загрузка (start_books_auto_index), возвращается сразу:
+    поиск работает по уже загруженной части индекса, а не ждёт окончания загрузки.
+    Устаревший маппинг запрос тоже не перестраивает сам: переиндексация запускается фоновой задачей,
+    а поиск до переключения алиаса идёт по старому индексу.
+
+    После успешного выполнения результат кэшируется на процесс (см. books_index_ready/invalidate_books_index).
     """
-    if not settings.ELASTICSEARCH_URL:
+    global _index_ready
+    if not settings.ELASTICSEARCH_URL or _index_ready or _auto_index_running:
         return
 
+    async with _index_lock:
+        if _index_ready:
+            return
+        if not await _check_books_index():
+            return
+        if _index_outdated:
+            start_books_auto_index()
+            return
+        await _fill_books_index(session)
+
+
+async def _check_books_index() -> bool:
+    """
+    Создаёт индекс, если его нет, и решает, нужна ли первичная загрузка.
+
+    Возвращает True, если индекс пуст или его маппинг устарел (версия в `_meta` ниже
+    BOOKS_INDEX_MAPPING_VERSION) и включена ELASTICSEARCH_AUTO_INDEX; иначе отмечает индекс готовым.
+    Устаревший маппинг при выключенной автоиндексации — BooksIndexOutdatedError: без новых полей
+    группировка, фасеты и подсказки не работают, пока индекс не перестроят scripts/reindex_books.py.
+    Вызывать под _index_lock.
+    """
+    global _index_ready, _index_outdated
     client = get_elasticsearch()
     index = settings.ELASTICSEARCH_INDEX
 
-    async with _index_lock:
-        exists = await asyncio.to_thread(client.indices.exists, index=index)
-        if not exists:
-            await asyncio.to_thread(client.indices.create, index=index, body=_books_index_body())
+    exists = await es_call(client.indices.exists, index=index)
+    if not exists:
+        # ELASTICSEARCH_INDEX — алиас над версионированным индексом (см. reindex_books).
+        body = _books_index_body()
+        body["aliases"] = {index: {}}
+        await es_call(client.indices.create, index=_versioned_index_name(index), body=body)
+    else:
+        version = await _books_mapping_version(index)
+        if version < BOOKS_INDEX_MAPPING_VERSION:
+            if not settings.ELASTICSEARCH_AUTO_INDEX:
+                raise BooksIndexOutdatedError(
+                    f"Индекс {index}: версия маппинга {version}, нужна {BOOKS_INDEX_MAPPING_VERSION}. "
+                    "Перестрой индекс: python scripts/reindex_books.py"
+                )
+            logger.warning(
+                "Индекс %s: версия маппинга %d, нужна %d — перестраиваю индекс",
+                index,
+                version,
+                BOOKS_INDEX_MAPPING_VERSION,
+            )
+            _index_outdated = True
+            return True
 
-        if not settings.ELASTICSEARCH_AUTO_INDEX:
-            return
+    if not settings.ELASTICSEARCH_AUTO_INDEX:
+        _index_ready = True
+        return False
 
-        try:
-            count_resp = await asyncio.to_thread(client.count, index=index)
-            docs_count = int(count_resp.get("count", 0))
-        except Exception:  # noqa: BLE001
-            # Если count упал (например, из-за race/cluster state), не пытаемся автоиндексировать.
-            return
+    try:
+        count_resp = await es_call(client.count, index=index)
+        docs_count = int(count_resp.get("count", 0))
+    except Exception:  # noqa: BLE001
+        # Если count упал (например, из-за race/cluster state), не пытаемся автоиндексировать.
+        return False
 
-        if docs_count > 0:
-            return
+    if docs_count > 0:
+        _index_ready = True
+        return False
+    return True
 
-        stmt = select(BookORM.id, BookORM.author, BookORM.title)
-        result = await session.stream(stmt)
-
-        batch: list[dict[str, Any]] = []
-        async for row in result:
-            batch.append(
-                {
-                    "_op_type": "index",
-                    "_index": index,
-                    "_id": str(row.id),
-                    "_source": {
-                        "id": int(row.id),
-                        "author": row.author or "",
-                        "title": row.title or "",
-                    },
-                }
+
+async def _books_mapping_version(index: str) -> int:
+    """Наименьшая версия маппинга среди индексов за алиасом; индексы без `_meta.mapping_version` — версия 1."""
+    resp = await es_call(get_elasticsearch().indices.get_mapping, index=index)
+    versions = [int(body["mappings"].get("_meta", {}).get("mapping_version", 1)) for body in resp.values()]
+    return min(versions, default=1)
+
+
+async def _fill_books_index(session: AsyncSession) -> None:
+    global _index_ready, _index_outdated
+    index = settings.ELASTICSEARCH_INDEX
+    if _index_outdated:
+        # Новые поля нельзя заполнить в старом индексе: blue/green-переиндексация, поиск пока идёт по старому.
+        await reindex_books(session, sync_engine=sessionmanager.engine)
+        _index_outdated = False
+    else:
+        await _index_books_from_db(session, index)
+        await es_call(get_elasticsearch().indices.refresh, index=index)
+    _index_ready = True
+
+
+async def _index_books_from_db(
+    session: AsyncSession,
+    index: str,
+    *,
+    on_progress: ProgressCallback | None = None,
+) -> int:
+    stats = await parallel_bulk_index(
+        await session.stream(select(*books_index_columns())),
+        lambda row: {
+            "_op_type": "index",
+            "_index": index,
+            "_id": str(row.id),
+            "_source": book_index_source(row),
+        },
+        workers=settings.ELASTICSEARCH_BULK_WORKERS,
+        chunk_docs=settings.ELASTICSEARCH_BULK_CHUNK_DOCS,
+        chunk_bytes=settings.ELASTICSEARCH_BULK_CHUNK_BYTES,
+        on_progress=on_progress,
+    )
+    return stats["docs"]
+
+
+async def index_all_books(session: AsyncSession, *, on_progress: ProgressCallback | None = None) -> int:
+    """
+    Полная загрузка книг из БД в текущий индекс (алиас ELASTICSEARCH_INDEX) без пересоздания.
+
+    Документы перезаписываются по id, поэтому повторный запуск безопасен. Индекс создаётся, если его нет.
+    """
+    client = get_elasticsearch()
+    index = settings.ELASTICSEARCH_INDEX
+    if not await es_call(client.indices.exists, index=index):
+        body = _books_index_body()
+        body["aliases"] = {index: {}}
+        await es_call(client.indices.create, index=_versioned_index_name(index), body=body)
+
+    indexed = await _index_books_from_db(session, index, on_progress=on_progress)
+    await es_call(client.indices.refresh, index=index)
+    bump_books_index_generation()
+    return indexed
+
+
+def _versioned_index_name(alias: str) -> str:
+    return f"{alias}-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}"
+
+
+async def _alias_targets(alias: str) -> tuple[list[str], bool]:
+    """
+    Возвращает (индексы за алиасом, признак «имя алиаса занято обычным индексом»).
+
+    Второе бывает на инсталляциях, созданных до перехода на алиасы: тогда при переключении
+    старый индекс удаляется в том же атомарном update_aliases (remove_index).
+    """
+    client = get_elasticsearch()
+    if await es_call(client.indices.exists_alias, name=alias):
+        resp = await es_call(client.indices.get_alias, name=alias)
+        return sorted(resp.keys()), False
+    return [], bool(await es_call(client.indices.exists, index=alias))
+
+
+async def refresh_books_index_generation() -> None:
+    """
+    Сверяет индексы за алиасом ELASTICSEARCH_INDEX с последней проверкой и при смене поднимает поколение.
+
+    Нужна, чтобы кэш поиска сбрасывался и после переиндексации, запущенной другим процессом
+    (scripts/reindex_books.py). Вызывается фоновой синхронизацией (index_sync.py).
+    """
+    global _alias_snapshot
+    targets, _ = await _alias_targets(settings.ELASTICSEARCH_INDEX)
+    snapshot = tuple(targets)
+    if _alias_snapshot is not None and snapshot != _alias_snapshot:
+        logger.info("Индекс за алиасом %s сменился: %s", settings.ELASTICSEARCH_INDEX, ", ".join(snapshot))
+        bump_books_index_generation()
+    _alias_snapshot = snapshot
+
+
+async def reindex_books(
+    session: AsyncSession,
+    *,
+    keep_old: bool = False,
+    on_progress: ProgressCallback | None = None,
+    sync_engine: AsyncEngine | None = None,
+) -> str:
+    """
+    Blue/green-переиндексация: строит новый версионированный индекс и атомарно переключает на него
+    алиас ELASTICSEARCH_INDEX. Поиск всё это время продолжает работать по старому индексу.
+
+    Шаги: создание индекса с refresh_interval=-1 и 0 реплик → bulk-загрузка из БД →
+    восстановление настроек → refresh + force-merge до одного сегмента → переключение алиаса.
+    Возвращает имя нового индекса.
+
+    sync_engine — БД с журналом изменений (es_changelog): на время сборки фоновая синхронизация
+    ставится на паузу, а после переключения алиаса применяет накопленные правки уже к новому индексу.
+    """
+    client = get_elasticsearch()
+    alias = settings.ELASTICSEARCH_INDEX
+    new_index = _versioned_index_name(alias)
+
+    body = _books_index_body()
+    live_settings = {
+        "refresh_interval": body["settings"].get("refresh_interval"),
+        "number_of_replicas": body["settings"]["number_of_replicas"],
+    }
+    body["settings"] = {**body["settings"], "refresh_interval": "-1", "number_of_replicas": 0}
+
+    paused = sync_engine is not None and await pause_books_es_sync(sync_engine, reason=f"reindex {new_index}")
+    try:
+        logger.info("Reindex: создаю индекс %s", new_index)
+        await es_call(client.indices.create, index=new_index, body=body)
+        try:
+            indexed = await _index_books_from_db(session, new_index, on_progress=on_progress)
+            logger.info("Reindex: загружено %d книг в %s", indexed, new_index)
+
+            # refresh_interval=None сбрасывает настройку к значению ES по умолчанию.
+            await es_call(client.indices.put_settings, index=new_index, settings={"index": live_settings})
+            await es_call(client.indices.refresh, index=new_index)
+            await es_call(
+                client.options(request_timeout=3600).indices.forcemerge,
+                index=new_index,
+                max_num_segments=1,
             )
-            if len(batch) >= 500:
-                await asyncio.to_thread(bulk, client, batch, refresh=False)
-                batch.clear()
 
-        if batch:
-            await asyncio.to_thread(bulk, client, batch, refresh=False)
+            old_indices, alias_is_index = await _alias_targets(alias)
+            actions: list[dict[str, Any]] = [{"add": {"index": new_index, "alias": alias}}]
+            actions += [{"remove": {"index": old, "alias": alias}} for old in old_indices]
+            if alias_is_index:
+                actions.append({"remove_index": {"index": alias}})
+            await es_call(client.indices.update_aliases, actions=actions)
+        except Exception:
+            logger.exception("Reindex: ошибка, удаляю недостроенный индекс %s", new_index)
+            await es_call(client.indices.delete, index=new_index, ignore_unavailable=True)
+            raise
+    finally:
+        # Алиас уже указывает на новый индекс (или сборка откатилась): накопленные правки применит синхронизация.
+        if sync_engine is not None and paused:
+            await resume_books_es_sync(sync_engine)
+
+    logger.info("Reindex: алиас %s переключён на %s (было: %s)", alias, new_index, old_indices or alias)
+    invalidate_books_index()
+
+    if not keep_old and old_indices:
+        await es_call(client.indices.delete, index=",".join(old_indices), ignore_unavailable=True)
+    return new_index
+
+
+async def warm_up_books_index() -> bool:
+    """
+    Readiness-проверка индекса один раз при старте процесса (lifespan): создаёт индекс, если его нет,
+    но сам каталог не загружает — на большом каталоге это задержало бы старт приложения.
+
+    Возвращает True, если индекс пуст или устарел и его нужно заполнить (start_books_auto_index).
+    Ошибка не валит старт приложения: готовность остаётся несброшенной,
+    и ensure_books_index повторится при первом поиске. Исключение — BooksIndexOutdatedError:
+    с устаревшим маппингом и выключенной автоиндексацией приложение не стартует.
+    """
+    if not settings.ELASTICSEARCH_URL:
+        return False
+    try:
+        async with _index_lock:
+            if _index_ready:
+                return False
+            return await _check_books_index()
+    except BooksIndexOutdatedError:
+        raise
+    except Exception:  # noqa: BLE001
+        logger.exception("Не удалось подготовить индекс книг при старте; повторю при первом поиске")
+        return False
+
+
+def start_books_auto_index() -> asyncio.Task[None]:
+    """
+    Запускает первичную загрузку пустого индекса из БД (или переиндексацию устаревшего) фоновой задачей
+    (см. warm_up_books_index).
+
+    Пока она идёт, поиск не ждёт её и видит уже загруженную часть каталога; по окончании индекс
+    отмечается готовым. Задачу останавливает lifespan (stop_books_auto_index при завершении приложения).
+    """
+    global _auto_index_running, _auto_index_task
+    _auto_index_running = True
+    _auto_index_task = asyncio.create_task(_run_books_auto_index(), name="books-auto-index")
+    return _auto_index_task
+
+
+async def stop_books_auto_index() -> None:
+    """Отменяет фоновую загрузку/переиндексацию, если она идёт (при остановке приложения)."""
+    global _auto_index_task
+    task, _auto_index_task = _auto_index_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
 
-        await asyncio.to_thread(client.indices.refresh, index=index)
+async def _run_books_auto_index() -> None:
+    global _auto_index_running
+    started = time.monotonic()
+    try:
+        async with _index_lock:
+            if not _index_ready:
+                async with sessionmanager.session() as session:
+                    await _fill_books_index(session)
+        logger.info("Автоиндексация книг завершена за %.1f сек.", time.monotonic() - started)
+    except asyncio.CancelledError:
+        raise
+    except Exception:  # noqa: BLE001
+        logger.exception("Автоиндексация книг не удалась; повторю при первом поиске")
+    finally:
+        _auto_index_running = False
 
 
 async def delete_books_index_if_exists() -> None:
@@ -162,5 +580,8 @@ async def delete_books_index_if_exists() -> None:
         return
     client = get_elasticsearch()
     index = settings.ELASTICSEARCH_INDEX
-    if await asyncio.to_thread(client.indices.exists, index=index):
-        await asyncio.to_thread(client.indices.delete, index=index)
+    if await es_call(client.indices.exists, index=index):
+        # Удаление по имени алиаса ES запрещает — удаляем индексы, на которые он указывает.
+        resp = await es_call(client.indices.get, index=index)
+        await es_call(client.indices.delete, index=",".join(resp.keys()))
+    invalidate_books_index()
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterable, Callable, TypedDict
+
+from .es_client import es_bulk, get_elasticsearch
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkIndexStats(TypedDict):
+    docs: int
+    chunks: int
+    elapsed_s: float
+    docs_per_s: float
+
+
+ProgressCallback = Callable[[BulkIndexStats], None]
+
+
+async def parallel_bulk_index(
+    rows: AsyncIterable[Any],
+    to_action: Callable[[Any], dict[str, Any]],
+    *,
+    workers: int = 4,
+    chunk_docs: int = 500,
+    chunk_bytes: int = 5 * 1024 * 1024,
+    max_retries: int = 5,
+    initial_backoff_s: float = 2.0,
+    on_progress: ProgressCallback | None = None,
+    progress_every_s: float = 5.0,
+) -> BulkIndexStats:
+    """
+    Конвейерная bulk-загрузка в Elasticsearch: чтение строк (например, session.stream) идёт параллельно
+    с отправкой — чанки через ограниченную очередь разбирают `workers` конкурентных bulk-воркеров.
+
+    - Чанк закрывается по числу документов (chunk_docs) или по размеру тела (chunk_bytes), что наступит раньше.
+    - 429 (Too Many Requests) ретраится с экспоненциальной паузой (max_retries, initial_backoff_s) —
+      это делает bulk-хелпер elasticsearch; остальные ошибки прерывают загрузку.
+    - Очередь ограничена 2 × workers чанками, поэтому память не растёт, если ES не успевает.
+    """
+    if workers < 1:
+        raise ValueError("workers должен быть >= 1")
+
+    client = get_elasticsearch()
+    queue: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(maxsize=workers * 2)
+    started = time.perf_counter()
+    last_report = started
+    docs = 0
+    chunks = 0
+
+    def _stats() -> BulkIndexStats:
+        elapsed = time.perf_counter() - started
+        return BulkIndexStats(
+            docs=docs,
+            chunks=chunks,
+            elapsed_s=elapsed,
+            docs_per_s=docs / elapsed if elapsed > 0 else 0.0,
+        )
+
+    async def _worker() -> None:
+        nonlocal docs, chunks, last_report
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            await es_bulk(
+                client,
+                chunk,
+                chunk_size=len(chunk),
+                max_chunk_bytes=chunk_bytes,
+                max_retries=max_retries,
+                initial_backoff=initial_backoff_s,
+                refresh=False,
+            )
+            docs += len(chunk)
+            chunks += 1
+            now = time.perf_counter()
+            if on_progress is not None and now - last_report >= progress_every_s:
+                last_report = now
+                on_progress(_stats())
+
+    async def _reader() -> None:
+        chunk: list[dict[str, Any]] = []
+        size = 0
+        async for row in rows:
+            action = to_action(row)
+            # Оценка размера строки bulk-тела: заголовок действия + документ.
+            action_size = len(json.dumps(action.get("_source", {}), ensure_ascii=False).encode("utf-8")) + 64
+            if chunk and (len(chunk) >= chunk_docs or size + action_size > chunk_bytes):
+                await queue.put(chunk)
+                chunk, size = [], 0
+            chunk.append(action)
+            size += action_size
+        if chunk:
+            await queue.put(chunk)
+        for _ in range(workers):
+            await queue.put(None)
+
+    worker_tasks = [asyncio.create_task(_worker()) for _ in range(workers)]
+    reader_task = asyncio.create_task(_reader())
+    try:
+        await asyncio.gather(reader_task, *worker_tasks)
+    except BaseException:
+        for task in (reader_task, *worker_tasks):
+            task.cancel()
+        await asyncio.gather(reader_task, *worker_tasks, return_exceptions=True)
+        raise
+
+    stats = _stats()
+    logger.info(
+        "Bulk-индексация завершена: %d документов, %d чанков за %.1f сек. (%.0f док/сек)",
+        stats["docs"],
+        stats["chunks"],
+        stats["elapsed_s"],
+        stats["docs_per_s"],
+    )
+    return stats
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from config.config import settings
+from infrastructure.db.catalog_version import read_books_catalog_version
+from infrastructure.db.db import sessionmanager
+
+from .books_index import bump_books_index_generation
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_books_catalog_watch(*, interval_s: float | None = None) -> None:
+    """
+    Фоновая задача для режимов без Elasticsearch: следит за счётчиком правок каталога
+    (`books_catalog_version`, поднимается триггерами на `books`) и при его изменении поднимает
+    поколение индекса — кэш поиска сбрасывается, и результаты не устаревают на весь SEARCH_CACHE_TTL_S.
+
+    В режиме elasticsearch эту роль играет синхронизация индекса (index_sync.py).
+    Останавливается отменой задачи (см. lifespan в main.py).
+    """
+    interval = settings.SEARCH_CACHE_CATALOG_POLL_S if interval_s is None else interval_s
+    seen: int | None = None
+
+    while True:
+        try:
+            async with sessionmanager.session() as session:
+                version = await read_books_catalog_version(session)
+            if seen is not None and version != seen:
+                logger.debug("Каталог книг изменился (версия %d → %d), сбрасываю кэш поиска", seen, version)
+                bump_books_index_generation()
+            seen = version
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("Не удалось проверить версию каталога книг; повторю через %.1f сек.", interval)
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,489 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+from typing import Any
+
+from elasticsearch import NotFoundError as ElasticsearchNotFoundError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import settings
+from domain.exceptions import RepositoryException, SearchCursorError
+from domain.models.book import (
+    BookFacetValue,
+    BookSearchCapabilities,
+    BookSearchFacets,
+    BookSearchFilters,
+    BookSearchQuery,
+)
+
+from .backend import (
+    SUGGEST_OVERFETCH,
+    BookSearchCursorHits,
+    BookSearchGroupHits,
+    BookSearchHits,
+    BookSuggestHit,
+    unique_suggestions,
+)
+from .books_index import (
+    BOOK_FACET_FIELDS,
+    BOOK_SOURCE_FIELDS,
+    books_index_ready,
+    build_books_facets_aggs,
+    build_books_search_query,
+    ensure_books_index,
+    invalidate_books_index,
+)
+from .es_client import elasticsearch_enabled, es_call, get_elasticsearch
+
+
+logger = logging.getLogger(__name__)
+
+_CURSOR_VERSION = 2
+# Ключ подписи курсоров, если SEARCH_CURSOR_SECRET не задан: курсор действителен только в этом процессе.
+_PROCESS_CURSOR_KEY = secrets.token_bytes(32)
+# Постраничный поиск по PIT: сортировка по релевантности, _shard_doc — уникальный tiebreaker для search_after.
+_PAGE_SORT = [{"_score": {"order": "desc"}}, {"_shard_doc": {"order": "asc"}}]
+# Сколько самых частых значений каждого фасета (genre/lang/year) возвращать.
+_FACET_SIZE = 20
+
+
+class ElasticsearchBookSearch:
+    """
+    Поиск книг в Elasticsearch (алиас ELASTICSEARCH_INDEX).
+
+    hydrate=None — режим из настроек: при ELASTICSEARCH_DENORMALIZED=true поля книг берутся из `_source`,
+    иначе возвращаются только id. hydrate=True всегда возвращает только id.
+    """
+
+    name = "elasticsearch"
+    capabilities = BookSearchCapabilities(backend=name, filters=True, facets=True, grouped=True, paginate=True)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        count: bool,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchHits:
+        """
+        Фильтры genre/lang/year идут в `bool.filter` (кэшируемый битсет, без влияния на релевантность).
+        facets=True добавляет в тот же запрос terms-агрегации: счётчики считаются по всем совпадениям,
+        поэтому и при вердикте «слишком много» видно, каким фильтром сузить запрос.
+        """
+        _require_elasticsearch()
+        from_index = settings.ELASTICSEARCH_DENORMALIZED and not hydrate
+        filter_path = _filter_path(count=count, from_index=from_index)
+        if facets:
+            filter_path.append("aggregations.*.buckets")
+        try:
+            if not books_index_ready():
+                await ensure_books_index(db)
+            client = get_elasticsearch()
+
+            resp: dict[str, Any] = await es_call(
+                client.search,
+                index=settings.ELASTICSEARCH_INDEX,
+                body=_search_body(
+                    q=q,
+                    author=author,
+                    title=title,
+                    limit=limit,
+                    count=count,
+                    from_index=from_index,
+                    filters=filters,
+                    facets=facets,
+                ),
+                filter_path=filter_path,
+            )
+        except ElasticsearchNotFoundError as ex:
+            # Индекс удалили в обход приложения — следующий поиск заново выполнит ensure_books_index.
+            invalidate_books_index()
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+        except Exception as ex:  # noqa: BLE001
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+
+        hits = _search_hits(resp, count=count, from_index=from_index)
+        if facets:
+            hits["facets"] = _search_facets(resp)
+        return hits
+
+    async def search_many(
+        self,
+        db: AsyncSession,
+        queries: list[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None,
+    ) -> list[BookSearchHits]:
+        """
+        Несколько поисков одним запросом `_msearch`: те же тела, что у search(count=True), по одному на запрос.
+        Ошибка любого из поисков — RepositoryException на весь пакет.
+        """
+        if not queries:
+            return []
+        _require_elasticsearch()
+        from_index = settings.ELASTICSEARCH_DENORMALIZED and not hydrate
+        searches: list[dict[str, Any]] = []
+        for query in queries:
+            searches.append({})
+            searches.append(
+                _search_body(
+                    q=query.q,
+                    author=query.author,
+                    title=query.title,
+                    limit=limit,
+                    count=True,
+                    from_index=from_index,
+                )
+            )
+        try:
+            if not books_index_ready():
+                await ensure_books_index(db)
+            client = get_elasticsearch()
+            resp: dict[str, Any] = await es_call(
+                client.msearch,
+                index=settings.ELASTICSEARCH_INDEX,
+                searches=searches,
+                filter_path=[f"responses.{path}" for path in _filter_path(count=True, from_index=from_index)]
+                + ["responses.error", "responses.status"],
+            )
+        except ElasticsearchNotFoundError as ex:
+            invalidate_books_index()
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+        except Exception as ex:  # noqa: BLE001
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+
+        responses: list[dict[str, Any]] = resp.get("responses", [])
+        failed = [item for item in responses if "error" in item]
+        if failed or len(responses) != len(queries):
+            if any(item.get("status") == 404 for item in failed):
+                invalidate_books_index()
+            raise RepositoryException(f"Ошибка мультипоиска в Elasticsearch: {failed[:3]}")
+        return [_search_hits(item, count=True, from_index=from_index) for item in responses]
+
+    async def search_groups(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchGroupHits:
+        """
+        Группированный поиск одним запросом: `collapse` по `work_key` оставляет лучшую книгу каждого
+        произведения, `inner_hits` приносит его издания, агрегация `cardinality` считает произведения
+        (для вердикта «слишком много» — как track_total_hits у обычного поиска).
+        """
+        _require_elasticsearch()
+        from_index = settings.ELASTICSEARCH_DENORMALIZED and not hydrate
+        source: list[str] | bool = list(BOOK_SOURCE_FIELDS) if from_index else False
+        body: dict[str, Any] = {
+            "query": build_books_search_query(q=q, author=author, title=title, filters=_term_filters(filters)),
+            "size": limit,
+            "_source": False,
+            "track_total_hits": False,
+            "collapse": {
+                "field": "work_key",
+                "inner_hits": {"name": "editions", "size": editions, "_source": source},
+            },
+            # До precision_threshold подсчёт практически точный, а нам важна граница limit + 1.
+            "aggs": {"works": {"cardinality": {"field": "work_key", "precision_threshold": max(100, limit + 1)}}},
+        }
+        editions_path = "hits.hits.inner_hits.editions.hits"
+        filter_path = ["aggregations.works.value", f"{editions_path}.total.value", f"{editions_path}.hits._id"]
+        if from_index:
+            filter_path.append(f"{editions_path}.hits._source")
+        try:
+            if not books_index_ready():
+                await ensure_books_index(db)
+            client = get_elasticsearch()
+            resp: dict[str, Any] = await es_call(
+                client.search,
+                index=settings.ELASTICSEARCH_INDEX,
+                body=body,
+                filter_path=filter_path,
+            )
+        except ElasticsearchNotFoundError as ex:
+            invalidate_books_index()
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+        except Exception as ex:  # noqa: BLE001
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+
+        groups = [
+            _search_hits(hit.get("inner_hits", {}).get("editions", {}), count=True, from_index=from_index)
+            for hit in resp.get("hits", {}).get("hits", [])
+        ]
+        total = int(resp.get("aggregations", {}).get("works", {}).get("value", 0))
+        return BookSearchGroupHits(total=max(total, len(groups)), groups=groups)
+
+    async def suggest(self, db: AsyncSession, *, prefix: str, limit: int) -> list[BookSuggestHit]:
+        """
+        Completion-подсказчик по полю `suggest`: префикс ищется в FST в памяти узла (без обхода документов
+        и подсчёта релевантности), из `_source` берутся только author/title — без гидратации из БД.
+        """
+        _require_elasticsearch()
+        body: dict[str, Any] = {
+            "size": 0,
+            "_source": ["author", "title"],
+            "suggest": {
+                "books": {"prefix": prefix, "completion": {"field": "suggest", "size": limit * SUGGEST_OVERFETCH}}
+            },
+        }
+        try:
+            if not books_index_ready():
+                await ensure_books_index(db)
+            client = get_elasticsearch()
+            resp: dict[str, Any] = await es_call(
+                client.search,
+                index=settings.ELASTICSEARCH_INDEX,
+                body=body,
+                filter_path=["suggest.books.options._id", "suggest.books.options._source"],
+            )
+        except ElasticsearchNotFoundError as ex:
+            invalidate_books_index()
+            raise RepositoryException(f"Ошибка подсказок в Elasticsearch: {ex}") from ex
+        except Exception as ex:  # noqa: BLE001
+            raise RepositoryException(f"Ошибка подсказок в Elasticsearch: {ex}") from ex
+
+        options = [option for entry in resp.get("suggest", {}).get("books", []) for option in entry.get("options", [])]
+        return unique_suggestions(
+            (
+                BookSuggestHit(
+                    id=int(option["_id"]),
+                    author=option.get("_source", {}).get("author") or None,
+                    title=option.get("_source", {}).get("title") or None,
+                )
+                for option in options
+                if "_id" in option
+            ),
+            limit,
+        )
+
+    async def search_after(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        cursor: str | None,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorHits:
+        """
+        Постраничный поиск: point-in-time (снимок индекса на время листания) + search_after по
+        (`_score`, `_shard_doc`). В отличие от from/size, ES не пересчитывает и не пропускает предыдущие
+        страницы, поэтому глубокая страница стоит столько же, сколько первая.
+
+        Курсор — base64 от (PIT id, sort последней книги, запрос с фильтрами). Каждая страница продлевает PIT на
+        ELASTICSEARCH_PIT_KEEP_ALIVE; после последней страницы PIT закрывается.
+        """
+        _require_elasticsearch()
+        term_filters = _term_filters(filters)
+        pit_id: str = ""
+        after: list[Any] | None = None
+        if cursor is not None:
+            pit_id, after, (q, author, title), term_filters = _decode_cursor(cursor)
+        from_index = settings.ELASTICSEARCH_DENORMALIZED and not hydrate
+        keep_alive = settings.ELASTICSEARCH_PIT_KEEP_ALIVE
+        try:
+            if not books_index_ready():
+                await ensure_books_index(db)
+            client = get_elasticsearch()
+            if cursor is None:
+                opened = await es_call(
+                    client.open_point_in_time,
+                    index=settings.ELASTICSEARCH_INDEX,
+                    keep_alive=keep_alive,
+                )
+                pit_id = opened["id"]
+
+            body: dict[str, Any] = {
+                "query": build_books_search_query(q=q, author=author, title=title, filters=term_filters),
+                # На одну книгу больше страницы: так без подсчёта совпадений видно, есть ли следующая страница.
+                "size": limit + 1,
+                "_source": list(BOOK_SOURCE_FIELDS) if from_index else False,
+                "track_total_hits": False,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "sort": _PAGE_SORT,
+            }
+            if after is not None:
+                body["search_after"] = after
+            filter_path = ["pit_id", "hits.hits._id", "hits.hits.sort"]
+            if from_index:
+                filter_path.append("hits.hits._source")
+
+            resp: dict[str, Any] = await es_call(client.search, body=body, filter_path=filter_path)
+        except ElasticsearchNotFoundError as ex:
+            if cursor is not None:
+                raise SearchCursorError(
+                    "Курсор поиска устарел (истёк point-in-time). Начни поиск заново без cursor."
+                ) from ex
+            invalidate_books_index()
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+        except Exception as ex:  # noqa: BLE001
+            raise RepositoryException(f"Ошибка поиска в Elasticsearch: {ex}") from ex
+
+        # ES может вернуть новый id PIT — следующий курсор должен нести актуальный.
+        pit_id = resp.get("pit_id", pit_id)
+        hits = [hit for hit in resp.get("hits", {}).get("hits", []) if "_id" in hit]
+        next_cursor: str | None = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = _encode_cursor(pit_id, hits[-1]["sort"], (q, author, title), term_filters)
+        else:
+            await _close_point_in_time(client, pit_id)
+
+        return BookSearchCursorHits(
+            ids=[int(hit["_id"]) for hit in hits],
+            sources=[hit.get("_source", {}) for hit in hits] if from_index else None,
+            next_cursor=next_cursor,
+        )
+
+
+def _search_body(
+    *,
+    q: str | None,
+    author: str | None,
+    title: str | None,
+    limit: int,
+    count: bool,
+    from_index: bool,
+    filters: BookSearchFilters | None = None,
+    facets: bool = False,
+) -> dict[str, Any]:
+    body: dict[str, Any] = {
+        "query": build_books_search_query(q=q, author=author, title=title, filters=_term_filters(filters)),
+        "size": limit,
+        "_source": list(BOOK_SOURCE_FIELDS) if from_index else False,
+        "track_total_hits": limit + 1 if count else False,
+    }
+    if facets:
+        body["aggs"] = build_books_facets_aggs(_FACET_SIZE)
+    return body
+
+
+def _term_filters(filters: BookSearchFilters | None) -> dict[str, str] | None:
+    if filters is None:
+        return None
+    return filters.model_dump(exclude_none=True) or None
+
+
+def _filter_path(*, count: bool, from_index: bool) -> list[str]:
+    filter_path = ["hits.hits._id", "hits.hits._source"] if from_index else ["hits.hits._id"]
+    if count:
+        filter_path.append("hits.total.value")
+    return filter_path
+
+
+def _search_hits(resp: dict[str, Any], *, count: bool, from_index: bool) -> BookSearchHits:
+    hits = [hit for hit in resp.get("hits", {}).get("hits", []) if "_id" in hit]
+    total = int(resp.get("hits", {}).get("total", {}).get("value", 0)) if count else len(hits)
+    return BookSearchHits(
+        total=total,
+        ids=[int(hit["_id"]) for hit in hits],
+        sources=[hit.get("_source", {}) for hit in hits] if from_index else None,
+    )
+
+
+def _search_facets(resp: dict[str, Any]) -> BookSearchFacets:
+    aggregations = resp.get("aggregations", {})
+    return BookSearchFacets(
+        **{
+            field: [
+                BookFacetValue(value=str(bucket["key"]), count=int(bucket["doc_count"]))
+                for bucket in aggregations.get(field, {}).get("buckets", [])
+            ]
+            for field in BOOK_FACET_FIELDS
+        }
+    )
+
+
+def _require_elasticsearch() -> None:
+    if not elasticsearch_enabled():
+        raise RepositoryException(
+            "Поиск недоступен: не задан ELASTICSEARCH_URL (или он пуст). "
+            "Подними Elasticsearch и задай переменную окружения."
+        )
+
+
+def _encode_cursor(
+    pit_id: str,
+    after: list[Any],
+    query: tuple[str | None, str | None, str | None],
+    filters: dict[str, str] | None = None,
+) -> str:
+    """Курсор: base64(JSON) + «.» + base64(HMAC-SHA256 от JSON) — клиент не может подменить запрос или фильтры."""
+    payload: dict[str, Any] = {"v": _CURSOR_VERSION, "pit": pit_id, "after": after, "query": list(query)}
+    if filters:
+        payload["filters"] = filters
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return f"{_b64encode(raw)}.{_b64encode(_cursor_signature(raw))}"
+
+
+def _decode_cursor(
+    cursor: str,
+) -> tuple[str, list[Any], tuple[str | None, str | None, str | None], dict[str, str] | None]:
+    try:
+        body, _, signature = cursor.partition(".")
+        raw = _b64decode(body)
+        if not hmac.compare_digest(_b64decode(signature), _cursor_signature(raw)):
+            raise ValueError("cursor signature")
+        payload = json.loads(raw)
+        if not isinstance(payload, dict) or payload.get("v") != _CURSOR_VERSION:
+            raise ValueError("cursor version")
+        pit_id, after, query = payload["pit"], payload["after"], payload["query"]
+        if not isinstance(pit_id, str) or not isinstance(after, list):
+            raise TypeError("cursor pit/after")
+        if not isinstance(query, list) or len(query) != 3 or not all(v is None or isinstance(v, str) for v in query):
+            raise TypeError("cursor query")
+        filters = payload.get("filters")
+        if filters is not None and not (
+            isinstance(filters, dict)
+            and all(key in BOOK_FACET_FIELDS and isinstance(value, str) for key, value in filters.items())
+        ):
+            raise TypeError("cursor filters")
+        q, author, title = query
+        return pit_id, after, (q, author, title), filters
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as ex:
+        raise SearchCursorError("Некорректный курсор поиска. Начни поиск заново без cursor.") from ex
+
+
+def _cursor_signature(raw: bytes) -> bytes:
+    secret = settings.SEARCH_CURSOR_SECRET
+    key = secret.encode("utf-8") if secret else _PROCESS_CURSOR_KEY
+    return hmac.new(key, raw, hashlib.sha256).digest()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+async def _close_point_in_time(client: Any, pit_id: str) -> None:
+    # Не закрытый PIT всё равно истечёт через keep_alive, поэтому ошибка закрытия не ломает ответ.
+    try:
+        await es_call(client.close_point_in_time, id=pit_id)
+    except Exception:  # noqa: BLE001
+        logger.debug("Не удалось закрыть point-in-time поиска", exc_info=True)
+
+
+elasticsearch_backend = ElasticsearchBookSearch()
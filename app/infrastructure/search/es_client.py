@@ -1,46 +1,195 @@
 import asyncio
+import logging
+import sys
+from typing import Any, Callable, Literal
 
-from elasticsearch import Elasticsearch
+import aiohttp
+from elastic_transport import AiohttpHttpNode
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+from elasticsearch.helpers import async_bulk, bulk
 
 from config.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+ClientMode = Literal["sync", "async"]
+
 _client: Elasticsearch | None = None
+_mode: ClientMode | None = None
+# aiohttp-сессия AsyncElasticsearch привязана к event loop, в котором была создана.
+# Поэтому async-клиент запоминает свой loop: при смене loop (pytest/anyio, повторный старт приложения)
+# клиент пересоздаётся для текущего loop, а старый закрывается (см. _discard_async_client).
+_async_client: AsyncElasticsearch | None = None
+_async_loop: asyncio.AbstractEventLoop | None = None
+
+
+# Как в elastic-transport: обходной путь для утечки SSL-соединений в отдельных версиях CPython.
+_NEEDS_CLEANUP_CLOSED = (3, 13, 0) <= sys.version_info < (3, 13, 1) or sys.version_info < (3, 12, 7)
+
+
+class _KeepAliveAiohttpHttpNode(AiohttpHttpNode):
+    """
+    AiohttpHttpNode с настраиваемым keep-alive для idle-соединений пула.
+
+    elastic-transport не пробрасывает keepalive_timeout в aiohttp.TCPConnector (по умолчанию 15 сек.)
+    и не принимает готовый connector/сессию через параметры узла, поэтому сессия создаётся здесь же,
+    с теми же параметрами, что и в базовом классе. Метод повторяет приватный код elastic-transport:
+    версия закреплена в pyproject.toml, а test_es_client сверяет сессию с сессией базового класса —
+    при обновлении elastic-transport тест покажет расхождение.
+    """
+
+    def _create_aiohttp_session(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            skip_auto_headers=("accept", "accept-encoding", "user-agent"),
+            auto_decompress=True,
+            loop=self._loop,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            connector=aiohttp.TCPConnector(
+                limit_per_host=self._connections_per_node,
+                use_dns_cache=True,
+                enable_cleanup_closed=_NEEDS_CLEANUP_CLOSED,
+                ssl=self._ssl_context or False,
+                keepalive_timeout=settings.ELASTICSEARCH_KEEPALIVE_S,
+            ),
+        )
 
 
 def elasticsearch_enabled() -> bool:
     return bool(settings.ELASTICSEARCH_URL and settings.ELASTICSEARCH_URL.strip())
 
 
+def _hosts() -> list[str]:
+    if not settings.ELASTICSEARCH_URL:
+        raise RuntimeError("Elasticsearch выключен: ELASTICSEARCH_URL не задан (или пуст).")
+    return [settings.ELASTICSEARCH_URL]
+
+
+def _build_async_client() -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        hosts=_hosts(),
+        request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT_S,
+        connections_per_node=settings.ELASTICSEARCH_MAX_CONNECTIONS,
+        node_class=_KeepAliveAiohttpHttpNode,
+    )
+
+
+def _has_open_sessions(client: AsyncElasticsearch) -> bool:
+    for node in client.transport.node_pool.all():
+        session = getattr(node, "session", None)
+        if session is not None and not session.closed:
+            return True
+    return False
+
+
+def _discard_async_client(client: AsyncElasticsearch, loop: asyncio.AbstractEventLoop | None) -> None:
+    """
+    Закрывает async-клиент, привязанный к другому event loop.
+
+    aiohttp-сессию можно закрыть только в её собственном loop: если он ещё работает (в другом потоке),
+    закрытие планируется туда. Если loop уже остановлен, а сессии клиента открыты — значит, приложение
+    не вызвало close_elasticsearch перед сменой loop. Закрыть их уже нельзя: пишем ошибку в лог и бросаем
+    клиент, чтобы get_elasticsearch() в новом loop всё равно вернул рабочий клиент.
+    """
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+        return
+    if _has_open_sessions(client):
+        logger.error(
+            "Async-клиент Elasticsearch остался открытым в завершённом event loop — его соединения брошены. "
+            "Вызови close_elasticsearch() перед сменой event loop."
+        )
+
+
+def _bind_async_client(loop: asyncio.AbstractEventLoop) -> AsyncElasticsearch:
+    global _async_client, _async_loop
+    if _async_client is not None and _async_loop is not loop:
+        logger.debug("Event loop сменился — пересоздаю async-клиент Elasticsearch")
+        stale, _async_client = _async_client, None
+        _discard_async_client(stale, _async_loop)
+    _async_client = _build_async_client()
+    _async_loop = loop
+    return _async_client
+
+
 async def init_elasticsearch() -> None:
-    global _client
-    if _client is not None:
+    global _client, _mode
+    if _mode is not None:
         return
     if not elasticsearch_enabled():
         return
 
-    # Sync-клиент безопаснее в окружениях, где event loop может меняться (pytest/anyio).
-    # Все вызовы к клиенту выполняются через asyncio.to_thread.
+    _mode = settings.ELASTICSEARCH_CLIENT_MODE
+    if _mode == "async":
+        _bind_async_client(asyncio.get_running_loop())
+        return
+
+    # Sync-клиент: все вызовы выполняются через asyncio.to_thread (см. es_call).
     _client = Elasticsearch(
-        hosts=[settings.ELASTICSEARCH_URL],
+        hosts=_hosts(),
         request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT_S,
+        connections_per_node=settings.ELASTICSEARCH_MAX_CONNECTIONS,
     )
 
 
 async def close_elasticsearch() -> None:
-    global _client
-    if _client is None:
+    global _client, _mode, _async_client, _async_loop
+    if _mode is None:
         return
-    await asyncio.to_thread(_client.close)
-    _client = None
+
+    if _client is not None:
+        await asyncio.to_thread(_client.close)
+        _client = None
+
+    client, loop = _async_client, _async_loop
+    _async_client = None
+    _async_loop = None
+    _mode = None
+
+    if client is not None:
+        if loop is asyncio.get_running_loop():
+            await client.close()
+        else:
+            _discard_async_client(client, loop)
 
 
-def get_elasticsearch() -> Elasticsearch:
+def get_elasticsearch() -> Elasticsearch | AsyncElasticsearch:
     if not elasticsearch_enabled():
         raise RuntimeError("Elasticsearch выключен: ELASTICSEARCH_URL не задан (или пуст).")
-    if _client is None:
+    if _mode is None:
         raise RuntimeError(
             "Elasticsearch client не инициализирован. "
             "Проверь, что приложение стартует с lifespan (init_elasticsearch)."
         )
-    return _client
+    if _mode == "sync":
+        assert _client is not None
+        return _client
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        return _bind_async_client(loop)
+    return _async_client
+
+
+def is_async_mode() -> bool:
+    return _mode == "async"
+
+
+async def es_call(method: Callable[..., Any], /, **kwargs: Any) -> Any:
+    """
+    Вызывает метод клиента Elasticsearch независимо от режима:
+    в async-режиме — напрямую через await, в sync-режиме — через asyncio.to_thread.
+    """
+    if is_async_mode():
+        return await method(**kwargs)
+    return await asyncio.to_thread(method, **kwargs)
+
+
+async def es_bulk(client: Elasticsearch | AsyncElasticsearch, actions: list[dict[str, Any]], **kwargs: Any) -> Any:
+    if isinstance(client, AsyncElasticsearch):
+        return await async_bulk(client, actions, **kwargs)
+    return await asyncio.to_thread(bulk, client, actions, **kwargs)
@@ -0,0 +1,227 @@
+from difflib import SequenceMatcher
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import settings
+from domain.exceptions import RepositoryException
+from domain.models.book import BookSearchCapabilities, BookSearchFilters, BookSearchQuery
+from infrastructure.db.fts_query import (
+    build_books_fts5_match_query,
+    build_books_trigram_match_query,
+    fold_query_tokens,
+)
+
+from .backend import (
+    SUGGEST_OVERFETCH,
+    BookSearchCursorHits,
+    BookSearchGroupHits,
+    BookSearchHits,
+    BookSuggestHit,
+    unique_suggestions,
+)
+
+
+# Один запрос: MATCH по books_fts, ранжирование bm25, JOIN за полными строками books и LIMIT внутри SQLite.
+_SEARCH_SQL = text("""
+    SELECT books.*
+    FROM books_fts
+    JOIN books ON books.id = books_fts.rowid
+    WHERE books_fts MATCH :match
+    ORDER BY bm25(books_fts)
+    LIMIT :limit
+""")
+
+# То же по trigram-таблице (подстроки и кандидаты для поиска с опечатками).
+_TRIGRAM_SQL = text("""
+    SELECT books.*
+    FROM books_fts_trigram
+    JOIN books ON books.id = books_fts_trigram.rowid
+    WHERE books_fts_trigram MATCH :match
+    ORDER BY bm25(books_fts_trigram)
+    LIMIT :limit
+""")
+
+# Сколько кандидатов по триграммам пересчитывать по сходству в Python.
+_FUZZY_CANDIDATES = 200
+_MIN_FUZZY_TOKEN_LEN = 3
+
+
+class SqliteFtsBookSearch:
+    """
+    Локальный поиск книг через SQLite FTS5 (`books_fts`, см. infrastructure/db/fts.py) — без сети и отдельного сервиса.
+
+    Для вердикта «слишком много» (count=True) достаточно выбрать limit + 1 строку.
+    Строки books приходят тем же запросом, поэтому отдельная гидрация из БД не нужна.
+
+    Если по словам (префиксам) ничего не нашлось и включён SEARCH_FTS_FALLBACK, в том же вызове пробуются
+    `books_fts_trigram`: сначала подстрока из середины слова, затем поиск с опечатками
+    (кандидаты по общим триграммам, отфильтрованные по сходству слов не ниже SEARCH_FTS_FUZZY_MIN_SIMILARITY).
+    """
+
+    name = "sqlite_fts"
+    capabilities = BookSearchCapabilities(backend=name)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        count: bool,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchHits:
+        if filters is not None or facets:
+            raise RepositoryException(
+                "Фильтры и фасеты genre/lang/year доступны только с SEARCH_BACKEND=elasticsearch."
+            )
+        match = build_books_fts5_match_query(author=author, title=title, q=q)
+        if not match:
+            return BookSearchHits(total=0, ids=[], sources=[])
+
+        size = limit + 1 if count else limit
+        try:
+            rows = await self._select(db, _SEARCH_SQL, match, size)
+            if not rows and settings.SEARCH_FTS_FALLBACK:
+                rows = await self._fallback(db, q=q, author=author, title=title, size=size)
+        except SQLAlchemyError as ex:
+            raise RepositoryException(
+                f"Ошибка поиска в SQLite FTS5: {ex}. "
+                "Индекс books_fts создаётся при старте приложения (ensure_books_fts)."
+            ) from ex
+
+        return BookSearchHits(
+            total=len(rows),
+            ids=[int(row["id"]) for row in rows[:limit]],
+            sources=rows[:limit],
+        )
+
+    async def search_many(
+        self,
+        db: AsyncSession,
+        queries: list[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None,
+    ) -> list[BookSearchHits]:
+        # Пакетного запроса у SQLite нет, а локальный запрос дешёвый: выполняем по очереди.
+        return [
+            await self.search(
+                db, q=query.q, author=query.author, title=query.title, limit=limit, count=True, hydrate=hydrate
+            )
+            for query in queries
+        ]
+
+    async def search_groups(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchGroupHits:
+        raise RepositoryException(
+            "Группированный поиск доступен только с SEARCH_BACKEND=elasticsearch (collapse по work_key)."
+        )
+
+    async def suggest(self, db: AsyncSession, *, prefix: str, limit: int) -> list[BookSuggestHit]:
+        # Тот же MATCH по префиксам, что у поиска (без fallback по триграммам: подсказка должна быть быстрой).
+        match = build_books_fts5_match_query(author=None, title=None, q=prefix)
+        if not match:
+            return []
+        try:
+            rows = await self._select(db, _SEARCH_SQL, match, limit * SUGGEST_OVERFETCH)
+        except SQLAlchemyError as ex:
+            raise RepositoryException(f"Ошибка подсказок в SQLite FTS5: {ex}") from ex
+        return unique_suggestions(
+            (BookSuggestHit(id=int(row["id"]), author=row["author"], title=row["title"]) for row in rows), limit
+        )
+
+    async def search_after(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        cursor: str | None,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorHits:
+        raise RepositoryException(
+            "Постраничный поиск по курсору доступен только с SEARCH_BACKEND=elasticsearch (point-in-time)."
+        )
+
+    @staticmethod
+    async def _select(db: AsyncSession, sql: Any, match: str, limit: int) -> list[dict[str, Any]]:
+        return [dict(row._mapping) for row in (await db.execute(sql, {"match": match, "limit": limit})).all()]
+
+    async def _fallback(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        size: int,
+    ) -> list[dict[str, Any]]:
+        substring = build_books_trigram_match_query(author=author, title=title, q=q)
+        if not substring:
+            return []
+
+        rows = await self._select(db, _TRIGRAM_SQL, substring, size)
+        if rows:
+            return rows
+
+        fuzzy = build_books_trigram_match_query(author=author, title=title, q=q, fuzzy=True)
+        candidates = await self._select(db, _TRIGRAM_SQL, fuzzy, _FUZZY_CANDIDATES)
+        scored = [
+            (score, row)
+            for row in candidates
+            if (score := _fuzzy_score(row, q=q, author=author, title=title)) is not None
+        ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [row for _, row in scored[:size]]
+
+
+def _fuzzy_score(row: dict[str, Any], *, q: str | None, author: str | None, title: str | None) -> float | None:
+    """
+    Среднее сходство слов запроса с лучшими словами книги; None, если хоть одно слово (от 3 символов)
+    не похоже ни на одно слово своей колонки.
+    """
+    author_words = fold_query_tokens(row.get("author"))
+    title_words = fold_query_tokens(row.get("title"))
+    scores: list[float] = []
+    for value, words in ((author, author_words), (title, title_words), (q, author_words + title_words)):
+        for token in fold_query_tokens(value):
+            if len(token) < _MIN_FUZZY_TOKEN_LEN:
+                continue
+            best = max((_similarity(token, word) for word in words), default=0.0)
+            if best < settings.SEARCH_FTS_FUZZY_MIN_SIMILARITY:
+                return None
+            scores.append(best)
+    return sum(scores) / len(scores) if scores else None
+
+
+def _similarity(token: str, word: str) -> float:
+    if token in word:
+        return 1.0
+    # Слово из запроса может быть началом слова книги (type-ahead), поэтому сравниваем и с префиксом той же длины.
+    return max(
+        SequenceMatcher(None, token, word).ratio(),
+        SequenceMatcher(None, token, word[: len(token)]).ratio(),
+    )
+
+
+sqlite_fts_backend = SqliteFtsBookSearch()
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import settings
+from infrastructure.db.db import sessionmanager
+from infrastructure.db.es_changelog import CHANGELOG_TABLE, books_es_sync_pause_reason
+from infrastructure.db.models.book_orm import BookORM
+
+from .books_index import (
+    book_index_source,
+    books_index_columns,
+    books_index_ready,
+    bump_books_index_generation,
+    refresh_books_index_generation,
+)
+from .es_client import es_bulk, get_elasticsearch
+
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_books_index_once(session: AsyncSession, *, batch_size: int) -> int:
+    """
+    Переносит в Elasticsearch одну пачку изменений из журнала `books_es_changes`.
+
+    - Несколько изменений одной книги в пачке схлопываются: важно только текущее состояние строки в БД.
+    - Книга, которой уже нет в БД, удаляется из индекса (404 на удаление не считается ошибкой).
+    - Обработанные записи журнала удаляются в той же транзакции только после успешного bulk-запроса,
+      поэтому при ошибке ES пачка будет повторена.
+    - Пока идёт переиндексация (pause_books_es_sync), журнал не трогается: иначе правки попали бы
+      только в старый индекс и пропали бы при переключении алиаса.
+
+    Возвращает число обработанных записей журнала.
+    """
+    # Пауза проверяется в той же транзакции чтения, что и выборка журнала.
+    reason = await books_es_sync_pause_reason(session)
+    if reason is not None:
+        logger.debug("Синхронизация индекса книг на паузе: %s", reason)
+        return 0
+
+    changes = (
+        await session.execute(
+            text(f"SELECT seq, book_id FROM {CHANGELOG_TABLE} ORDER BY seq LIMIT :limit"),
+            {"limit": batch_size},
+        )
+    ).all()
+    if not changes:
+        return 0
+
+    max_seq = changes[-1].seq
+    book_ids = list(dict.fromkeys(int(change.book_id) for change in changes))
+
+    rows = (await session.execute(select(*books_index_columns()).where(BookORM.id.in_(book_ids)))).all()
+    existing = {int(row.id): row for row in rows}
+
+    index = settings.ELASTICSEARCH_INDEX
+    actions: list[dict[str, Any]] = []
+    for book_id in book_ids:
+        row = existing.get(book_id)
+        if row is None:
+            actions.append({"_op_type": "delete", "_index": index, "_id": str(book_id)})
+        else:
+            actions.append(
+                {"_op_type": "index", "_index": index, "_id": str(book_id), "_source": book_index_source(row)}
+            )
+
+    # wait_for: к моменту сброса кэша поиска (bump_books_index_generation) правки уже видны в поиске.
+    _, errors = await es_bulk(get_elasticsearch(), actions, raise_on_error=False, refresh="wait_for")
+    failed = [
+        item
+        for item in errors
+        if not (item.get("delete", {}).get("status") == 404 and "error" not in item.get("delete", {}))
+    ]
+    if failed:
+        raise RuntimeError(f"Не удалось применить {len(failed)} изменений к индексу {index}: {failed[:3]}")
+
+    await session.execute(text(f"DELETE FROM {CHANGELOG_TABLE} WHERE seq <= :max_seq"), {"max_seq": max_seq})
+    await session.commit()
+    bump_books_index_generation()
+
+    logger.debug("Синхронизировано изменений книг в ES: %d (книг: %d)", len(changes), len(book_ids))
+    return len(changes)
+
+
+async def run_books_index_sync(
+    *,
+    interval_s: float | None = None,
+    batch_size: int | None = None,
+) -> None:
+    """
+    Фоновая задача: периодически переносит изменения каталога из журнала в Elasticsearch.
+
+    Пока журнал отдаёт полные пачки, они обрабатываются без паузы; затем задача ждёт interval_s.
+    Пока индекс не подготовлен (ensure_books_index), журнал не трогается — первичная загрузка
+    всё равно возьмёт актуальные данные. Ошибки логируются, пачка повторяется на следующей итерации.
+    Заодно отслеживает переключение алиаса другим процессом, чтобы сбросить кэш поиска.
+    Останавливается отменой задачи (см. lifespan в main.py).
+    """
+    interval = settings.ELASTICSEARCH_SYNC_INTERVAL_S if interval_s is None else interval_s
+    size = settings.ELASTICSEARCH_SYNC_BATCH_SIZE if batch_size is None else batch_size
+
+    while True:
+        try:
+            if books_index_ready():
+                await refresh_books_index_generation()
+                while True:
+                    async with sessionmanager.session() as session:
+                        processed = await sync_books_index_once(session, batch_size=size)
+                    if processed < size:
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("Ошибка синхронизации изменений книг с Elasticsearch; повторю через %.1f сек.", interval)
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,129 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.exceptions import RepositoryException
+from domain.models.book import BookSearchCapabilities, BookSearchFilters, BookSearchQuery
+from infrastructure.db.models.book_orm import BookORM
+
+from .backend import (
+    SUGGEST_OVERFETCH,
+    BookSearchCursorHits,
+    BookSearchGroupHits,
+    BookSearchHits,
+    BookSuggestHit,
+    unique_suggestions,
+)
+from .memory_index import ensure_books_memory_index
+
+
+class MemoryBookSearch:
+    """
+    Поиск по инвертированному индексу в памяти процесса (memory_index.py): без ES и без SQL на сам поиск.
+
+    Индекс хранит только id, поэтому найденные книги BookRepo подтягивает из БД одним запросом по первичному ключу.
+    Индекс строится при старте приложения (или при первом поиске) и не видит правок каталога до перезапуска.
+    """
+
+    name = "memory"
+    capabilities = BookSearchCapabilities(backend=name)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        count: bool,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+        facets: bool = False,
+    ) -> BookSearchHits:
+        if filters is not None or facets:
+            raise RepositoryException(
+                "Фильтры и фасеты genre/lang/year доступны только с SEARCH_BACKEND=elasticsearch."
+            )
+        index = await ensure_books_memory_index(db)
+        # Короткие префиксы без count (подсказки) и пары коротких префиксов стоят десятки мс на 1 млн книг:
+        # считаем в пуле потоков, чтобы не держать event loop (индекс после сборки не меняется).
+        total, ids = await asyncio.to_thread(index.search, q=q, author=author, title=title, limit=limit, count=count)
+        return BookSearchHits(total=total, ids=ids, sources=None)
+
+    async def search_many(
+        self,
+        db: AsyncSession,
+        queries: list[BookSearchQuery],
+        *,
+        limit: int,
+        hydrate: bool | None,
+    ) -> list[BookSearchHits]:
+        # Поиск в памяти процесса без сетевых обращений: пакет — просто цикл.
+        return [
+            await self.search(
+                db, q=query.q, author=query.author, title=query.title, limit=limit, count=True, hydrate=hydrate
+            )
+            for query in queries
+        ]
+
+    async def search_groups(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        editions: int,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchGroupHits:
+        raise RepositoryException(
+            "Группированный поиск доступен только с SEARCH_BACKEND=elasticsearch (collapse по work_key)."
+        )
+
+    async def suggest(self, db: AsyncSession, *, prefix: str, limit: int) -> list[BookSuggestHit]:
+        # Индекс хранит только id: автора и название добираем лёгким запросом по первичному ключу.
+        index = await ensure_books_memory_index(db)
+        _, ids = await asyncio.to_thread(
+            index.search, q=prefix, author=None, title=None, limit=limit * SUGGEST_OVERFETCH
+        )
+        if not ids:
+            return []
+        try:
+            rows = (
+                await db.execute(select(BookORM.id, BookORM.author, BookORM.title).where(BookORM.id.in_(ids)))
+            ).all()
+        except SQLAlchemyError as ex:
+            raise RepositoryException(f"Ошибка подсказок: {ex}") from ex
+        by_id = {row.id: row for row in rows}
+        return unique_suggestions(
+            (
+                BookSuggestHit(id=book_id, author=by_id[book_id].author, title=by_id[book_id].title)
+                for book_id in ids
+                if book_id in by_id
+            ),
+            limit,
+        )
+
+    async def search_after(
+        self,
+        db: AsyncSession,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        cursor: str | None,
+        hydrate: bool | None,
+        filters: BookSearchFilters | None = None,
+    ) -> BookSearchCursorHits:
+        raise RepositoryException(
+            "Постраничный поиск по курсору доступен только с SEARCH_BACKEND=elasticsearch (point-in-time)."
+        )
+
+
+memory_backend = MemoryBookSearch()
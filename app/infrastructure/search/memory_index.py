@@ -0,0 +1,283 @@
+from array import array
+import asyncio
+from bisect import bisect_left
+import heapq
+import logging
+import sys
+import time
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.db.fts_query import fold_query_tokens
+from infrastructure.db.models.book_orm import BookORM
+
+from .books_index import bump_books_index_generation
+
+
+logger = logging.getLogger(__name__)
+
+
+# Как в build_fts5_match_query: слова от 2 символов ищутся как префикс, однобуквенные — точно.
+_MIN_PREFIX_LEN = 2
+# Максимальный символ Unicode: prefix + _MAX_CHAR — верхняя граница диапазона термов с этим префиксом.
+_MAX_CHAR = "\U0010ffff"
+
+_index: "BookMemoryIndex | None" = None
+_index_lock = asyncio.Lock()
+
+
+class _FieldPostings:
+    """
+    Posting-списки одного поля, склеенные в один массив: id книг с термом i — `ids[offsets[i]:offsets[i + 1]]`
+    (отсортированы). Никаких объектов на терм: 4 байта на вхождение + 4 байта на терм.
+    """
+
+    __slots__ = ("ids", "offsets")
+
+    def __init__(self, ids: array, offsets: array) -> None:
+        self.ids = ids
+        self.offsets = offsets
+
+    def get(self, term_id: int) -> memoryview:
+        return self.span(term_id, term_id + 1)
+
+    def span(self, start: int, end: int) -> memoryview:
+        """Posting-списки термов [start, end) одним срезом (каждый список отсортирован, вместе — нет)."""
+        return memoryview(self.ids)[self.offsets[start] : self.offsets[end]]
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self.ids) + sys.getsizeof(self.offsets)
+
+
+class BookMemoryIndex:
+    """
+    Инвертированный индекс книг в памяти процесса (SEARCH_BACKEND=memory).
+
+    Раскладка:
+    - `_terms` — отсортированный список уникальных термов (строки интернированы), по нему bisect находит
+      диапазон термов с заданным префиксом (type-ahead);
+    - `_author`/`_title` — posting-списки полей author/title для термов `_terms` (`array('I')`, см. _FieldPostings).
+
+    Токенизация и свёртка `ё` → `е` — как в fts_query.py. Семантика — AND по словам внутри и между
+    параметрами (как build_books_search_query); `q` ищет слово в author или title.
+    """
+
+    def __init__(self, terms: list[str], author: _FieldPostings, title: _FieldPostings, books: int) -> None:
+        self._terms = terms
+        self._author = author
+        self._title = title
+        self.books = books
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple[int, str | None, str | None]]) -> "BookMemoryIndex":
+        builder = _IndexBuilder()
+        for book_id, author, title in rows:
+            builder.add(book_id, author, title)
+        return builder.finish()
+
+    @property
+    def terms(self) -> int:
+        return len(self._terms)
+
+    def memory_bytes(self) -> int:
+        """Оценка памяти индекса: строки термов, список термов и posting-массивы."""
+        strings = sum(sys.getsizeof(term) for term in self._terms)
+        return strings + sys.getsizeof(self._terms) + self._author.memory_bytes() + self._title.memory_bytes()
+
+    def search(
+        self,
+        *,
+        q: str | None,
+        author: str | None,
+        title: str | None,
+        limit: int,
+        count: bool = False,
+    ) -> tuple[int, list[int]]:
+        """
+        Возвращает (сколько книг подходит, id лучших limit книг). Выше книги, где больше слов совпало целиком
+        (а не префиксом), при равенстве — по возрастанию id.
+
+        Как у остальных движков (BookSearchHits.total): при count=True подсчёт ограничен limit + 1 —
+        если совпадений больше limit, ранжирование пропускается (вердикт «слишком много»);
+        при count=False возвращается число найденных id.
+
+        Множество строится только для самого редкого слова; остальные слова сужают его проходом по своим
+        posting-срезам (`set.intersection` по `array` без промежуточных множеств). Запрос из одного слова
+        с count=True останавливается на limit + 1 разных книгах.
+        """
+        clauses: list[tuple[str, tuple[_FieldPostings, ...]]] = []
+        for value, fields in ((author, (self._author,)), (title, (self._title,)), (q, (self._author, self._title))):
+            clauses.extend((token, fields) for token in fold_query_tokens(value))
+        if not clauses:
+            return 0, []
+
+        matches: list[_TokenMatch] = []
+        for token, token_fields in clauses:
+            match = self._match_token(token, token_fields)
+            if not match.size:
+                return 0, []
+            matches.append(match)
+
+        # AND: пересечение начинаем с самого редкого слова.
+        matches.sort(key=lambda m: m.size)
+
+        if count and len(matches) == 1 and matches[0].size > limit:
+            distinct = matches[0].first_distinct(limit + 1)
+            if len(distinct) > limit:
+                return len(distinct), []
+
+        result = matches[0].ids()
+        for match in matches[1:]:
+            result = match.intersect(result)
+            if not result:
+                return 0, []
+
+        if count and len(result) > limit:
+            return limit + 1, []
+        best = _ranked(result, matches, limit)
+        return (len(result) if count else len(best)), best
+
+    def _match_token(self, token: str, fields: tuple[_FieldPostings, ...]) -> "_TokenMatch":
+        start = bisect_left(self._terms, token)
+        if len(token) >= _MIN_PREFIX_LEN:
+            end = bisect_left(self._terms, token + _MAX_CHAR, lo=start)
+        else:
+            end = start + 1 if start < len(self._terms) and self._terms[start] == token else start
+        is_exact = start < end and self._terms[start] == token
+
+        # Posting-списки термов диапазона лежат в массиве подряд: на поле — один срез, без обхода термов.
+        spans: list[memoryview] = []
+        exact: list[memoryview] = []
+        for field in fields:
+            span = field.span(start, end)
+            if span:
+                spans.append(span)
+            if is_exact and (postings := field.get(start)):
+                exact.append(postings)
+        return _TokenMatch(spans, exact)
+
+
+class _TokenMatch:
+    """
+    Совпадения одного слова запроса: срезы posting-массивов полей по диапазону термов с этим префиксом
+    (склейка отсортированных списков, id могут повторяться) и отдельно отсортированные списки точного терма.
+    """
+
+    __slots__ = ("spans", "exact", "size")
+
+    def __init__(self, spans: list[memoryview], exact: list[memoryview]) -> None:
+        self.spans = spans
+        self.exact = exact
+        # Верхняя оценка числа книг: книга может встретиться у нескольких термов.
+        self.size = sum(len(span) for span in spans)
+
+    def ids(self) -> set[int]:
+        return set().union(*self.spans)
+
+    def intersect(self, candidates: set[int]) -> set[int]:
+        found: set[int] = set()
+        for span in self.spans:
+            found |= candidates.intersection(span)
+        return found
+
+    def first_distinct(self, n: int) -> set[int]:
+        """До n разных id — для вердикта «слишком много» без обхода всех совпадений."""
+        distinct: set[int] = set()
+        for span in self.spans:
+            for book_id in span:
+                distinct.add(book_id)
+                if len(distinct) >= n:
+                    return distinct
+        return distinct
+
+    def exact_hits(self, book_id: int) -> bool:
+        return any(_contains(postings, book_id) for postings in self.exact)
+
+
+def _ranked(result: set[int], matches: list[_TokenMatch], limit: int) -> list[int]:
+    """Лучшие limit книг: сначала совпавшие целыми словами (по числу слов), затем остальные по возрастанию id."""
+    exact_ids: set[int] = set()
+    for match in matches:
+        for postings in match.exact:
+            exact_ids |= result.intersection(postings)
+
+    def _rank(book_id: int) -> tuple[int, int]:
+        return (-sum(1 for match in matches if match.exact_hits(book_id)), book_id)
+
+    best = heapq.nsmallest(limit, exact_ids, key=_rank)
+    if len(best) < limit:
+        best += heapq.nsmallest(limit - len(best), result - exact_ids)
+    return best
+
+
+def _contains(postings: memoryview, book_id: int) -> bool:
+    i = bisect_left(postings, book_id)  # type: ignore[arg-type]
+    return i < len(postings) and postings[i] == book_id
+
+
+class _IndexBuilder:
+    def __init__(self) -> None:
+        self._author: dict[str, list[int]] = {}
+        self._title: dict[str, list[int]] = {}
+        self._books = 0
+
+    def add(self, book_id: int, author: str | None, title: str | None) -> None:
+        self._books += 1
+        for value, field in ((author, self._author), (title, self._title)):
+            for term in set(fold_query_tokens(value)):
+                field.setdefault(sys.intern(term), []).append(book_id)
+
+    def finish(self) -> BookMemoryIndex:
+        terms = sorted(self._author.keys() | self._title.keys())
+
+        def _postings(field: dict[str, list[int]]) -> _FieldPostings:
+            ids = array("I")
+            offsets = array("I", [0])
+            for term in terms:
+                term_ids = field.pop(term, None)
+                if term_ids is not None:
+                    term_ids.sort()
+                    ids.extend(term_ids)
+                offsets.append(len(ids))
+            return _FieldPostings(ids, offsets)
+
+        return BookMemoryIndex(terms, _postings(self._author), _postings(self._title), self._books)
+
+
+async def build_books_memory_index(session: AsyncSession, *, partition_size: int = 10_000) -> BookMemoryIndex:
+    """
+    Строит индекс, читая `books` потоком (id, author, title), и делает его текущим для поиска.
+    Между порциями строк отдаёт управление event loop, чтобы приложение отвечало во время сборки.
+    """
+    global _index
+    started = time.perf_counter()
+    builder = _IndexBuilder()
+    result = await session.stream(select(BookORM.id, BookORM.author, BookORM.title))
+    async for partition in result.partitions(partition_size):
+        for row in partition:
+            builder.add(int(row.id), row.author, row.title)
+        await asyncio.sleep(0)
+
+    index = builder.finish()
+    _index = index
+    bump_books_index_generation()
+    logger.info(
+        "In-memory индекс книг построен: %d книг, %d термов, ~%.1f МиБ за %.1f сек.",
+        index.books,
+        index.terms,
+        index.memory_bytes() / 1024 / 1024,
+        time.perf_counter() - started,
+    )
+    return index
+
+
+async def ensure_books_memory_index(session: AsyncSession) -> BookMemoryIndex:
+    """Возвращает текущий индекс, строя его при первом обращении (один раз на процесс)."""
+    if _index is not None:
+        return _index
+    async with _index_lock:
+        if _index is not None:
+            return _index
+        return await build_books_memory_index(session)
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from domain.interfaces.storage import IObjectManifest, StoredObject
+from infrastructure.db.models.s3_object_orm import S3ObjectORM
+
+
+logger = logging.getLogger(__name__)
+
+
+class S3ObjectManifest(IObjectManifest):
+    """
+    Манифест объектов, загруженных в бакет (таблица s3_objects): ключ, размер, ETag и время загрузки.
+
+    Запись считается действительной ttl_s с момента загрузки — столько объект живёт в бакете
+    по ILM-правилу (`mc ilm add --expire-days`, S3_OBJECT_TTL_DAYS). Пока запись действительна,
+    наличие объекта проверяется без HEAD-запроса к S3. Объекты, удалённые из бакета вручную раньше
+    срока, манифест не видит.
+
+    Манифест — только ускорение: ошибки БД логируются и считаются промахом. Работает в собственных
+    коротких сессиях на engine, а не в сессии запроса: запись в манифест не коммитит чужие изменения.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        bucket: str,
+        ttl_s: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._engine = engine
+        self._bucket = bucket
+        self._ttl_s = ttl_s
+        self._clock = clock
+
+    async def get(self, key: str) -> StoredObject | None:
+        """Запись об объекте или None, если объект не загружался или срок его жизни в бакете истёк."""
+        stmt = select(S3ObjectORM).where(S3ObjectORM.bucket == self._bucket, S3ObjectORM.key == key)
+        try:
+            async with AsyncSession(self._engine) as session:
+                row = (await session.execute(stmt)).scalar_one_or_none()
+        except SQLAlchemyError:
+            logger.warning("Манифест S3 недоступен — проверяю %s запросом к S3", key, exc_info=True)
+            return None
+        if row is None:
+            return None
+        uploaded_at = float(row.uploaded_at)
+        if uploaded_at + self._ttl_s <= self._clock():
+            return None
+        return StoredObject(
+            key=str(row.key),
+            size=int(row.size),
+            etag=str(row.etag),
+            uploaded_at=datetime.fromtimestamp(uploaded_at, timezone.utc),
+        )
+
+    async def put(self, stored: StoredObject) -> None:
+        try:
+            async with AsyncSession(self._engine) as session, session.begin():
+                await session.merge(
+                    S3ObjectORM(
+                        bucket=self._bucket,
+                        key=stored["key"],
+                        size=stored["size"],
+                        etag=stored["etag"],
+                        uploaded_at=stored["uploaded_at"].timestamp(),
+                    )
+                )
+        except SQLAlchemyError:
+            logger.warning("Не удалось записать %s в манифест S3", stored["key"], exc_info=True)
+
+
+async def ensure_object_manifest(engine: AsyncEngine) -> None:
+    """Создаёт таблицу s3_objects, если её ещё нет."""
+    async with engine.begin() as conn:
+        await conn.run_sync(S3ObjectORM.__table__.create, checkfirst=True)  # type: ignore[attr-defined]
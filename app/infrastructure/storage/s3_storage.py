@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
 import logging
-from pathlib import Path
+from typing import IO, Any
 
 from domain.exceptions import StorageUnavailableError
-from domain.interfaces.storage import IFileStorage
+from domain.interfaces.storage import IFileStorage, StoredObject
 
 
 logger = logging.getLogger(__name__)
 
 
 class S3Storage(IFileStorage):
+    """
+    S3/MinIO-хранилище с одним долгоживущим клиентом на экземпляр.
+
+    Клиент (и его пул соединений на `max_pool_connections`) создаётся один раз — в lifespan через open()
+    или лениво при первом обращении — и переиспользуется всеми запросами: HEAD и загрузка одного экспорта
+    идут по уже открытым keep-alive соединениям, без повторного разбора endpoint и TLS-рукопожатия.
+    close() закрывает клиент и пул; после него следующий вызов откроет клиент заново.
+    """
+
     def __init__(
         self,
         *,
@@ -19,12 +31,16 @@ class S3Storage(IFileStorage):
         secret_key: str,
         bucket: str,
         region: str,
+        max_pool_connections: int = 10,
+        multipart_chunk_bytes: int = 8 * 1024 * 1024,
     ) -> None:
         self._endpoint_url = endpoint_url
         self._access_key = access_key
         self._secret_key = secret_key
         self._bucket = bucket
         self._region = region
+        self._max_pool_connections = max_pool_connections
+        self._multipart_chunk_bytes = multipart_chunk_bytes
         try:
             import aioboto3  # type: ignore
         except ModuleNotFoundError as ex:
@@ -32,70 +48,136 @@ class S3Storage(IFileStorage):
                 "Пакет 'aioboto3' не установлен. Установите зависимости проекта (см. pyproject.toml)."
             ) from ex
         self._session = aioboto3.Session()
+        self._client: Any | None = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._client_lock = asyncio.Lock()
 
-    async def file_exists(self, *, key: str) -> bool:
-        from botocore.client import Config
-        from botocore.exceptions import ClientError, EndpointConnectionError
+    async def open(self) -> None:
+        """Создаёт общий клиент S3, если он ещё не создан."""
+        await self._get_client()
 
-        async with self._session.client(
-            "s3",
-            endpoint_url=self._endpoint_url,
-            aws_access_key_id=self._access_key,
-            aws_secret_access_key=self._secret_key,
-            region_name=self._region,
-            config=Config(
-                signature_version="s3v4",
-                s3={"addressing_style": "path"},
-                retries={"max_attempts": 5, "mode": "standard"},
-            ),
-        ) as client:
-            try:
-                await client.head_object(Bucket=self._bucket, Key=key)
-                return True
-            except ClientError as err:
-                code = (err.response or {}).get("Error", {}).get("Code")
-                if code in {"404", "NoSuchKey", "NotFound"}:
-                    return False
-                raise
-            except EndpointConnectionError as err:
-                logger.exception(
-                    "S3 endpoint недоступен при head_object (endpoint=%s bucket=%s key=%s)",
+    async def close(self) -> None:
+        """Закрывает общий клиент S3 и его пул соединений."""
+        async with self._client_lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+
+    async def _get_client(self) -> Any:
+        if self._client is not None:
+            return self._client
+        async with self._client_lock:
+            if self._client is None:
+                from botocore.client import Config
+
+                exit_stack = AsyncExitStack()
+                self._client = await exit_stack.enter_async_context(
+                    self._session.client(
+                        "s3",
+                        endpoint_url=self._endpoint_url,
+                        aws_access_key_id=self._access_key,
+                        aws_secret_access_key=self._secret_key,
+                        region_name=self._region,
+                        config=Config(
+                            signature_version="s3v4",
+                            s3={"addressing_style": "path"},
+                            retries={"max_attempts": 5, "mode": "standard"},
+                            max_pool_connections=self._max_pool_connections,
+                        ),
+                    )
+                )
+                self._exit_stack = exit_stack
+                logger.info(
+                    "S3-клиент создан (endpoint=%s, max_pool_connections=%d)",
                     self._endpoint_url,
-                    self._bucket,
-                    key,
+                    self._max_pool_connections,
                 )
-                raise StorageUnavailableError("S3/MinIO недоступен") from err
+            return self._client
+
+    async def stat_object(self, *, key: str) -> StoredObject | None:
+        """Метаданные объекта (HEAD) или None, если объекта нет."""
+        from botocore.exceptions import ClientError, EndpointConnectionError
+
+        client = await self._get_client()
+        try:
+            head = await client.head_object(Bucket=self._bucket, Key=key)
+            return StoredObject(
+                key=key, size=head["ContentLength"], etag=head["ETag"], uploaded_at=head["LastModified"]
+            )
+        except ClientError as err:
+            code = (err.response or {}).get("Error", {}).get("Code")
+            if code in {"404", "NoSuchKey", "NotFound"}:
+                return None
+            raise
+        except EndpointConnectionError as err:
+            logger.exception(
+                "S3 endpoint недоступен при head_object (endpoint=%s bucket=%s key=%s)",
+                self._endpoint_url,
+                self._bucket,
+                key,
+            )
+            raise StorageUnavailableError("S3/MinIO недоступен") from err
 
-    async def upload_file(self, *, key: str, path: Path, content_type: str | None = None) -> None:
-        from botocore.client import Config
+    async def upload_stream(
+        self,
+        *,
+        key: str,
+        stream: IO[bytes],
+        size: int,
+        content_type: str | None = None,
+    ) -> StoredObject:
+        """
+        Загружает поток (например, файл, открытый прямо в zip-архиве) без записи на диск.
+
+        Объект до multipart_chunk_bytes уходит одним put_object из памяти, больший — multipart upload
+        частями по multipart_chunk_bytes: в памяти держится не больше одной части. Поток читается
+        (и распаковывается) в пуле потоков, чтобы не блокировать event loop.
+
+        uploaded_at в ответе — момент начала загрузки: не позже, чем S3 проставит объекту LastModified.
+        """
         from botocore.exceptions import EndpointConnectionError
 
-        extra_args = {"ContentType": content_type} if content_type else None
-        async with self._session.client(
-            "s3",
-            endpoint_url=self._endpoint_url,
-            aws_access_key_id=self._access_key,
-            aws_secret_access_key=self._secret_key,
-            region_name=self._region,
-            config=Config(
-                signature_version="s3v4",
-                s3={"addressing_style": "path"},
-                retries={"max_attempts": 5, "mode": "standard"},
-            ),
-        ) as client:
-            try:
-                await client.upload_file(
-                    Filename=str(path),
-                    Bucket=self._bucket,
-                    Key=key,
-                    ExtraArgs=extra_args,
-                )
-            except EndpointConnectionError as err:
-                logger.exception(
-                    "S3 endpoint недоступен при upload_file (endpoint=%s bucket=%s key=%s path=%s)",
-                    self._endpoint_url,
-                    self._bucket,
-                    key,
-                    path,
+        extra_args: dict[str, str] = {"ContentType": content_type} if content_type else {}
+        client = await self._get_client()
+        started = datetime.now(timezone.utc)
+        try:
+            if size <= self._multipart_chunk_bytes:
+                body = await asyncio.to_thread(stream.read)
+                resp = await client.put_object(Bucket=self._bucket, Key=key, Body=body, **extra_args)
+                etag = resp["ETag"]
+            else:
+                etag = await self._upload_multipart(client, key=key, stream=stream, extra_args=extra_args)
+        except EndpointConnectionError as err:
+            logger.exception(
+                "S3 endpoint недоступен при загрузке (endpoint=%s bucket=%s key=%s size=%d)",
+                self._endpoint_url,
+                self._bucket,
+                key,
+                size,
+            )
+            raise StorageUnavailableError("S3/MinIO недоступен") from err
+        return StoredObject(key=key, size=size, etag=etag, uploaded_at=started)
+
+    async def _upload_multipart(self, client: Any, *, key: str, stream: IO[bytes], extra_args: dict[str, str]) -> str:
+        upload = await client.create_multipart_upload(Bucket=self._bucket, Key=key, **extra_args)
+        upload_id = upload["UploadId"]
+        parts: list[dict[str, Any]] = []
+        try:
+            while chunk := await asyncio.to_thread(stream.read, self._multipart_chunk_bytes):
+                part_number = len(parts) + 1
+                part = await client.upload_part(
+                    Bucket=self._bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=chunk
                 )
-                raise StorageUnavailableError("S3/MinIO недоступен") from err
+                parts.append({"PartNumber": part_number, "ETag": part["ETag"]})
+            resp = await client.complete_multipart_upload(
+                Bucket=self._bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+            return resp["ETag"]
+        except BaseException:
+            # Незавершённые части иначе остаются в бакете (и занимают место) до ручной очистки.
+            try:
+                await client.abort_multipart_upload(Bucket=self._bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                logger.exception("Не удалось отменить multipart upload (bucket=%s key=%s)", self._bucket, key)
+            raise
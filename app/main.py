@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 import logging
 
@@ -9,11 +10,23 @@ from uvicorn.config import Config
 from uvicorn.server import Server
 
 from api.router import router
+from composition import close_archive_handles, close_file_storage, get_file_storage
 from config.config import settings
 from config.logger import configure_logger
 from domain.util import stop_event
+from infrastructure.archives.zip_index import ensure_archive_index
+from infrastructure.db.catalog_snapshot import close_catalog_snapshot, open_catalog_snapshot
+from infrastructure.db.catalog_version import ensure_books_catalog_version
 from infrastructure.db.db import sessionmanager
-from infrastructure.search.es_client import close_elasticsearch, init_elasticsearch
+from infrastructure.db.es_changelog import drop_books_es_changelog, ensure_books_es_changelog
+from infrastructure.db.fts import ensure_books_fts, ensure_books_fts_trigram
+from infrastructure.db.isbn_index import ensure_books_isbn_index
+from infrastructure.search.books_index import start_books_auto_index, stop_books_auto_index, warm_up_books_index
+from infrastructure.search.catalog_watch import run_books_catalog_watch
+from infrastructure.search.es_client import close_elasticsearch, elasticsearch_enabled, init_elasticsearch
+from infrastructure.search.index_sync import run_books_index_sync
+from infrastructure.search.memory_index import ensure_books_memory_index
+from infrastructure.storage.object_manifest import ensure_object_manifest
 from mcp_server import mcp_app
 
 
@@ -27,12 +40,50 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # startup events
     await init_elasticsearch()
+    await get_file_storage().open()
+    sync_task: asyncio.Task[None] | None = None
+    catalog_watch_task: asyncio.Task[None] | None = None
+    await ensure_books_isbn_index(sessionmanager.engine)
+    await ensure_archive_index(sessionmanager.engine)
+    await ensure_object_manifest(sessionmanager.engine)
+    if settings.CATALOG_SNAPSHOT_PATH is not None:
+        async with sessionmanager.session() as session:
+            await open_catalog_snapshot(session, settings.CATALOG_SNAPSHOT_PATH)
+    if settings.SEARCH_BACKEND == "sqlite_fts":
+        await ensure_books_fts(sessionmanager.engine)
+        await ensure_books_fts_trigram(sessionmanager.engine)
+        # FTS обновляется триггерами сразу, а кэш поиска узнаёт о правках каталога по счётчику версий.
+        if settings.SEARCH_CACHE_ENABLED and await ensure_books_catalog_version(sessionmanager.engine):
+            catalog_watch_task = asyncio.create_task(run_books_catalog_watch(), name="books-catalog-watch")
+    elif settings.SEARCH_BACKEND == "memory":
+        async with sessionmanager.session() as session:
+            await ensure_books_memory_index(session)
+    else:
+        if elasticsearch_enabled() and settings.ELASTICSEARCH_SYNC_ENABLED:
+            if await ensure_books_es_changelog(sessionmanager.engine):
+                sync_task = asyncio.create_task(run_books_index_sync(), name="books-index-sync")
+        # Журнал изменений создаётся до загрузки: правки, сделанные во время неё, догонит синхронизация.
+        if await warm_up_books_index():
+            # Пустой индекс заполняется в фоне: приложение начинает отвечать, не дожидаясь загрузки каталога.
+            start_books_auto_index()
+    if sync_task is None:
+        # Журнал без читателя рос бы бесконечно: триггеры books_es_* снимаются, пока синхронизация не запущена.
+        await drop_books_es_changelog(sessionmanager.engine)
 
     yield
 
     # shutdown events
     stop_event.set()
+    await stop_books_auto_index()
+    for task in (sync_task, catalog_watch_task):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
     await close_elasticsearch()
+    await close_file_storage()
+    close_archive_handles()
+    close_catalog_snapshot()
     await sessionmanager.close()
 
 
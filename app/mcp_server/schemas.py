@@ -2,18 +2,54 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
-from domain.models.book import Book
+from domain.models.book import Book, BookGroup, BookSearchBatchItem, BookSearchFacets, BookSuggestion
 
 
 class BooksSearchToolResponse(BaseModel):
-    status: Literal["ok", "validation_error", "no_results", "too_many_results"] = Field(
+    status: Literal["ok", "validation_error", "no_results", "too_many_results", "invalid_cursor"] = Field(
         ...,
         description="Статус выполнения поиска",
     )
     books: list[Book] = Field(default_factory=list, description="Найденные книги")
+    groups: list[BookGroup] = Field(
+        default_factory=list,
+        description="Только в режиме grouped: найденные произведения, у каждого — список его изданий",
+    )
+    facets: BookSearchFacets | None = Field(
+        None,
+        description=(
+            "При facets=true и статусе 'too_many_results': самые частые genre/lang/year среди найденных "
+            "с числом книг — значения для фильтров genre/lang/year"
+        ),
+    )
+    next_cursor: str | None = Field(
+        None,
+        description=(
+            "Только в постраничном режиме: курсор следующей страницы (передай его в cursor); "
+            "null — это последняя страница"
+        ),
+    )
     detail: str | None = Field(None, description="Пояснение для статусов без результата")
 
 
+class BooksSuggestToolResponse(BaseModel):
+    status: Literal["ok", "validation_error"] = Field(..., description="Статус выполнения")
+    suggestions: list[BookSuggestion] = Field(
+        default_factory=list,
+        description="Подсказки: книги, у которых автор или название начинается с prefix (id, author, title)",
+    )
+    detail: str | None = Field(None, description="Пояснение для validation_error")
+
+
+class BooksSearchBatchToolResponse(BaseModel):
+    status: Literal["ok", "validation_error"] = Field(..., description="Статус выполнения пакетного поиска")
+    results: list[BookSearchBatchItem] = Field(
+        default_factory=list,
+        description="Исходы поиска в порядке запросов: у каждого свой статус ok/no_results/too_many_results",
+    )
+    detail: str | None = Field(None, description="Пояснение для validation_error")
+
+
 class ExportBookToolResponse(BaseModel):
     status: Literal["ok", "not_found", "invalid_book_data", "storage_unavailable"] = Field(
         ...,
@@ -10,14 +10,23 @@ from domain.exceptions import (
     BooksNotFoundError,
     EmailSendError,
     NotFoundError,
+    SearchCursorError,
     StorageUnavailableError,
     TooManyResultsError,
+    UnsupportedSearchOptionError,
     ValueException,
 )
-from domain.services.book_service import BookService
+from domain.models.book import BookSearchFilters, BookSearchQuery
+from domain.services.book_service import SEARCH_BATCH_MAX_QUERIES, BookService
 from infrastructure.db.db import sessionmanager
 
-from .schemas import BooksSearchToolResponse, ExportBookToolResponse, SendBookEmailToolResponse
+from .schemas import (
+    BooksSearchBatchToolResponse,
+    BooksSearchToolResponse,
+    BooksSuggestToolResponse,
+    ExportBookToolResponse,
+    SendBookEmailToolResponse,
+)
 
 
 mcp = FastMCP(
@@ -38,8 +47,11 @@ mcp = FastMCP(
         "\n"
         "Порядок вызовов (шаги нельзя пропускать или менять местами):\n"
         "1. search_books — найди книги по запросу пользователя. 'too_many_results' — уточни "
-        "запрос и повтори; 'no_results' — упрости/измени запрос; 'validation_error' — не задан "
-        "ни один параметр поиска.\n"
+        "запрос и повтори (или, если пользователю нужен весь список, повтори с paginate=true и листай "
+        "страницы по next_cursor); 'no_results' — упрости/измени запрос; 'validation_error' — не задан "
+        "ни один параметр поиска. Если нужно найти сразу несколько разных книг (список для чтения), "
+        "вызови один раз search_books_batch вместо нескольких search_books. Если пользователь помнит "
+        "только начало фамилии или названия, подбери вариант через suggest_books и затем ищи search_books.\n"
         "2. Пользователь (через агента) выбирает РОВНО ОДНУ книгу из результатов. До явного "
         "выбора пользователя НЕ вызывай export_book_to_s3 и send_book_to_email.\n"
         "3. export_book_to_s3 — выгрузи выбранную книгу в S3 (один book_id). Возьми bucket и key.\n"
@@ -60,6 +72,15 @@ def _normalize_query_part(value: str | None) -> str | None:
     return normalized or None
 
 
+def _search_filters(*, genre: str | None, lang: str | None, year: str | None) -> BookSearchFilters | None:
+    filters = BookSearchFilters(
+        genre=_normalize_query_part(genre),
+        lang=_normalize_query_part(lang),
+        year=_normalize_query_part(year),
+    )
+    return filters if filters.model_dump(exclude_none=True) else None
+
+
 @mcp.tool(
     name="search_books",
     description=(
@@ -74,10 +95,19 @@ def _normalize_query_part(value: str | None) -> str | None:
         "Статусы ответа:\n"
         "- 'ok' — в books список найденных книг (одна или несколько); покажи их пользователю.\n"
         "- 'too_many_results' — найдено слишком много книг (>50); уточни запрос "
-        "(добавь автора/название) и вызови инструмент снова.\n"
+        "(добавь автора/название) и вызови инструмент снова. Если нужен полный список "
+        "(например, все книги автора), вызови с paginate=true: вернутся первые 50 книг и next_cursor; "
+        "следующую страницу получишь, передав cursor=next_cursor (остальные параметры не нужны). "
+        "next_cursor=null — страниц больше нет.\n"
+        "Если вариантов одной книги много, вызови с grouped=true: в groups вернётся по записи на "
+        "произведение (автор + название) с его изданиями в editions, а порог — 50 произведений, а не книг.\n"
+        "Широкий запрос можно сузить фильтрами genre/lang/year (точные значения). Передай facets=true — "
+        "тогда при 'too_many_results' в facets придут самые частые жанры, языки и годы среди найденных "
+        "с числом книг; предложи пользователю выбрать, и повтори поиск с фильтром.\n"
         "- 'no_results' — ничего не найдено; упрости или измени запрос (часть фамилии "
         "автора, часть названия, без лишних символов) и попробуй снова.\n"
-        "- 'validation_error' — не передан ни один параметр поиска."
+        "- 'validation_error' — не передан ни один параметр поиска.\n"
+        "- 'invalid_cursor' — курсор повреждён или устарел (листание прервалось надолго); начни поиск заново."
     ),
     annotations={
         "title": "Поиск книг",
@@ -105,10 +135,51 @@ async def search_books(
         str | None,
         Field(description="Поиск по названию книги (можно часть названия)."),
     ] = None,
+    paginate: Annotated[
+        bool,
+        Field(description="Постраничный режим: страницы по 50 книг вместо статуса 'too_many_results'."),
+    ] = False,
+    cursor: Annotated[
+        str | None,
+        Field(description="next_cursor из предыдущего ответа — следующая страница того же поиска."),
+    ] = None,
+    grouped: Annotated[
+        bool,
+        Field(description="Сгруппировать издания по произведениям (ответ в groups). Не сочетается с paginate."),
+    ] = False,
+    genre: Annotated[
+        str | None,
+        Field(description="Фильтр: точное значение жанра (из facets предыдущего ответа)."),
+    ] = None,
+    lang: Annotated[
+        str | None,
+        Field(description="Фильтр: точное значение языка (из facets)."),
+    ] = None,
+    year: Annotated[
+        str | None,
+        Field(description="Фильтр: точное значение года издания (из facets)."),
+    ] = None,
+    facets: Annotated[
+        bool,
+        Field(description="При 'too_many_results' вернуть счётчики genre/lang/year для сужения запроса."),
+    ] = False,
 ) -> BooksSearchToolResponse:
     q_norm = _normalize_query_part(q)
     author_norm = _normalize_query_part(author)
     title_norm = _normalize_query_part(title)
+    cursor_norm = _normalize_query_part(cursor)
+    filters = _search_filters(genre=genre, lang=lang, year=year)
+
+    if grouped and (cursor_norm or paginate):
+        return BooksSearchToolResponse(
+            status="validation_error",
+            detail="grouped нельзя сочетать с paginate/cursor.",
+        )
+
+    if cursor_norm or paginate:
+        return await _search_books_page(
+            q=q_norm, author=author_norm, title=title_norm, cursor=cursor_norm, filters=filters
+        )
 
     if not q_norm and not author_norm and not title_norm:
         return BooksSearchToolResponse(
@@ -118,15 +189,127 @@ async def search_books(
 
     async with book_service_context() as service:
         try:
-            books = await service.search(q=q_norm, author=author_norm, title=title_norm)
+            if grouped:
+                groups = await service.search_grouped(q=q_norm, author=author_norm, title=title_norm, filters=filters)
+                return BooksSearchToolResponse(status="ok", groups=groups)
+            books = await service.search(q=q_norm, author=author_norm, title=title_norm, filters=filters, facets=facets)
         except TooManyResultsError as ex:
-            return BooksSearchToolResponse(status="too_many_results", detail=str(ex))
+            return BooksSearchToolResponse(status="too_many_results", detail=str(ex), facets=ex.facets)
         except BooksNotFoundError as ex:
             return BooksSearchToolResponse(status="no_results", detail=str(ex))
+        except UnsupportedSearchOptionError as ex:
+            return BooksSearchToolResponse(status="validation_error", detail=str(ex))
 
     return BooksSearchToolResponse(status="ok", books=books)
 
 
+async def _search_books_page(
+    *,
+    q: str | None,
+    author: str | None,
+    title: str | None,
+    cursor: str | None,
+    filters: BookSearchFilters | None,
+) -> BooksSearchToolResponse:
+    if not cursor and not q and not author and not title:
+        return BooksSearchToolResponse(
+            status="validation_error",
+            detail="Нужно указать хотя бы один параметр поиска: q, author или title.",
+        )
+
+    async with book_service_context() as service:
+        try:
+            page = await service.search_pages(q=q, author=author, title=title, cursor=cursor, filters=filters)
+        except BooksNotFoundError as ex:
+            return BooksSearchToolResponse(status="no_results", detail=str(ex))
+        except SearchCursorError as ex:
+            return BooksSearchToolResponse(status="invalid_cursor", detail=str(ex))
+        except UnsupportedSearchOptionError as ex:
+            return BooksSearchToolResponse(status="validation_error", detail=str(ex))
+
+    return BooksSearchToolResponse(status="ok", books=page.books, next_cursor=page.next_cursor)
+
+
+@mcp.tool(
+    name="search_books_batch",
+    description=(
+        "Шаг 1 из 3 для нескольких книг сразу (например, список для чтения): выполняет до 50 поисков "
+        "за один вызов. Каждый элемент queries — как параметры search_books (q, author, title; нужен хотя бы один).\n"
+        "В results — исход по каждому запросу в том же порядке, со статусами как у search_books: "
+        "'ok' (books), 'no_results', 'too_many_results' (уточни этот запрос). "
+        "Выбор книги по-прежнему за пользователем.\n"
+        "Статус всего ответа 'validation_error' — пустой список или запрос без параметров."
+    ),
+    annotations={
+        "title": "Пакетный поиск книг",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "openWorldHint": False,
+    },
+)
+async def search_books_batch(
+    queries: Annotated[
+        list[BookSearchQuery],
+        Field(description="Поисковые запросы (до 50): объекты с полями q, author, title."),
+    ],
+) -> BooksSearchBatchToolResponse:
+    if not queries or len(queries) > SEARCH_BATCH_MAX_QUERIES:
+        return BooksSearchBatchToolResponse(
+            status="validation_error",
+            detail=f"Передай от 1 до {SEARCH_BATCH_MAX_QUERIES} запросов.",
+        )
+
+    normalized: list[BookSearchQuery] = []
+    for i, query in enumerate(queries):
+        item = BookSearchQuery(
+            q=_normalize_query_part(query.q),
+            author=_normalize_query_part(query.author),
+            title=_normalize_query_part(query.title),
+        )
+        if not item.q and not item.author and not item.title:
+            return BooksSearchBatchToolResponse(
+                status="validation_error",
+                detail=f"queries[{i}]: нужно указать хотя бы один параметр поиска: q, author или title.",
+            )
+        normalized.append(item)
+
+    async with book_service_context() as service:
+        results = await service.search_batch(normalized)
+
+    return BooksSearchBatchToolResponse(status="ok", results=results)
+
+
+@mcp.tool(
+    name="suggest_books",
+    description=(
+        "Быстрые подсказки по началу имени автора или названия (автодополнение): до 10 вариантов "
+        "{id, author, title} без подробностей книги. Полезно, когда пользователь помнит только начало "
+        "фамилии или названия: уточни по подсказкам, что он ищет, и затем вызови search_books.\n"
+        "Статус 'validation_error' — пустой prefix."
+    ),
+    annotations={
+        "title": "Подсказки автора и названия",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "openWorldHint": False,
+    },
+)
+async def suggest_books(
+    prefix: Annotated[
+        str,
+        Field(description="Начало фамилии/имени автора или названия книги (например, «аку» или «война и»)."),
+    ],
+) -> BooksSuggestToolResponse:
+    prefix_norm = _normalize_query_part(prefix)
+    if not prefix_norm:
+        return BooksSuggestToolResponse(status="validation_error", detail="Нужно передать непустой prefix.")
+
+    async with book_service_context() as service:
+        suggestions = await service.suggest(prefix_norm[:100])
+
+    return BooksSuggestToolResponse(status="ok", suggestions=suggestions)
+
+
 @mcp.tool(
     name="export_book_to_s3",
     description=(
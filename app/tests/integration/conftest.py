@@ -16,7 +16,7 @@ from sqlalchemy.pool import StaticPool
 
 from config.config import settings
 from infrastructure.db.db import get_db
-from infrastructure.search.es_client import get_elasticsearch
+from infrastructure.search.books_index import delete_books_index_if_exists
 from main import app as actual_app
 
 
@@ -143,12 +143,10 @@ async def reset_elasticsearch_index(app):
     """
     Изоляция тестов: индекс книг сбрасывается перед каждым тестом.
 
-    Дальше индекс будет (пере)заполнен лениво при первом запросе поиска через ensure_books_index(session).
+    Дальше индекс будет (пере)заполнен лениво при первом запросе поиска через ensure_books_index(session):
+    delete_books_index_if_exists сбрасывает закэшированную готовность индекса.
     """
-    client = get_elasticsearch()
-    index = settings.ELASTICSEARCH_INDEX
-    if await asyncio.to_thread(client.indices.exists, index=index):
-        await asyncio.to_thread(client.indices.delete, index=index)
+    await delete_books_index_if_exists()
 
 
 @pytest.fixture
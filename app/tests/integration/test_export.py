@@ -8,6 +8,7 @@ from botocore.client import Config
 from httpx import AsyncClient
 import pytest
 
+from composition import close_file_storage
 from config.config import settings
 
 
@@ -63,6 +64,8 @@ async def test_export_uploads_to_real_s3(
     monkeypatch.setattr(settings, "S3_SECRET_KEY", s3_test_config["secret_key"])
     monkeypatch.setattr(settings, "S3_BUCKET", s3_test_config["bucket"])
     monkeypatch.setattr(settings, "S3_REGION", s3_test_config["region"])
+    # Общий S3-клиент создан в lifespan со старыми настройками: следующий запрос соберёт его заново.
+    await close_file_storage()
 
     resp = await client.post(api_url(f"/v1/books/{book_id}/export"))
     assert resp.status_code == 200, resp.text
@@ -109,6 +112,8 @@ async def test_export_skips_extraction_when_object_exists_in_s3(
     monkeypatch.setattr(settings, "S3_SECRET_KEY", s3_test_config["secret_key"])
     monkeypatch.setattr(settings, "S3_BUCKET", s3_test_config["bucket"])
     monkeypatch.setattr(settings, "S3_REGION", s3_test_config["region"])
+    # Общий S3-клиент создан в lifespan со старыми настройками: следующий запрос соберёт его заново.
+    await close_file_storage()
 
     resp1 = await client.post(api_url(f"/v1/books/{book_id}/export"))
     assert resp1.status_code == 200, resp1.text
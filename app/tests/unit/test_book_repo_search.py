@@ -0,0 +1,371 @@
+import base64
+import json
+from typing import Any
+
+import pytest
+
+from config.config import settings
+from domain.exceptions import SearchCursorError
+from domain.models.book import Book
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.repositories.book_repo import BookRepo
+from infrastructure.search import es_backend
+
+
+class _FakeClient:
+    def __init__(self, response: dict[str, Any]) -> None:
+        self.response = response
+        self.search_kwargs: dict[str, Any] | None = None
+
+    def search(self, **kwargs: Any) -> dict[str, Any]:
+        self.search_kwargs = kwargs
+        return self.response
+
+
+class _NoDb:
+    async def execute(self, *args, **kwargs):  # pragma: no cover
+        raise AssertionError("в денормализованном режиме поиск не должен ходить в БД")
+
+
+@pytest.fixture
+def fake_es(monkeypatch):
+    def _install(response: dict[str, Any]) -> _FakeClient:
+        client = _FakeClient(response)
+        monkeypatch.setattr(settings, "SEARCH_BACKEND", "elasticsearch")
+        monkeypatch.setattr(settings, "ELASTICSEARCH_URL", "http://127.0.0.1:9")
+        monkeypatch.setattr(es_backend, "books_index_ready", lambda: True)
+        monkeypatch.setattr(es_backend, "get_elasticsearch", lambda: client)
+        return client
+
+    return _install
+
+
+@pytest.mark.asyncio
+async def test_search_builds_books_from_source_in_denormalized_mode(fake_es, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", True)
+    client = fake_es(
+        {
+            "hits": {
+                "hits": [
+                    {"_id": "7", "_source": {"author": "Акунин Борис", "title": "Азазель", "file_size_mb": 0.4}},
+                    {"_id": "3", "_source": {"author": "Акунин Борис", "title": "Турецкий гамбит"}},
+                ]
+            }
+        }
+    )
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    books = await repo.search(author="Акунин", limit=10)
+
+    assert [b.id for b in books] == [7, 3]
+    assert books[0].title == "Азазель"
+    assert books[0].file_size_mb == 0.4
+    assert client.search_kwargs is not None
+    assert client.search_kwargs["filter_path"] == ["hits.hits._id", "hits.hits._source"]
+    assert "archive_name" in client.search_kwargs["body"]["_source"]
+
+
+@pytest.mark.asyncio
+async def test_search_hydrate_true_requests_ids_only(fake_es, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", True)
+    client = fake_es({})
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    assert await repo.search(title="нет", hydrate=True) == []
+    assert client.search_kwargs is not None
+    assert client.search_kwargs["body"]["_source"] is False
+    assert client.search_kwargs["filter_path"] == ["hits.hits._id"]
+
+
+@pytest.mark.asyncio
+async def test_search_page_counts_hits_and_skips_hydration_when_too_many(fake_es):
+    client = fake_es({"hits": {"total": {"value": 51}, "hits": [{"_id": str(i)} for i in range(50)]}})
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    page = await repo.search_page(author="Акунин", limit=50)
+
+    assert page.total == 51
+    assert page.books == []
+    assert client.search_kwargs is not None
+    assert client.search_kwargs["body"]["track_total_hits"] == 51
+    assert "hits.total.value" in client.search_kwargs["filter_path"]
+
+
+class _FakePitClient:
+    def __init__(self, pages: list[list[dict[str, Any]]]) -> None:
+        self.pages = pages
+        self.search_bodies: list[dict[str, Any]] = []
+        self.opened: list[dict[str, Any]] = []
+        self.closed: list[str] = []
+
+    def open_point_in_time(self, **kwargs: Any) -> dict[str, Any]:
+        self.opened.append(kwargs)
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, **kwargs: Any) -> dict[str, Any]:
+        self.closed.append(kwargs["id"])
+        return {"succeeded": True}
+
+    def search(self, **kwargs: Any) -> dict[str, Any]:
+        assert "index" not in kwargs
+        self.search_bodies.append(kwargs["body"])
+        return {"pit_id": f"pit-{len(self.search_bodies) + 1}", "hits": {"hits": self.pages.pop(0)}}
+
+
+def _hits(*ids: int) -> list[dict[str, Any]]:
+    return [{"_id": str(i), "_source": {"title": f"Книга {i}"}, "sort": [1.0, i]} for i in ids]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_walks_pit_with_search_after(fake_es, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", True)
+    client = _FakePitClient([_hits(1, 2, 3), _hits(4)])
+    fake_es({})
+    monkeypatch.setattr(es_backend, "get_elasticsearch", lambda: client)
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    first = await repo.search_pages(author="Акунин", limit=2)
+    second = await repo.search_pages(limit=2, cursor=first.next_cursor)
+
+    assert [b.id for b in first.books] == [1, 2]
+    assert [b.id for b in second.books] == [4]
+    assert second.next_cursor is None
+    assert len(client.opened) == 1
+    assert client.search_bodies[0]["size"] == 3
+    assert "search_after" not in client.search_bodies[0]
+    # Вторая страница продолжает с sort последней книги первой, по актуальному PIT и тем же запросом.
+    assert client.search_bodies[1]["search_after"] == [1.0, 2]
+    assert client.search_bodies[1]["pit"]["id"] == "pit-2"
+    assert client.search_bodies[1]["query"] == client.search_bodies[0]["query"]
+    assert client.closed == ["pit-3"]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_rejects_broken_and_expired_cursors(fake_es, monkeypatch):
+    from elasticsearch import NotFoundError as ElasticsearchNotFoundError
+
+    from domain.exceptions import SearchCursorError
+
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", True)
+    client = _FakePitClient([_hits(1, 2)])
+    fake_es({})
+    monkeypatch.setattr(es_backend, "get_elasticsearch", lambda: client)
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+    first = await repo.search_pages(title="Книга", limit=1)
+
+    with pytest.raises(SearchCursorError):
+        await repo.search_pages(limit=1, cursor="не-курсор")
+
+    def _expired(**kwargs: Any) -> dict[str, Any]:
+        raise ElasticsearchNotFoundError("search_context_missing_exception", None, {})  # type: ignore[arg-type]
+
+    monkeypatch.setattr(client, "search", _expired)
+    with pytest.raises(SearchCursorError):
+        await repo.search_pages(limit=1, cursor=first.next_cursor)
+
+
+class _FakeMsearchClient:
+    def __init__(self, responses: list[dict[str, Any]]) -> None:
+        self.responses = responses
+        self.msearch_kwargs: list[dict[str, Any]] = []
+
+    def msearch(self, **kwargs: Any) -> dict[str, Any]:
+        self.msearch_kwargs.append(kwargs)
+        return {"responses": self.responses}
+
+
+class _CountingDb:
+    def __init__(self, session) -> None:
+        self.session = session
+        self.statements = 0
+
+    async def execute(self, *args, **kwargs):
+        self.statements += 1
+        return await self.session.execute(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_search_page_many_runs_one_msearch_and_one_hydration_query(
+    fake_es, monkeypatch, async_engine, async_session
+):
+    from sqlalchemy import insert
+
+    from domain.models.book import BookSearchQuery
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await async_session.execute(insert(BookORM), [{"id": i, "title": f"Книга {i}"} for i in (1, 2, 3)])
+    await async_session.commit()
+
+    client = _FakeMsearchClient(
+        [
+            {"hits": {"total": {"value": 2}, "hits": [{"_id": "2"}, {"_id": "1"}]}},
+            {"hits": {"total": {"value": 0}, "hits": []}},
+            {"hits": {"total": {"value": 3}, "hits": [{"_id": "1"}, {"_id": "2"}]}},
+            {"hits": {"total": {"value": 1}, "hits": [{"_id": "3"}]}},
+        ]
+    )
+    fake_es({})
+    monkeypatch.setattr(es_backend, "get_elasticsearch", lambda: client)
+    db = _CountingDb(async_session)
+    repo: BookRepo = BookRepo(db, Book, BookORM)  # type: ignore[arg-type]
+    queries = [
+        BookSearchQuery(author="А"),
+        BookSearchQuery(title="нет"),
+        BookSearchQuery(q="много"),
+        BookSearchQuery(title="три"),
+    ]
+
+    pages = await repo.search_page_many(queries, limit=2)
+
+    assert [[b.id for b in page.books] for page in pages] == [[2, 1], [], [], [3]]
+    assert [page.total for page in pages] == [2, 0, 3, 1]
+    assert len(client.msearch_kwargs) == 1
+    searches = client.msearch_kwargs[0]["searches"]
+    assert len(searches) == 8
+    assert searches[1]["track_total_hits"] == 3
+    assert db.statements == 1
+
+
+def _group(total: int, *ids: int) -> dict[str, Any]:
+    editions = {"hits": {"total": {"value": total}, "hits": _hits(*ids)}}
+    return {"inner_hits": {"editions": editions}}
+
+
+@pytest.mark.asyncio
+async def test_search_groups_collapses_by_work_key_and_hydrates_once(fake_es, monkeypatch, async_engine, async_session):
+    from sqlalchemy import insert
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await async_session.execute(
+        insert(BookORM),
+        [
+            {"id": 1, "author": "Толстой Лев", "title": "Война и мир", "file_name": "1.fb2"},
+            {"id": 2, "author": "Толстой Лев", "title": "Война и мир", "file_name": "2.fb2"},
+            {"id": 3, "author": "Толстой Лев", "title": "Анна Каренина", "file_name": "3.fb2"},
+        ],
+    )
+    await async_session.commit()
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", False)
+    client = fake_es({"aggregations": {"works": {"value": 2}}, "hits": {"hits": [_group(3, 2, 1), _group(1, 3)]}})
+    db = _CountingDb(async_session)
+    repo: BookRepo = BookRepo(db, Book, BookORM)  # type: ignore[arg-type]
+
+    page = await repo.search_groups(author="Толстой", limit=2, editions=2)
+
+    assert page.total == 2
+    assert [(g.title, [b.id for b in g.editions], g.editions_total) for g in page.groups] == [
+        ("Война и мир", [2, 1], 3),
+        ("Анна Каренина", [3], 1),
+    ]
+    assert db.statements == 1
+    body = client.search_kwargs["body"]
+    assert body["collapse"]["field"] == "work_key"
+    assert body["collapse"]["inner_hits"]["size"] == 2
+    assert body["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_search_groups_too_many_works_returns_only_total(fake_es):
+    fake_es({"aggregations": {"works": {"value": 3}}, "hits": {"hits": [_group(1, 1), _group(1, 2)]}})
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    page = await repo.search_groups(q="мир", limit=2, editions=10)
+
+    assert page.total == 3
+    assert page.groups == []
+
+
+@pytest.mark.asyncio
+async def test_search_page_filters_and_returns_facets_even_when_too_many(fake_es):
+    from domain.models.book import BookSearchFilters
+
+    client = fake_es(
+        {
+            "hits": {"total": {"value": 51}, "hits": [{"_id": str(i)} for i in range(50)]},
+            "aggregations": {
+                "genre": {
+                    "buckets": [{"key": "detective", "doc_count": 40}, {"key": "prose_history", "doc_count": 11}]
+                },
+                "lang": {"buckets": [{"key": "ru", "doc_count": 51}]},
+                "year": {"buckets": []},
+            },
+        }
+    )
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    page = await repo.search_page(author="Акунин", limit=50, filters=BookSearchFilters(lang="ru"), facets=True)
+
+    assert page.total == 51
+    assert page.books == []
+    assert page.facets is not None
+    assert [(f.value, f.count) for f in page.facets.genre] == [("detective", 40), ("prose_history", 11)]
+    assert page.facets.year == []
+    body = client.search_kwargs["body"]
+    assert body["query"]["bool"]["filter"] == [{"term": {"lang": "ru"}}]
+    assert set(body["aggs"]) == {"genre", "lang", "year"}
+    assert "aggregations.*.buckets" in client.search_kwargs["filter_path"]
+
+
+def test_search_cursor_carries_filters():
+    cursor = es_backend._encode_cursor("pit", [1.5, 7], ("q", None, None), {"genre": "detective"})
+
+    assert es_backend._decode_cursor(cursor) == ("pit", [1.5, 7], ("q", None, None), {"genre": "detective"})
+
+
+def _forged_cursor(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return f"{es_backend._b64encode(raw)}.{es_backend._b64encode(es_backend._cursor_signature(raw))}"
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"filters": {"file_name": "x.fb2"}},
+        {"filters": {"year": 1999}},
+        {"query": ["q", 5, None]},
+        {"query": ["q"]},
+        {"after": "1.5"},
+        {"pit": ["pit"]},
+    ],
+)
+def test_search_cursor_rejects_malformed_payload(changes):
+    payload = {"v": es_backend._CURSOR_VERSION, "pit": "pit", "after": [1.5, 7], "query": ["q", None, None]}
+
+    with pytest.raises(SearchCursorError):
+        es_backend._decode_cursor(_forged_cursor({**payload, **changes}))
+
+
+def test_search_cursor_rejects_tampered_or_foreign_signature(monkeypatch):
+    cursor = es_backend._encode_cursor("pit", [1.5, 7], ("q", None, None), {"genre": "detective"})
+    body, _, signature = cursor.partition(".")
+    unsigned = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)).replace(b"detective", b"sf")
+
+    with pytest.raises(SearchCursorError):
+        es_backend._decode_cursor(f"{es_backend._b64encode(unsigned)}.{signature}")
+    with pytest.raises(SearchCursorError):
+        es_backend._decode_cursor(body)
+
+    monkeypatch.setattr(settings, "SEARCH_CURSOR_SECRET", "другой ключ")
+    with pytest.raises(SearchCursorError):
+        es_backend._decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_suggest_uses_completion_and_skips_hydration(fake_es):
+    options = [
+        {"_id": "1", "_source": {"author": "Акунин Борис", "title": "Азазель"}},
+        {"_id": "9", "_source": {"author": "Акунин Борис", "title": "Азазель"}},
+        {"_id": "2", "_source": {"author": "Акунин Борис", "title": "Турецкий гамбит"}},
+    ]
+    client = fake_es({"suggest": {"books": [{"options": options}]}})
+    repo: BookRepo = BookRepo(_NoDb(), Book, BookORM)  # type: ignore[arg-type]
+
+    suggestions = await repo.suggest("аку", limit=2)
+
+    assert [(s.id, s.title) for s in suggestions] == [(1, "Азазель"), (2, "Турецкий гамбит")]
+    completion = client.search_kwargs["body"]["suggest"]["books"]
+    assert completion["prefix"] == "аку"
+    assert completion["completion"]["field"] == "suggest"
+    assert client.search_kwargs["body"]["size"] == 0
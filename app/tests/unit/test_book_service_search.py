@@ -0,0 +1,233 @@
+from pathlib import Path
+
+import pytest
+
+from domain.exceptions import BooksNotFoundError, NotFoundError, TooManyResultsError, UnsupportedSearchOptionError
+from domain.models.book import (
+    Book,
+    BookSearchCapabilities,
+    BookSearchCursorPage,
+    BookSearchFilters,
+    BookSearchPage,
+)
+from domain.services.book_service import BookService
+
+
+_ES_CAPABILITIES = BookSearchCapabilities(
+    backend="elasticsearch", filters=True, facets=True, grouped=True, paginate=True
+)
+
+
+class _Repo:
+    def __init__(self, page: BookSearchPage) -> None:
+        self.page = page
+        self.calls: list[dict] = []
+
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return _ES_CAPABILITIES
+
+    async def search_page(
+        self, *, q=None, author=None, title=None, limit, hydrate=None, filters=None, facets=False
+    ) -> BookSearchPage:
+        self.calls.append({"q": q, "author": author, "title": title, "limit": limit})
+        return self.page
+
+
+def _service(repo: _Repo) -> BookService:
+    return BookService(
+        repository=repo,  # type: ignore[arg-type]
+        storage=object(),  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=Path("/tmp"),
+        s3_bucket="books",
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_returns_page_books() -> None:
+    repo = _Repo(BookSearchPage(books=[Book(id=1, author="Акунин Борис", title="Азазель")], total=1))
+
+    books = await _service(repo).search(author="Акунин", title="Азазель")
+
+    assert [b.id for b in books] == [1]
+    assert repo.calls == [{"q": None, "author": "Акунин", "title": "Азазель", "limit": 50}]
+
+
+@pytest.mark.asyncio
+async def test_search_too_many_is_decided_by_total() -> None:
+    with pytest.raises(TooManyResultsError):
+        await _service(_Repo(BookSearchPage(total=51))).search(author="Акунин")
+
+
+@pytest.mark.asyncio
+async def test_search_no_results() -> None:
+    with pytest.raises(BooksNotFoundError):
+        await _service(_Repo(BookSearchPage(total=0))).search(title="нет")
+
+
+class _PagesRepo:
+    def __init__(self, page: BookSearchCursorPage) -> None:
+        self.page = page
+        self.calls: list[dict] = []
+
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return _ES_CAPABILITIES
+
+    async def search_pages(self, *, q=None, author=None, title=None, limit, cursor=None, hydrate=None, filters=None):
+        self.calls.append({"author": author, "limit": limit, "cursor": cursor})
+        return self.page
+
+
+@pytest.mark.asyncio
+async def test_search_pages_returns_page_instead_of_too_many() -> None:
+    repo = _PagesRepo(BookSearchCursorPage(books=[Book(id=i) for i in range(50)], next_cursor="next"))
+
+    page = await _service(repo).search_pages(author="Акунин")  # type: ignore[arg-type]
+
+    assert len(page.books) == 50
+    assert page.next_cursor == "next"
+    assert repo.calls == [{"author": "Акунин", "limit": 50, "cursor": None}]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_empty_first_page_is_no_results_but_empty_tail_is_not() -> None:
+    service = _service(_PagesRepo(BookSearchCursorPage()))  # type: ignore[arg-type]
+
+    with pytest.raises(BooksNotFoundError):
+        await service.search_pages(title="нет")
+    assert (await service.search_pages(cursor="tail")).books == []
+
+
+class _BatchRepo:
+    def __init__(self, pages: dict[str | None, BookSearchPage]) -> None:
+        self.pages = pages
+        self.batches: list[list[str | None]] = []
+
+    async def search_page_many(self, queries, *, limit, hydrate=None):
+        self.batches.append([query.title for query in queries])
+        return [self.pages[query.title] for query in queries]
+
+
+@pytest.mark.asyncio
+async def test_search_batch_maps_statuses_and_dedupes_queries() -> None:
+    from domain.models.book import BookSearchQuery
+
+    repo = _BatchRepo(
+        {
+            "Азазель": BookSearchPage(books=[Book(id=1, title="Азазель")], total=1),
+            "нет": BookSearchPage(total=0),
+            "война": BookSearchPage(total=51),
+        }
+    )
+    queries = [
+        BookSearchQuery(title="Азазель"),
+        BookSearchQuery(title="нет"),
+        BookSearchQuery(title="война"),
+        BookSearchQuery(title="  АЗАЗЕЛЬ "),
+    ]
+
+    results = await _service(repo).search_batch(queries)  # type: ignore[arg-type]
+
+    assert [r.status for r in results] == ["ok", "no_results", "too_many_results", "ok"]
+    assert [b.id for b in results[3].books] == [1]
+    assert repo.batches == [["Азазель", "нет", "война"]]
+
+
+class _GroupsRepo:
+    def __init__(self, page) -> None:
+        self.page = page
+        self.calls: list[dict] = []
+
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return _ES_CAPABILITIES
+
+    async def search_groups(self, *, q=None, author=None, title=None, limit, editions, hydrate=None, filters=None):
+        self.calls.append({"author": author, "limit": limit, "editions": editions})
+        return self.page
+
+
+@pytest.mark.asyncio
+async def test_search_grouped_decides_statuses_by_works() -> None:
+    from domain.models.book import BookGroup, BookGroupPage
+    from domain.services.book_service import SEARCH_GROUP_EDITIONS, SEARCH_LIMIT
+
+    editions = [Book(id=i, author="Толстой Лев", title="Война и мир") for i in range(1, 4)]
+    group = BookGroup(author="Толстой Лев", title="Война и мир", editions=editions, editions_total=60)
+    repo = _GroupsRepo(BookGroupPage(groups=[group], total=1))
+
+    groups = await _service(repo).search_grouped(author="Толстой")  # type: ignore[arg-type]
+
+    assert [b.id for b in groups[0].editions] == [1, 2, 3]
+    assert repo.calls == [{"author": "Толстой", "limit": SEARCH_LIMIT, "editions": SEARCH_GROUP_EDITIONS}]
+
+    with pytest.raises(TooManyResultsError):
+        await _service(_GroupsRepo(BookGroupPage(total=51))).search_grouped(q="мир")  # type: ignore[arg-type]
+    with pytest.raises(BooksNotFoundError):
+        await _service(_GroupsRepo(BookGroupPage(total=0))).search_grouped(q="нет")  # type: ignore[arg-type]
+
+
+class _IdentifierRepo(_Repo):
+    def __init__(self, books: list[Book]) -> None:
+        super().__init__(BookSearchPage(total=0))
+        self.books = {book.id: book for book in books}
+        self.isbn_calls: list[list[str]] = []
+
+    async def find_by_isbn(self, isbns, *, limit):
+        self.isbn_calls.append(isbns)
+        return [book for book in self.books.values() if book.isbn and book.isbn.replace("-", "") in isbns]
+
+    async def read(self, filters):
+        if filters["id"] not in self.books:
+            raise NotFoundError("нет")
+        return self.books[filters["id"]]
+
+
+@pytest.mark.asyncio
+async def test_search_routes_isbn_and_id_to_exact_lookup() -> None:
+    repo = _IdentifierRepo([Book(id=12345, title="Дюна", isbn="978-0-306-40615-7")])
+    service = _service(repo)
+
+    assert [b.id for b in await service.search(q="0-306-40615-2")] == [12345]
+    assert [b.id for b in await service.search(q="id:12345")] == [12345]
+    assert [b.id for b in await service.search(q="#12345")] == [12345]
+    assert repo.isbn_calls == [["0306406152", "9780306406157"]]
+    assert repo.calls == []
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_full_text_when_identifier_not_found() -> None:
+    repo = _IdentifierRepo([])
+
+    with pytest.raises(BooksNotFoundError):
+        await _service(repo).search(q="id:7")
+    assert [call["q"] for call in repo.calls] == ["id:7"]
+
+
+@pytest.mark.asyncio
+async def test_bare_number_is_full_text_search_not_id_lookup() -> None:
+    repo = _IdentifierRepo([Book(id=12345, title="Дюна")])
+
+    with pytest.raises(BooksNotFoundError):
+        await _service(repo).search(q="12345")
+    assert [call["q"] for call in repo.calls] == ["12345"]
+
+
+class _FtsRepo(_Repo):
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return BookSearchCapabilities(backend="sqlite_fts")
+
+
+@pytest.mark.asyncio
+async def test_unsupported_search_options_are_rejected_before_the_backend() -> None:
+    repo = _FtsRepo(BookSearchPage(total=1, books=[Book(id=1)]))
+    service = _service(repo)
+
+    with pytest.raises(UnsupportedSearchOptionError, match="sqlite_fts.*фильтры genre/lang/year, facets"):
+        await service.search(author="Акунин", filters=BookSearchFilters(lang="ru"), facets=True)
+    with pytest.raises(UnsupportedSearchOptionError, match="paginate/cursor"):
+        await service.search_pages(author="Акунин")
+    with pytest.raises(UnsupportedSearchOptionError, match="grouped"):
+        await service.search_grouped(author="Акунин")
+    assert repo.calls == []
+
+    assert [b.id for b in await service.search(author="Акунин")] == [1]
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from api.v1.dependencies import get_book_service
+from domain.models.book import BookSearchCapabilities
+from domain.services.book_service import BookService
+from main import app
+
+
+class _FtsRepo:
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return BookSearchCapabilities(backend="sqlite_fts")
+
+    async def search_page(self, **kwargs):  # pragma: no cover
+        raise AssertionError("неподдерживаемый параметр не должен доходить до движка")
+
+
+@pytest.fixture
+def client():
+    service = BookService(
+        repository=_FtsRepo(),  # type: ignore[arg-type]
+        storage=object(),  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=None,  # type: ignore[arg-type]
+        s3_bucket="books",
+    )
+    app.dependency_overrides[get_book_service] = lambda: service
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_book_service, None)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"author": "Акунин", "lang": "ru"},
+        {"author": "Акунин", "facets": "true"},
+        {"author": "Акунин", "grouped": "true"},
+        {"author": "Акунин", "paginate": "true"},
+        {"cursor": "abc"},
+    ],
+)
+def test_search_rejects_options_unsupported_by_backend_with_422(client, params):
+    response = client.get("/api/v1/books/search", params=params)
+
+    assert response.status_code == 422
+    assert "sqlite_fts" in response.json()["detail"]
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import insert, text
+
+from infrastructure.db.fts import BOOKS_FTS_PREFIX, ensure_books_fts, merge_books_fts, optimize_books_fts
+from infrastructure.db.models.book_orm import BookORM
+
+
+async def _fts_sql(engine) -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT sql FROM sqlite_master WHERE name='books_fts'"))).scalar_one()
+
+
+@pytest.fixture
+async def books_engine(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+        await conn.execute(insert(BookORM), [{"id": i, "author": "Акунин", "title": f"Книга {i}"} for i in range(1, 4)])
+    return async_engine
+
+
+@pytest.mark.asyncio
+async def test_ensure_books_fts_recreates_table_without_prefix_indexes(books_engine):
+    async with books_engine.begin() as conn:
+        await conn.execute(
+            text("CREATE VIRTUAL TABLE books_fts USING fts5(title, author, content='books', content_rowid='id')")
+        )
+
+    await ensure_books_fts(books_engine)
+
+    assert f"prefix='{BOOKS_FTS_PREFIX}'" in await _fts_sql(books_engine)
+    async with books_engine.connect() as conn:
+        found = (await conn.execute(text("SELECT rowid FROM books_fts WHERE books_fts MATCH 'акун*'"))).all()
+    assert len(found) == 3
+
+
+@pytest.mark.asyncio
+async def test_merge_and_optimize_keep_index_searchable(books_engine):
+    await ensure_books_fts(books_engine)
+    progress: list[tuple[int, int]] = []
+
+    steps = await merge_books_fts(books_engine, pages=10, on_progress=lambda *p: progress.append(p))
+    await optimize_books_fts(books_engine)
+
+    assert steps == len(progress) >= 1
+    async with books_engine.connect() as conn:
+        found = (await conn.execute(text("SELECT rowid FROM books_fts WHERE books_fts MATCH 'title:книга*'"))).all()
+    assert len(found) == 3
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from config.config import settings
+from infrastructure.search import books_index
+
+
+class _Indices:
+    def __init__(self, client: "_FakeClient") -> None:
+        self._client = client
+
+    def exists(self, *, index: str) -> bool:
+        self._client.calls.append("indices.exists")
+        return True
+
+    def create(self, *, index: str, body: dict) -> None:  # pragma: no cover
+        raise AssertionError("индекс уже существует")
+
+    def get_mapping(self, *, index: str) -> dict:
+        self._client.calls.append("indices.get_mapping")
+        meta = {} if self._client.mapping_version is None else {"mapping_version": self._client.mapping_version}
+        return {"books-1": {"mappings": {"_meta": meta, "properties": {}}}}
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.indices = _Indices(self)
+        self.docs = 10
+        self.mapping_version: int | None = books_index.BOOKS_INDEX_MAPPING_VERSION
+
+    def count(self, *, index: str) -> dict[str, int]:
+        self.calls.append("count")
+        return {"count": self.docs}
+
+
+class _NullSession:
+    async def __aenter__(self) -> object:
+        return object()
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(settings, "ELASTICSEARCH_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(settings, "ELASTICSEARCH_AUTO_INDEX", True)
+    monkeypatch.setattr(books_index, "get_elasticsearch", lambda: client)
+    books_index.invalidate_books_index()
+    yield client
+    books_index.invalidate_books_index()
+
+
+@pytest.mark.asyncio
+async def test_ensure_books_index_is_cached_per_process(fake_client):
+    await books_index.ensure_books_index(session=None)  # type: ignore[arg-type]
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping", "count"]
+    assert books_index.books_index_ready()
+
+    await books_index.ensure_books_index(session=None)  # type: ignore[arg-type]
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping", "count"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_books_index_forces_recheck(fake_client):
+    await books_index.ensure_books_index(session=None)  # type: ignore[arg-type]
+    books_index.invalidate_books_index()
+    assert not books_index.books_index_ready()
+
+    await books_index.ensure_books_index(session=None)  # type: ignore[arg-type]
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping", "count"] * 2
+
+
+@pytest.mark.asyncio
+async def test_warm_up_only_checks_empty_index(fake_client, monkeypatch):
+    fake_client.docs = 0
+
+    async def _fail(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("warm-up не должен загружать каталог")
+
+    monkeypatch.setattr(books_index, "_index_books_from_db", _fail)
+
+    assert await books_index.warm_up_books_index() is True
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping", "count"]
+    assert not books_index.books_index_ready()
+
+
+@pytest.mark.asyncio
+async def test_search_does_not_wait_for_background_auto_index(fake_client, monkeypatch):
+    fake_client.docs = 0
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _fill(session) -> None:
+        loading.set()
+        await release.wait()
+        books_index._index_ready = True
+
+    monkeypatch.setattr(books_index, "_fill_books_index", _fill)
+
+    task = books_index.start_books_auto_index()
+    await loading.wait()
+    await asyncio.wait_for(books_index.ensure_books_index(session=None), timeout=1)  # type: ignore[arg-type]
+    assert not books_index.books_index_ready()
+
+    release.set()
+    await task
+    assert books_index.books_index_ready()
+
+
+@pytest.mark.asyncio
+async def test_outdated_mapping_is_reindexed_in_background(fake_client, monkeypatch):
+    fake_client.mapping_version = None
+    reindexed: list[object] = []
+
+    async def _reindex(session, **kwargs) -> str:
+        reindexed.append(session)
+        return "books-2"
+
+    monkeypatch.setattr(books_index, "reindex_books", _reindex)
+    monkeypatch.setattr(books_index.sessionmanager, "session", lambda: _NullSession())
+
+    assert await books_index.warm_up_books_index() is True
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping"]
+
+    await books_index.start_books_auto_index()
+    assert len(reindexed) == 1
+    assert books_index.books_index_ready()
+
+
+@pytest.mark.asyncio
+async def test_outdated_mapping_without_auto_index_refuses_to_start(fake_client, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_AUTO_INDEX", False)
+    fake_client.mapping_version = 1
+
+    with pytest.raises(books_index.BooksIndexOutdatedError, match="reindex_books.py"):
+        await books_index.warm_up_books_index()
+    assert not books_index.books_index_ready()
+
+
+@pytest.mark.asyncio
+async def test_search_does_not_reindex_outdated_mapping_inline(fake_client, monkeypatch):
+    fake_client.mapping_version = 1
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _reindex(session, **kwargs) -> str:
+        started.set()
+        await release.wait()
+        return "books-2"
+
+    monkeypatch.setattr(books_index, "reindex_books", _reindex)
+    monkeypatch.setattr(books_index.sessionmanager, "session", lambda: _NullSession())
+
+    await asyncio.wait_for(books_index.ensure_books_index(session=None), timeout=1)  # type: ignore[arg-type]
+    await started.wait()
+    assert not books_index.books_index_ready()
+    # Пока идёт переиндексация, поиск не ждёт её и не запускает вторую.
+    await asyncio.wait_for(books_index.ensure_books_index(session=None), timeout=1)  # type: ignore[arg-type]
+    assert fake_client.calls == ["indices.exists", "indices.get_mapping"]
+
+    release.set()
+    await books_index._auto_index_task
+    assert books_index.books_index_ready()
+    await books_index.stop_books_auto_index()
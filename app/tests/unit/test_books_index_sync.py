@@ -0,0 +1,132 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, insert, text, update
+
+from config.config import settings
+from infrastructure.db.es_changelog import (
+    CHANGELOG_TABLE,
+    drop_books_es_changelog,
+    ensure_books_es_changelog,
+    pause_books_es_sync,
+    resume_books_es_sync,
+)
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.search import index_sync
+
+
+@pytest.fixture
+async def books_engine(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    assert await ensure_books_es_changelog(async_engine)
+    return async_engine
+
+
+@pytest.fixture
+def bulk_calls(monkeypatch):
+    calls: list[list[dict[str, Any]]] = []
+
+    async def _fake_es_bulk(client, actions, **kwargs):
+        calls.append(actions)
+        errors = [
+            {"delete": {"_id": a["_id"], "status": 404, "result": "not_found"}}
+            for a in actions
+            if a["_op_type"] == "delete"
+        ]
+        return len(actions) - len(errors), errors
+
+    monkeypatch.setattr(settings, "ELASTICSEARCH_INDEX", "books")
+    monkeypatch.setattr(settings, "ELASTICSEARCH_DENORMALIZED", False)
+    monkeypatch.setattr(index_sync, "get_elasticsearch", lambda: object())
+    monkeypatch.setattr(index_sync, "es_bulk", _fake_es_bulk)
+    return calls
+
+
+async def _changelog_size(session) -> int:
+    return (await session.execute(text(f"SELECT count(*) FROM {CHANGELOG_TABLE}"))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_triggers_capture_changes_and_sync_collapses_them(books_engine, async_session, bulk_calls):
+    await async_session.execute(insert(BookORM).values(id=1, author="Пушкин", title="Онегин"))
+    await async_session.execute(insert(BookORM).values(id=2, author="Гоголь", title="Нос"))
+    await async_session.execute(update(BookORM).where(BookORM.id == 1).values(title="Евгений Онегин"))
+    await async_session.execute(delete(BookORM).where(BookORM.id == 2))
+    await async_session.commit()
+    assert await _changelog_size(async_session) == 4
+
+    processed = await index_sync.sync_books_index_once(async_session, batch_size=100)
+
+    assert processed == 4
+    assert bulk_calls == [
+        [
+            {
+                "_op_type": "index",
+                "_index": "books",
+                "_id": "1",
+                "_source": {
+                    "id": 1,
+                    "author": "Пушкин",
+                    "title": "Евгений Онегин",
+                    "work_key": "пушкин|евгений онегин",
+                    "genre": None,
+                    "lang": None,
+                    "year": None,
+                    "suggest": ["Евгений Онегин", "Пушкин"],
+                },
+            },
+            {"_op_type": "delete", "_index": "books", "_id": "2"},
+        ]
+    ]
+    assert await _changelog_size(async_session) == 0
+    assert await index_sync.sync_books_index_once(async_session, batch_size=100) == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_changes_when_bulk_fails(books_engine, async_session, bulk_calls, monkeypatch):
+    async def _failing_es_bulk(client, actions, **kwargs):
+        return 0, [{"index": {"_id": "1", "status": 429, "error": {"type": "es_rejected_execution_exception"}}}]
+
+    monkeypatch.setattr(index_sync, "es_bulk", _failing_es_bulk)
+    await async_session.execute(insert(BookORM).values(id=1, author="Пушкин", title="Онегин"))
+    await async_session.commit()
+
+    with pytest.raises(RuntimeError):
+        await index_sync.sync_books_index_once(async_session, batch_size=100)
+    await async_session.rollback()
+
+    assert await _changelog_size(async_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_changes_while_paused_for_reindex(books_engine, async_session, bulk_calls):
+    assert await pause_books_es_sync(books_engine, reason="reindex books-2")
+    await async_session.execute(insert(BookORM).values(id=1, author="Пушкин", title="Онегин"))
+    await async_session.commit()
+
+    assert await index_sync.sync_books_index_once(async_session, batch_size=100) == 0
+    await async_session.rollback()
+    assert bulk_calls == []
+    assert await _changelog_size(async_session) == 1
+
+    await resume_books_es_sync(books_engine)
+    assert await index_sync.sync_books_index_once(async_session, batch_size=100) == 1
+    assert [action["_id"] for action in bulk_calls[0]] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_drop_changelog_stops_recording_edits(books_engine):
+    assert await drop_books_es_changelog(books_engine)
+
+    async with books_engine.begin() as conn:
+        await conn.execute(insert(BookORM).values(id=1, author="Акунин", title="Азазель"))
+        tables = (await conn.execute(text("SELECT name FROM sqlite_master WHERE name LIKE 'books_es_%'"))).all()
+    assert [name for (name,) in tables] == ["books_es_sync_pause"]
+    assert not await drop_books_es_changelog(books_engine)
+
+    # Повторное включение синхронизации создаёт журнал заново.
+    assert await ensure_books_es_changelog(books_engine)
+    async with books_engine.begin() as conn:
+        await conn.execute(update(BookORM).where(BookORM.id == 1).values(title="Турецкий гамбит"))
+        assert (await conn.execute(text(f"SELECT COUNT(*) FROM {CHANGELOG_TABLE}"))).scalar_one() == 1
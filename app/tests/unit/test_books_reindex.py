@@ -0,0 +1,137 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+
+from config.config import settings
+from infrastructure.db.es_changelog import SYNC_PAUSE_TABLE, ensure_books_es_changelog
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.search import books_index
+
+
+class _Indices:
+    def __init__(self, calls: list[tuple[str, dict[str, Any]]], *, alias_targets: list[str], legacy: bool) -> None:
+        self._calls = calls
+        self._alias_targets = alias_targets
+        self._legacy = legacy
+
+    def _record(self, name: str, **kwargs: Any) -> None:
+        self._calls.append((name, kwargs))
+
+    def create(self, **kwargs: Any) -> None:
+        self._record("create", **kwargs)
+
+    def put_settings(self, **kwargs: Any) -> None:
+        self._record("put_settings", **kwargs)
+
+    def refresh(self, **kwargs: Any) -> None:
+        self._record("refresh", **kwargs)
+
+    def forcemerge(self, **kwargs: Any) -> None:
+        self._record("forcemerge", **kwargs)
+
+    def exists_alias(self, **kwargs: Any) -> bool:
+        return bool(self._alias_targets)
+
+    def get_alias(self, **kwargs: Any) -> dict[str, Any]:
+        return {name: {"aliases": {"books": {}}} for name in self._alias_targets}
+
+    def exists(self, **kwargs: Any) -> bool:
+        return self._legacy
+
+    def update_aliases(self, **kwargs: Any) -> None:
+        self._record("update_aliases", **kwargs)
+
+    def delete(self, **kwargs: Any) -> None:
+        self._record("delete", **kwargs)
+
+
+class _FakeClient:
+    def __init__(self, *, alias_targets: list[str] | None = None, legacy: bool = False) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.indices = _Indices(self.calls, alias_targets=alias_targets or [], legacy=legacy)
+
+    def options(self, **kwargs: Any) -> "_FakeClient":
+        return self
+
+
+@pytest.fixture
+def install(monkeypatch):
+    def _install(client: _FakeClient) -> list[str]:
+        loaded: list[str] = []
+
+        async def _fake_index_books_from_db(session, index: str, **kwargs: Any) -> int:
+            loaded.append(index)
+            return 3
+
+        monkeypatch.setattr(settings, "ELASTICSEARCH_INDEX", "books")
+        monkeypatch.setattr(books_index, "get_elasticsearch", lambda: client)
+        monkeypatch.setattr(books_index, "_index_books_from_db", _fake_index_books_from_db)
+        return loaded
+
+    return _install
+
+
+@pytest.mark.asyncio
+async def test_reindex_builds_new_index_and_swaps_alias(install):
+    client = _FakeClient(alias_targets=["books-1"])
+    loaded = install(client)
+
+    new_index = await books_index.reindex_books(session=None)  # type: ignore[arg-type]
+
+    assert new_index.startswith("books-")
+    assert loaded == [new_index]
+    names = [name for name, _ in client.calls]
+    assert names == ["create", "put_settings", "refresh", "forcemerge", "update_aliases", "delete"]
+
+    create_body = client.calls[0][1]["body"]
+    assert create_body["settings"]["refresh_interval"] == "-1"
+    assert create_body["settings"]["number_of_replicas"] == 0
+    assert "aliases" not in create_body
+
+    assert client.calls[4][1]["actions"] == [
+        {"add": {"index": new_index, "alias": "books"}},
+        {"remove": {"index": "books-1", "alias": "books"}},
+    ]
+    assert client.calls[5][1]["index"] == "books-1"
+
+
+@pytest.mark.asyncio
+async def test_reindex_replaces_legacy_concrete_index_atomically(install):
+    client = _FakeClient(legacy=True)
+    install(client)
+
+    new_index = await books_index.reindex_books(session=None, keep_old=True)  # type: ignore[arg-type]
+
+    update_aliases = [kwargs for name, kwargs in client.calls if name == "update_aliases"]
+    assert update_aliases[0]["actions"] == [
+        {"add": {"index": new_index, "alias": "books"}},
+        {"remove_index": {"index": "books"}},
+    ]
+    assert "delete" not in [name for name, _ in client.calls]
+
+
+@pytest.mark.asyncio
+async def test_reindex_pauses_index_sync_until_alias_is_switched(install, async_engine, monkeypatch):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    assert await ensure_books_es_changelog(async_engine)
+
+    async def _pause_rows() -> list[str]:
+        async with async_engine.connect() as conn:
+            return list((await conn.execute(text(f"SELECT reason FROM {SYNC_PAUSE_TABLE}"))).scalars())
+
+    client = _FakeClient(alias_targets=["books-1"])
+    install(client)
+    paused_during_load: list[list[str]] = []
+
+    async def _loading(session, index: str, **kwargs: Any) -> int:
+        paused_during_load.append(await _pause_rows())
+        return 3
+
+    monkeypatch.setattr(books_index, "_index_books_from_db", _loading)
+
+    new_index = await books_index.reindex_books(session=None, sync_engine=async_engine)  # type: ignore[arg-type]
+
+    assert paused_during_load == [[f"reindex {new_index}"]]
+    assert await _pause_rows() == []
@@ -23,3 +23,26 @@ def test_build_books_search_query_supports_author_and_title_filters():
     assert must[0]["multi_match"]["fields"][0].startswith("author")
     assert must[1]["multi_match"]["fields"][0].startswith("title")
 
+
+def test_book_work_key_folds_case_yo_punctuation_and_author_word_order():
+    from infrastructure.search.books_index import book_work_key
+
+    assert book_work_key("Толстой Лев", "Война и мир") == book_work_key("ЛЕВ  ТОЛСТОЙ", "Война и мир.")
+    assert book_work_key("Пушкин Александр", "Чёрная шаль") == book_work_key("Александр Пушкин", "черная шаль")
+    assert book_work_key("Толстой Лев", "Война и мир") != book_work_key("Толстой Лев", "Анна Каренина")
+
+
+def test_build_books_search_query_puts_facet_filters_into_bool_filter():
+    q = build_books_search_query(q="Акунин", author=None, title=None, filters={"genre": "detective", "lang": "ru"})
+
+    assert len(q["bool"]["must"]) == 1
+    assert q["bool"]["filter"] == [{"term": {"genre": "detective"}}, {"term": {"lang": "ru"}}]
+    assert build_books_search_query(q=None, author=None, title=None, filters={"lang": "ru"}) == {"match_none": {}}
+
+
+def test_book_suggest_inputs_rotate_author_words():
+    from infrastructure.search.books_index import book_suggest_inputs
+
+    assert book_suggest_inputs("Акунин  Борис", "Азазель") == ["Азазель", "Акунин Борис", "Борис Акунин"]
+    assert book_suggest_inputs(None, "Азазель") == ["Азазель"]
+    assert book_suggest_inputs("", "") == []
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from infrastructure.search import bulk_indexer
+
+
+async def _rows(n: int):
+    for i in range(n):
+        yield {"id": i, "title": "x" * 100}
+
+
+def _to_action(row: dict[str, Any]) -> dict[str, Any]:
+    return {"_op_type": "index", "_index": "books", "_id": str(row["id"]), "_source": row}
+
+
+@pytest.fixture
+def sent_chunks(monkeypatch):
+    chunks: list[list[dict[str, Any]]] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _fake_bulk(client, actions, **kwargs):
+        nonlocal in_flight, max_in_flight
+        assert kwargs["max_retries"] > 0
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        chunks.append(list(actions))
+        in_flight -= 1
+
+    monkeypatch.setattr(bulk_indexer, "get_elasticsearch", lambda: object())
+    monkeypatch.setattr(bulk_indexer, "es_bulk", _fake_bulk)
+    chunks_info = {"chunks": chunks, "max_in_flight": lambda: max_in_flight}
+    return chunks_info
+
+
+@pytest.mark.asyncio
+async def test_parallel_bulk_index_sends_all_docs_in_doc_sized_chunks(sent_chunks):
+    stats = await bulk_indexer.parallel_bulk_index(_rows(95), _to_action, workers=3, chunk_docs=10)
+
+    chunks = sent_chunks["chunks"]
+    assert stats["docs"] == 95
+    assert stats["chunks"] == 10
+    assert sorted(int(a["_id"]) for chunk in chunks for a in chunk) == list(range(95))
+    assert max(len(chunk) for chunk in chunks) == 10
+    assert sent_chunks["max_in_flight"]() > 1
+
+
+@pytest.mark.asyncio
+async def test_parallel_bulk_index_splits_chunks_by_bytes(sent_chunks):
+    # Каждый документ ~180 байт с оценкой заголовка: в 1000 байт помещается 5 документов.
+    await bulk_indexer.parallel_bulk_index(_rows(20), _to_action, workers=2, chunk_docs=1000, chunk_bytes=1000)
+
+    assert all(len(chunk) <= 5 for chunk in sent_chunks["chunks"])
+    assert sum(len(chunk) for chunk in sent_chunks["chunks"]) == 20
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import insert
+
+from domain.exceptions import NotFoundError
+from domain.models.book import Book
+from infrastructure.db import catalog_snapshot
+from infrastructure.db.catalog_snapshot import (
+    CatalogSnapshot,
+    close_catalog_snapshot,
+    open_catalog_snapshot,
+    write_catalog_snapshot,
+)
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.repositories.book_repo import BookRepo
+
+
+@pytest.fixture
+async def books_db(async_engine, async_session):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await async_session.execute(
+        insert(BookORM),
+        [
+            {"id": 3, "author": "Пушкин Александр", "title": "Чёрная шаль", "file_size_mb": 0.5, "isbn": ""},
+            {"id": 1, "author": "Акунин Борис", "title": "Азазель", "annotation": "Эраст Фандорин 🕵"},
+            {"id": 10, "author": None, "title": "Без автора"},
+        ],
+    )
+    await async_session.commit()
+    return async_session
+
+
+@pytest.fixture
+def no_snapshot(monkeypatch):
+    monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+    yield
+    close_catalog_snapshot()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_roundtrip_keeps_values_and_nulls(books_db, tmp_path):
+    path = tmp_path / "catalog.snap"
+
+    assert await write_catalog_snapshot(books_db, path, partition_size=2) == 3
+
+    snapshot = CatalogSnapshot(path)
+    try:
+        assert snapshot.info()["rows"] == 3
+        assert snapshot.max_id == 10
+        assert snapshot.get(1)["annotation"] == "Эраст Фандорин 🕵"
+        assert snapshot.get(1)["file_size_mb"] is None
+        assert snapshot.get(3)["file_size_mb"] == 0.5
+        assert snapshot.get(3)["isbn"] == ""
+        assert snapshot.get(3)["annotation"] is None
+        assert snapshot.get(10)["author"] is None
+        assert snapshot.get(2) is None
+        assert sorted(snapshot.get_many([10, 2, 1])) == [1, 10]
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_rejects_unknown_format(tmp_path):
+    path = tmp_path / "catalog.snap"
+    path.write_bytes(b"NOTASNAPSHOT" * 4)
+
+    with pytest.raises(ValueError):
+        CatalogSnapshot(path)
+
+
+@pytest.mark.asyncio
+async def test_book_repo_hydrates_from_snapshot_and_reads_by_id_from_db(books_db, tmp_path, no_snapshot):
+    path = tmp_path / "catalog.snap"
+    await write_catalog_snapshot(books_db, path)
+    await books_db.execute(BookORM.__table__.update().where(BookORM.id == 1).values(title="Правка после снимка"))
+    await books_db.commit()
+    assert await open_catalog_snapshot(books_db, path) is not None
+    repo = BookRepo(books_db, Book, BookORM)
+
+    assert [b.title for b in await repo._hydrate([3, 99, 1])] == ["Чёрная шаль", "Азазель"]
+    assert (await repo.read({"id": 1})).title == "Правка после снимка"
+    with pytest.raises(NotFoundError):
+        await repo.read({"id": 99})
+
+
+@pytest.mark.asyncio
+async def test_open_refuses_snapshot_out_of_sync_with_db(books_db, tmp_path, no_snapshot):
+    path = tmp_path / "catalog.snap"
+    await write_catalog_snapshot(books_db, path)
+
+    await books_db.execute(BookORM.__table__.delete().where(BookORM.id == 3))
+    await books_db.commit()
+    assert await open_catalog_snapshot(books_db, path) is None
+
+    await books_db.execute(insert(BookORM), [{"id": 11, "author": "Новый", "title": "Не в снимке"}])
+    await books_db.commit()
+    assert await open_catalog_snapshot(books_db, path) is None
+    assert catalog_snapshot.get_catalog_snapshot() is None
+
+
+@pytest.mark.asyncio
+async def test_open_missing_snapshot_keeps_reading_from_db(books_db, tmp_path, no_snapshot):
+    assert await open_catalog_snapshot(books_db, tmp_path / "missing.snap") is None
+
+    repo = BookRepo(books_db, Book, BookORM)
+    assert (await repo.read({"id": 1})).title == "Азазель"
@@ -0,0 +1,60 @@
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy import insert, update
+
+from infrastructure.db.catalog_version import ensure_books_catalog_version, read_books_catalog_version
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.search import books_index, catalog_watch
+
+
+class _SessionManager:
+    def __init__(self, session) -> None:
+        self._session = session
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        yield self._session
+
+
+@pytest.fixture
+async def books_engine(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    assert await ensure_books_catalog_version(async_engine)
+    return async_engine
+
+
+@pytest.mark.asyncio
+async def test_triggers_bump_catalog_version(books_engine, async_session):
+    assert await read_books_catalog_version(async_session) == 0
+
+    await async_session.execute(insert(BookORM).values(id=1, author="Пушкин", title="Онегин"))
+    await async_session.execute(update(BookORM).where(BookORM.id == 1).values(title="Евгений Онегин"))
+    await async_session.commit()
+
+    assert await read_books_catalog_version(async_session) == 2
+
+
+@pytest.mark.asyncio
+async def test_catalog_watch_bumps_search_generation_on_catalog_edit(books_engine, async_session, monkeypatch):
+    monkeypatch.setattr(catalog_watch, "sessionmanager", _SessionManager(async_session))
+
+    task = asyncio.create_task(catalog_watch.run_books_catalog_watch(interval_s=0.01))
+    try:
+        await asyncio.sleep(0.05)
+        before = books_index.books_index_generation()
+
+        await async_session.execute(insert(BookORM).values(id=1, author="Пушкин", title="Онегин"))
+        await async_session.commit()
+
+        async def _bumped() -> None:
+            while books_index.books_index_generation() == before:
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(_bumped(), timeout=1)
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+import aiohttp
+from elastic_transport import AiohttpHttpNode
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+import pytest
+
+from config.config import settings
+from infrastructure.search import es_client
+
+
+@pytest.fixture
+def es_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(settings, "ELASTICSEARCH_MAX_CONNECTIONS", 7)
+
+
+def test_async_client_is_rebound_when_event_loop_changes(es_settings, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_CLIENT_MODE", "async")
+
+    async def _start() -> AsyncElasticsearch:
+        await es_client.init_elasticsearch()
+        client = es_client.get_elasticsearch()
+        assert es_client.get_elasticsearch() is client
+        return client  # type: ignore[return-value]
+
+    async def _use_and_close() -> AsyncElasticsearch:
+        client = es_client.get_elasticsearch()
+        await es_client.close_elasticsearch()
+        return client  # type: ignore[return-value]
+
+    first = asyncio.run(_start())
+    second = asyncio.run(_use_and_close())
+
+    assert isinstance(first, AsyncElasticsearch)
+    assert isinstance(second, AsyncElasticsearch)
+    assert second is not first
+    assert second.transport.node_pool.get().config.connections_per_node == 7
+
+
+def test_node_session_uses_configured_keepalive(es_settings, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_KEEPALIVE_S", 42.0)
+    monkeypatch.setattr(settings, "ELASTICSEARCH_CLIENT_MODE", "async")
+
+    async def _run() -> float | None:
+        await es_client.init_elasticsearch()
+        try:
+            client = es_client.get_elasticsearch()
+            node = client.transport.node_pool.get()
+            node._create_aiohttp_session()
+            return node.session.connector._keepalive_timeout
+        finally:
+            await es_client.close_elasticsearch()
+
+    assert asyncio.run(_run()) == 42.0
+
+
+def test_open_client_of_stopped_loop_is_logged_and_dropped(es_settings, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_CLIENT_MODE", "async")
+
+    async def _start_and_open_session() -> AsyncElasticsearch:
+        await es_client.init_elasticsearch()
+        client = es_client.get_elasticsearch()
+        client.transport.node_pool.get()._create_aiohttp_session()
+        return client  # type: ignore[return-value]
+
+    async def _use() -> AsyncElasticsearch:
+        return es_client.get_elasticsearch()  # type: ignore[return-value]
+
+    first_loop = asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(_start_and_open_session())
+        with caplog.at_level(logging.ERROR, logger=es_client.__name__):
+            second = asyncio.run(_use())
+        assert second is not first
+        assert "close_elasticsearch" in caplog.text
+    finally:
+        first_loop.run_until_complete(first.close())
+        first_loop.run_until_complete(es_client.close_elasticsearch())
+        first_loop.close()
+
+
+def _session_params(session: aiohttp.ClientSession) -> dict[str, object]:
+    # Всё, что задаётся при создании сессии и коннектора, кроме объектов, уникальных для каждого экземпляра.
+    params: dict[str, object] = {}
+    for prefix, obj in (("session", session), ("connector", session.connector)):
+        for name, value in vars(obj).items():
+            if value is None or isinstance(value, (bool, int, float, str, tuple, frozenset)):
+                params[f"{prefix}.{name}"] = value
+            elif isinstance(value, (aiohttp.abc.AbstractCookieJar, aiohttp.abc.AbstractResolver)):
+                params[f"{prefix}.{name}"] = type(value)
+    params["session.headers"] = dict(session.headers)
+    return params
+
+
+def test_keepalive_node_matches_base_session_except_keepalive(es_settings, monkeypatch):
+    # _KeepAliveAiohttpHttpNode копирует приватный метод elastic-transport: при обновлении библиотеки
+    # сессия базового класса изменится, и этот тест покажет, что копию нужно обновить.
+    monkeypatch.setattr(settings, "ELASTICSEARCH_KEEPALIVE_S", 42.0)
+    monkeypatch.setattr(settings, "ELASTICSEARCH_CLIENT_MODE", "async")
+
+    async def _run() -> tuple[dict[str, object], dict[str, object]]:
+        await es_client.init_elasticsearch()
+        try:
+            node = es_client.get_elasticsearch().transport.node_pool.get()
+            AiohttpHttpNode._create_aiohttp_session(node)
+            base = _session_params(node.session)
+            await node.session.close()
+            node._create_aiohttp_session()
+            return base, _session_params(node.session)
+        finally:
+            await es_client.close_elasticsearch()
+
+    base, keepalive = asyncio.run(_run())
+
+    assert keepalive.pop("connector._keepalive_timeout") == 42.0
+    base.pop("connector._keepalive_timeout")
+    assert keepalive == base
+
+
+@pytest.mark.asyncio
+async def test_sync_mode_calls_client_in_thread(es_settings, monkeypatch):
+    monkeypatch.setattr(settings, "ELASTICSEARCH_CLIENT_MODE", "sync")
+    await es_client.init_elasticsearch()
+    try:
+        client = es_client.get_elasticsearch()
+        assert isinstance(client, Elasticsearch)
+        assert not es_client.is_async_mode()
+
+        def _method(**kwargs):
+            return kwargs
+
+        assert await es_client.es_call(_method, index="books") == {"index": "books"}
+    finally:
+        await es_client.close_elasticsearch()
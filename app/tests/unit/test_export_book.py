@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import tempfile
+import zipfile
+
+import pytest
+
+from domain.exceptions import ValueException
+from domain.models.book import Book
+from domain.services.book_service import BookService
+from infrastructure.storage.object_manifest import S3ObjectManifest, ensure_object_manifest
+
+
+class _Repo:
+    def __init__(self, book: Book) -> None:
+        self.book = book
+
+    async def read(self, *, filters) -> Book:
+        return self.book
+
+
+class _Storage:
+    def __init__(self) -> None:
+        self.uploads: dict[str, tuple[bytes, int, str | None]] = {}
+        self.heads = 0
+
+    async def stat_object(self, *, key: str):
+        self.heads += 1
+        if key not in self.uploads:
+            return None
+        return {"key": key, "size": self.uploads[key][1], "etag": '"e"', "uploaded_at": datetime.now(timezone.utc)}
+
+    async def upload_stream(self, *, key, stream, size, content_type=None):
+        self.uploads[key] = (stream.read(), size, content_type)
+        return {"key": key, "size": size, "etag": '"e"', "uploaded_at": datetime.now(timezone.utc)}
+
+
+def _service(archives_path: Path, book: Book, storage: _Storage) -> BookService:
+    return BookService(
+        repository=_Repo(book),  # type: ignore[arg-type]
+        storage=storage,  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=archives_path,
+        s3_bucket="books",
+    )
+
+
+def _book(file_name: str = "687130.fb2") -> Book:
+    return Book(id=7, author="Акунин Борис", title="Азазель", archive_name="lib.zip", file_name=file_name)
+
+
+@pytest.mark.asyncio
+async def test_export_streams_member_from_archive_without_temp_files(tmp_path, monkeypatch) -> None:
+    with zipfile.ZipFile(tmp_path / "lib.zip", "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("687130.fb2", b"<FictionBook/>" * 100)
+    storage = _Storage()
+    monkeypatch.setattr(tempfile, "mkdtemp", lambda *a, **kw: pytest.fail("временный каталог не нужен"))
+
+    result = await _service(tmp_path, _book(), storage).export_book_to_s3(7)
+
+    assert result == {"bucket": "books", "key": "7_akunin-boris_azazel_unknown.fb2", "existed": False}
+    assert storage.uploads[result["key"]] == (b"<FictionBook/>" * 100, 1400, None)
+
+
+@pytest.mark.asyncio
+async def test_export_missing_member_is_value_error(tmp_path) -> None:
+    with zipfile.ZipFile(tmp_path / "lib.zip", "w") as zf:
+        zf.writestr("other.fb2", b"x")
+
+    with pytest.raises(ValueException, match="Файл не найден в архиве"):
+        await _service(tmp_path, _book(), _Storage()).export_book_to_s3(7)
+
+
+@pytest.fixture
+async def manifest(async_engine):
+    await ensure_object_manifest(async_engine)
+    return S3ObjectManifest(async_engine, bucket="books", ttl_s=7 * 86400)
+
+
+class _EmailSender:
+    async def send_book(self, **kwargs):
+        return {"ok": True, "status_code": 200, "provider_response": None, "detail": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_export_then_send_makes_at_most_one_head_request(tmp_path, manifest) -> None:
+    with zipfile.ZipFile(tmp_path / "lib.zip", "w") as zf:
+        zf.writestr("687130.fb2", b"<FictionBook/>")
+    storage = _Storage()
+    service = BookService(
+        repository=_Repo(_book()),  # type: ignore[arg-type]
+        storage=storage,  # type: ignore[arg-type]
+        email_sender=_EmailSender(),  # type: ignore[arg-type]
+        archives_path=tmp_path,
+        s3_bucket="books",
+        object_manifest=manifest,
+    )
+
+    exported = await service.export_book_to_s3(7)
+    again = await service.export_book_to_s3(7)
+    await service.send_book_to_email(bucket="books", file_key=exported["key"], to="a@b.c", subject="s", text="t")
+
+    assert (exported["existed"], again["existed"]) == (False, True)
+    assert storage.heads == 1
+
+
+@pytest.mark.asyncio
+async def test_manifest_entry_expires_with_bucket_lifecycle(async_engine) -> None:
+    await ensure_object_manifest(async_engine)
+    now = [1_000_000.0]
+    manifest = S3ObjectManifest(async_engine, bucket="books", ttl_s=100, clock=lambda: now[0])
+    uploaded_at = datetime.fromtimestamp(now[0], timezone.utc)
+
+    await manifest.put({"key": "a.fb2", "size": 3, "etag": '"e"', "uploaded_at": uploaded_at})
+
+    assert await manifest.get("a.fb2") == {"key": "a.fb2", "size": 3, "etag": '"e"', "uploaded_at": uploaded_at}
+    assert await S3ObjectManifest(async_engine, bucket="other", ttl_s=100).get("a.fb2") is None
+    now[0] += 100
+    assert await manifest.get("a.fb2") is None
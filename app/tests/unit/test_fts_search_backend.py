@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import insert
+
+from config.config import settings
+from domain.models.book import Book
+from infrastructure.db.fts import ensure_books_fts, ensure_books_fts_trigram
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.repositories.book_repo import BookRepo
+
+
+@pytest.fixture
+async def fts_repo(async_engine, async_session, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "sqlite_fts")
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await ensure_books_fts(async_engine)
+    await ensure_books_fts_trigram(async_engine)
+
+    await async_session.execute(
+        insert(BookORM),
+        [
+            {"id": 1, "author": "Акунин Борис", "title": "Азазель", "genre": "detective"},
+            {"id": 2, "author": "Акунин Борис", "title": "Турецкий гамбит"},
+            {"id": 3, "author": "Пушкин Александр", "title": "Чёрная шаль"},
+        ],
+    )
+    await async_session.commit()
+    return BookRepo(async_session, Book, BookORM)
+
+
+@pytest.mark.asyncio
+async def test_fts_search_returns_full_books_by_prefix(fts_repo):
+    books = await fts_repo.search(author="акун", title="аза")
+
+    assert [b.id for b in books] == [1]
+    assert books[0].genre == "detective"
+
+
+@pytest.mark.asyncio
+async def test_fts_search_folds_yo(fts_repo):
+    assert [b.id for b in await fts_repo.search(q="черная")] == [3]
+
+
+@pytest.mark.asyncio
+async def test_fts_search_page_stops_at_limit_plus_one(fts_repo):
+    page = await fts_repo.search_page(author="Акунин", limit=1)
+
+    assert page.total == 2
+    assert page.books == []
+
+
+@pytest.mark.asyncio
+async def test_fts_search_empty_query_finds_nothing(fts_repo):
+    page = await fts_repo.search_page(q=" - ", limit=50)
+
+    assert page.total == 0
+
+
+@pytest.mark.asyncio
+async def test_fts_falls_back_to_substring_from_the_middle_of_a_word(fts_repo):
+    assert [b.id for b in await fts_repo.search(author="кунин", title="урецк")] == [2]
+
+
+@pytest.mark.asyncio
+async def test_fts_falls_back_to_typo_tolerant_search(fts_repo):
+    books = await fts_repo.search(author="Акнин", title="Азазль")
+
+    assert [b.id for b in books] == [1]
+
+
+@pytest.mark.asyncio
+async def test_fts_fallback_can_be_disabled(fts_repo, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_FTS_FALLBACK", False)
+
+    assert await fts_repo.search(author="кунин") == []
+
+
+@pytest.mark.asyncio
+async def test_fts_suggest_returns_light_suggestions_without_duplicate_editions(fts_repo, async_session):
+    await async_session.execute(insert(BookORM), [{"id": 4, "author": "Акунин Борис", "title": "Азазель"}])
+    await async_session.commit()
+
+    suggestions = await fts_repo.suggest("акунин", limit=10)
+
+    assert sorted((s.title, s.id in (1, 4)) for s in suggestions) == [("Азазель", True), ("Турецкий гамбит", False)]
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import insert, select, text
+
+from domain.models.book import Book
+from domain.util import book_id_from_query, isbn_lookup_keys, normalize_isbn
+from infrastructure.db.isbn_index import ensure_books_isbn_index
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.repositories.book_repo import BookRepo
+
+
+def test_isbn_lookup_keys_adds_other_isbn_form():
+    assert isbn_lookup_keys("ISBN 978-0-306-40615-7") == ["9780306406157", "0306406152"]
+    assert isbn_lookup_keys("0-8044-2957-x") == ["080442957X", "9780804429573"]
+    assert isbn_lookup_keys("979-10-90636-07-1") == ["9791090636071"]
+    assert isbn_lookup_keys("Азазель") is None
+    assert isbn_lookup_keys("12345") is None
+
+
+def test_book_id_from_query_needs_marker():
+    assert book_id_from_query("id: 42") == 42
+    assert book_id_from_query("#7") == 7
+    assert book_id_from_query("Book_ID=5") == 5
+    assert book_id_from_query("123456") is None
+    assert book_id_from_query("1984") is None
+    assert book_id_from_query("Гамлет") is None
+
+
+@pytest.mark.asyncio
+async def test_find_by_isbn_matches_normalized_isbn(async_engine, async_session):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await ensure_books_isbn_index(async_engine)
+    await async_session.execute(
+        insert(BookORM),
+        [
+            {"id": 1, "title": "Дюна", "isbn": "ISBN: 978-0-306-40615-7"},
+            {"id": 2, "title": "Дюна (старое издание)", "isbn": "0 306 40615 2"},
+            {"id": 3, "title": "Без ISBN", "isbn": None},
+        ],
+    )
+    await async_session.commit()
+    repo = BookRepo(async_session, Book, BookORM)
+
+    books = await repo.find_by_isbn(isbn_lookup_keys("0306406152") or [], limit=10)
+
+    assert [b.id for b in books] == [1, 2]
+    assert books[0].isbn == "ISBN: 978-0-306-40615-7"
+    assert await repo.find_by_isbn([normalize_isbn("978-5-17-000000-0")], limit=10) == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_isbn_index_adds_column_to_existing_table(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, isbn TEXT);"))
+        await conn.execute(text("INSERT INTO books (id, title, isbn) VALUES (1, 'Дюна', '978-0-306-40615-7');"))
+
+    await ensure_books_isbn_index(async_engine)
+    await ensure_books_isbn_index(async_engine)
+
+    async with async_engine.connect() as conn:
+        row = (await conn.execute(text("SELECT id FROM books WHERE isbn_norm = '9780306406157';"))).one()
+        plan = (await conn.execute(text("EXPLAIN QUERY PLAN SELECT id FROM books WHERE isbn_norm = 'X';"))).all()
+    assert row.id == 1
+    assert "ix_books_isbn_norm" in str(plan)
+
+
+@pytest.mark.asyncio
+async def test_book_orm_reads_table_without_isbn_norm(async_engine, async_session):
+    # Скрипты читают BookORM без lifespan: на старой БД без isbn_norm запрос по всей таблице не должен падать.
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+        await conn.execute(text("INSERT INTO books (id, title, isbn) VALUES (1, 'Дюна', '978-0-306-40615-7');"))
+
+    rows = (await async_session.execute(select(BookORM.__table__))).all()
+
+    assert [row.id for row in rows] == [1]
+    assert "isbn_norm" not in BookORM.__table__.columns
@@ -2,8 +2,15 @@ from contextlib import asynccontextmanager
 
 import pytest
 
-from domain.exceptions import BooksNotFoundError, EmailSendError, NotFoundError, ValueException
-from domain.models.book import Book
+from domain.exceptions import (
+    BooksNotFoundError,
+    EmailSendError,
+    NotFoundError,
+    SearchCursorError,
+    UnsupportedSearchOptionError,
+    ValueException,
+)
+from domain.models.book import Book, BookSearchBatchItem, BookSearchCursorPage, BookSearchQuery
 from main import app
 from mcp_server import server
 
@@ -12,7 +19,7 @@ class _SearchService:
     def __init__(self) -> None:
         self.search_kwargs: dict[str, str | None] | None = None
 
-    async def search(self, *, q: str | None = None, author: str | None = None, title: str | None = None):
+    async def search(self, *, q=None, author=None, title=None, filters=None, facets=False):
         self.search_kwargs = {"q": q, "author": author, "title": title}
         return [
             Book(
@@ -26,8 +33,36 @@ class _SearchService:
         ]
 
 
+class _PagesService:
+    def __init__(self) -> None:
+        self.kwargs: dict[str, str | None] | None = None
+
+    async def search_pages(self, *, q=None, author=None, title=None, cursor=None, filters=None):
+        self.kwargs = {"q": q, "author": author, "title": title, "cursor": cursor}
+        if cursor == "expired":
+            raise SearchCursorError("Курсор поиска устарел")
+        return BookSearchCursorPage(books=[Book(id=1, author="Акунин Борис")], next_cursor="next")
+
+
+class _FtsService:
+    async def search(self, *, q=None, author=None, title=None, filters=None, facets=False):
+        raise UnsupportedSearchOptionError("Движок поиска sqlite_fts не поддерживает: facets.")
+
+    async def search_pages(self, *, q=None, author=None, title=None, cursor=None, filters=None):
+        raise UnsupportedSearchOptionError("Движок поиска sqlite_fts не поддерживает: paginate/cursor.")
+
+
+class _BatchService:
+    def __init__(self) -> None:
+        self.queries: list[BookSearchQuery] | None = None
+
+    async def search_batch(self, queries: list[BookSearchQuery]):
+        self.queries = queries
+        return [BookSearchBatchItem(status="no_results", detail="Нет результатов") for _ in queries]
+
+
 class _NoResultsService:
-    async def search(self, *, q: str | None = None, author: str | None = None, title: str | None = None):
+    async def search(self, *, q=None, author=None, title=None, filters=None, facets=False):
         raise BooksNotFoundError("Нет результатов")
 
 
@@ -119,6 +154,51 @@ async def test_mcp_search_books_maps_no_results(monkeypatch):
     assert result.detail == "Нет результатов"
 
 
+@pytest.mark.asyncio
+async def test_mcp_search_books_paginates_by_cursor(monkeypatch):
+    service = _PagesService()
+    monkeypatch.setattr(server, "book_service_context", _service_context(service))
+
+    first = await server.search_books(author=" Акунин ", paginate=True)
+    assert first.status == "ok"
+    assert first.next_cursor == "next"
+    assert service.kwargs == {"q": None, "author": "Акунин", "title": None, "cursor": None}
+
+    expired = await server.search_books(cursor="expired")
+    assert expired.status == "invalid_cursor"
+
+
+@pytest.mark.asyncio
+async def test_mcp_search_books_maps_unsupported_options_to_validation_error(monkeypatch):
+    monkeypatch.setattr(server, "book_service_context", _service_context(_FtsService()))
+
+    faceted = await server.search_books(author="Акунин", facets=True)
+    paged = await server.search_books(author="Акунин", paginate=True)
+
+    assert (faceted.status, paged.status) == ("validation_error", "validation_error")
+    assert paged.detail == "Движок поиска sqlite_fts не поддерживает: paginate/cursor."
+
+
+@pytest.mark.asyncio
+async def test_mcp_search_books_batch_normalizes_and_delegates(monkeypatch):
+    service = _BatchService()
+    monkeypatch.setattr(server, "book_service_context", _service_context(service))
+
+    result = await server.search_books_batch([BookSearchQuery(author=" Акунин "), BookSearchQuery(title="Шаль", q=" ")])
+
+    assert result.status == "ok"
+    assert [item.status for item in result.results] == ["no_results", "no_results"]
+    assert service.queries == [BookSearchQuery(author="Акунин"), BookSearchQuery(title="Шаль")]
+
+
+@pytest.mark.asyncio
+async def test_mcp_search_books_batch_rejects_empty_query():
+    result = await server.search_books_batch([BookSearchQuery(title="Шаль"), BookSearchQuery(q="  ")])
+
+    assert result.status == "validation_error"
+    assert result.detail is not None and result.detail.startswith("queries[1]")
+
+
 @pytest.mark.asyncio
 async def test_mcp_export_book_to_s3_returns_export_data(monkeypatch):
     monkeypatch.setattr(server, "book_service_context", _service_context(_ExportService()))
@@ -224,3 +304,73 @@ def test_mcp_http_route_registered_at_top_level():
     ]
 
     assert mcp_routes
+
+
+class _GroupedService:
+    async def search_grouped(self, *, q=None, author=None, title=None, filters=None):
+        from domain.models.book import BookGroup
+
+        return [BookGroup(author=author, title="Азазель", editions=[Book(id=1, author=author)], editions_total=1)]
+
+
+@pytest.mark.asyncio
+async def test_mcp_search_books_grouped_returns_groups(monkeypatch):
+    monkeypatch.setattr(server, "book_service_context", _service_context(_GroupedService()))
+
+    result = await server.search_books(author=" Акунин ", grouped=True)
+    assert result.status == "ok"
+    assert result.books == []
+    assert [b.id for b in result.groups[0].editions] == [1]
+
+    mixed = await server.search_books(author="Акунин", grouped=True, paginate=True)
+    assert mixed.status == "validation_error"
+
+
+class _TooManyWithFacetsService:
+    def __init__(self) -> None:
+        self.kwargs: dict | None = None
+
+    async def search(self, *, q=None, author=None, title=None, filters=None, facets=False):
+        from domain.exceptions import TooManyResultsError
+        from domain.models.book import BookFacetValue, BookSearchFacets
+
+        self.kwargs = {"filters": filters, "facets": facets}
+        raise TooManyResultsError("Слишком много", facets=BookSearchFacets(lang=[BookFacetValue(value="ru", count=60)]))
+
+
+@pytest.mark.asyncio
+async def test_mcp_search_books_returns_facets_with_too_many_results(monkeypatch):
+    service = _TooManyWithFacetsService()
+    monkeypatch.setattr(server, "book_service_context", _service_context(service))
+
+    result = await server.search_books(author="Акунин", genre=" detective ", lang=" ", facets=True)
+
+    assert result.status == "too_many_results"
+    assert result.facets is not None
+    assert result.facets.lang[0].value == "ru"
+    assert service.kwargs["facets"] is True
+    assert service.kwargs["filters"].model_dump() == {"genre": "detective", "lang": None, "year": None}
+
+
+class _SuggestService:
+    def __init__(self) -> None:
+        self.prefix: str | None = None
+
+    async def suggest(self, prefix: str):
+        from domain.models.book import BookSuggestion
+
+        self.prefix = prefix
+        return [BookSuggestion(id=1, author="Акунин Борис", title="Азазель")]
+
+
+@pytest.mark.asyncio
+async def test_mcp_suggest_books_trims_and_delegates(monkeypatch):
+    service = _SuggestService()
+    monkeypatch.setattr(server, "book_service_context", _service_context(service))
+
+    result = await server.suggest_books(prefix="  аку ")
+    assert result.status == "ok"
+    assert result.suggestions[0].title == "Азазель"
+    assert service.prefix == "аку"
+
+    assert (await server.suggest_books(prefix="  ")).status == "validation_error"
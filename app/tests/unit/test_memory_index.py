@@ -0,0 +1,118 @@
+import random
+
+import pytest
+from sqlalchemy import insert
+
+from config.config import settings
+from domain.models.book import Book
+from infrastructure.db.fts_query import fold_query_tokens
+from infrastructure.db.models.book_orm import BookORM
+from infrastructure.repositories.book_repo import BookRepo
+from infrastructure.search import memory_index
+from infrastructure.search.memory_index import BookMemoryIndex, build_books_memory_index
+
+
+ROWS = [
+    (1, "Акунин Борис", "Азазель"),
+    (2, "Акунин Борис", "Турецкий гамбит"),
+    (3, "Пушкин Александр", "Чёрная шаль"),
+    (4, "Толстой Лев", "Азбука"),
+    (5, "А. Грин", "Алые паруса"),
+]
+
+
+@pytest.fixture
+def index() -> BookMemoryIndex:
+    return BookMemoryIndex.build(ROWS)
+
+
+def test_memory_index_matches_prefixes_with_and_semantics(index):
+    assert index.search(q=None, author="акун", title=None, limit=10) == (2, [1, 2])
+    assert index.search(q=None, author="акун", title="аз", limit=10) == (1, [1])
+    assert index.search(q="акунин гамбит", author=None, title=None, limit=10) == (1, [2])
+    assert index.search(q=None, author="акунин", title="шаль", limit=10) == (0, [])
+
+
+def test_memory_index_folds_yo_and_case(index):
+    assert index.search(q="ЧЕРНАЯ", author=None, title=None, limit=10) == (1, [3])
+    assert index.search(q=None, author=None, title="чёрн", limit=10) == (1, [3])
+
+
+def test_memory_index_single_letter_matches_exactly(index):
+    assert index.search(q=None, author="а", title=None, limit=10) == (1, [5])
+
+
+def test_memory_index_ranks_exact_words_first():
+    index = BookMemoryIndex.build([(1, "Иванов", "Парусник"), (2, "Петров", "Парус")])
+
+    assert index.search(q=None, author=None, title="парус", limit=10) == (2, [2, 1])
+    assert index.search(q=None, author=None, title="пар", limit=10) == (2, [1, 2])
+
+
+def test_memory_index_count_skips_ranking_when_too_many(index):
+    assert index.search(q="акунин", author=None, title=None, limit=1, count=True) == (2, [])
+
+
+def _naive_search(rows, *, author: str | None, title: str | None, limit: int) -> list[int]:
+    def _hit(words: set[str], token: str) -> int:
+        if token in words:
+            return 2
+        return 1 if len(token) >= 2 and any(word.startswith(token) for word in words) else 0
+
+    ranked = []
+    for book_id, book_author, book_title in rows:
+        hits = [_hit(set(fold_query_tokens(book_author)), t) for t in fold_query_tokens(author)]
+        hits += [_hit(set(fold_query_tokens(book_title)), t) for t in fold_query_tokens(title)]
+        if all(hits):
+            ranked.append((-hits.count(2), book_id))
+    return [book_id for _, book_id in sorted(ranked)[:limit]]
+
+
+def test_memory_index_intersection_matches_naive_search():
+    rnd = random.Random(7)
+    words = ["ко", "кот", "котёл", "корова", "ба", "баба", "бал", "а", "мир", "мирон", "война"]
+    rows = [
+        (book_id, " ".join(rnd.sample(words, 2)), " ".join(rnd.sample(words, rnd.randint(1, 3))))
+        for book_id in range(1, 801)
+    ]
+    index = BookMemoryIndex.build(rows)
+
+    for _ in range(100):
+        author = rnd.choice([None, rnd.choice(words)[: rnd.randint(1, 4)]])
+        title = " ".join(w[: rnd.randint(1, 5)] for w in rnd.sample(words, rnd.randint(1, 2)))
+        limit = rnd.choice([1, 10, 50, 5000])
+        everything = _naive_search(rows, author=author, title=title, limit=len(rows))
+        expected = everything[:limit]
+
+        assert index.search(q=None, author=author, title=title, limit=limit)[1] == expected
+        total, ids = index.search(q=None, author=author, title=title, limit=limit, count=True)
+        assert (total, ids) == ((limit + 1, []) if len(everything) > limit else (len(everything), expected))
+
+
+def test_memory_index_empty_query_finds_nothing(index):
+    assert index.search(q=" - ", author=None, title=None, limit=10) == (0, [])
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_search_via_book_repo(async_engine, async_session, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(memory_index, "_index", None)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BookORM.metadata.create_all, tables=[BookORM.__table__])
+    await async_session.execute(
+        insert(BookORM),
+        [{"id": book_id, "author": author, "title": title, "genre": "prose"} for book_id, author, title in ROWS],
+    )
+    await async_session.commit()
+
+    built = await build_books_memory_index(async_session, partition_size=2)
+    repo = BookRepo(async_session, Book, BookORM)
+
+    assert built.books == len(ROWS)
+    books = await repo.search(author="пушк")
+    assert [b.id for b in books] == [3]
+    assert books[0].genre == "prose"
+
+    page = await repo.search_page(author="Акунин", limit=1)
+    assert page.total == 2
+    assert page.books == []
@@ -0,0 +1,139 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import io
+
+import pytest
+
+from infrastructure.storage.s3_storage import S3Storage
+
+
+def _storage(**kwargs) -> S3Storage:
+    return S3Storage(
+        endpoint_url="http://minio:9000",
+        access_key="key",
+        secret_key="secret",
+        bucket="books",
+        region="us-east-1",
+        max_pool_connections=4,
+        **kwargs,
+    )
+
+
+class _Client:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def head_object(self, *, Bucket, Key):
+        self.calls.append(f"head {Key}")
+        return {"ContentLength": 3, "ETag": '"e0"', "LastModified": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+
+    async def put_object(self, *, Bucket, Key, Body, **kwargs):
+        self.calls.append(f"put {Key} {Body!r}")
+        return {"ETag": '"p"'}
+
+    async def create_multipart_upload(self, *, Bucket, Key, **kwargs):
+        self.calls.append(f"create {Key} {kwargs}")
+        return {"UploadId": "u1"}
+
+    async def upload_part(self, *, Bucket, Key, UploadId, PartNumber, Body):
+        if Body == b"fail":
+            raise RuntimeError("обрыв")
+        self.calls.append(f"part {PartNumber} {Body!r}")
+        return {"ETag": f"e{PartNumber}"}
+
+    async def complete_multipart_upload(self, *, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append(f"complete {[p['ETag'] for p in MultipartUpload['Parts']]}")
+        return {"ETag": '"m-3"'}
+
+    async def abort_multipart_upload(self, *, Bucket, Key, UploadId):
+        self.calls.append(f"abort {UploadId}")
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.opened: list[_Client] = []
+        self.closed = 0
+        self.configs: list = []
+
+    @asynccontextmanager
+    async def client(self, service, **kwargs):
+        self.configs.append(kwargs["config"])
+        client = _Client()
+        self.opened.append(client)
+        try:
+            yield client
+        finally:
+            self.closed += 1
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_reuses_one_client_until_closed():
+    storage = _storage()
+    session = _Session()
+    storage._session = session
+
+    await storage.open()
+    assert await storage.stat_object(key="a.fb2.zip") == {
+        "key": "a.fb2.zip",
+        "size": 3,
+        "etag": '"e0"',
+        "uploaded_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+    stored = await storage.upload_stream(key="a.fb2", stream=io.BytesIO(b"fb2"), size=3)
+
+    assert len(session.opened) == 1
+    assert session.opened[0].calls == ["head a.fb2.zip", "put a.fb2 b'fb2'"]
+    assert session.configs[0].max_pool_connections == 4
+    assert (stored["key"], stored["size"], stored["etag"]) == ("a.fb2", 3, '"p"')
+
+    await storage.close()
+    assert session.closed == 1
+    assert await storage.stat_object(key="b.fb2.zip") is not None
+    assert len(session.opened) == 2
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_opens_real_client_without_network():
+    storage = _storage()
+
+    await storage.open()
+    client = storage._client
+    await storage.open()
+
+    assert client is not None
+    assert storage._client is client
+    await storage.close()
+    assert storage._client is None
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_sends_large_objects_in_bounded_parts():
+    storage = _storage(multipart_chunk_bytes=4)
+    session = _Session()
+    storage._session = session
+
+    stored = await storage.upload_stream(
+        key="big.fb2", stream=io.BytesIO(b"0123456789"), size=10, content_type="text/xml"
+    )
+
+    assert session.opened[0].calls == [
+        "create big.fb2 {'ContentType': 'text/xml'}",
+        "part 1 b'0123'",
+        "part 2 b'4567'",
+        "part 3 b'89'",
+        "complete ['e1', 'e2', 'e3']",
+    ]
+    assert stored["etag"] == '"m-3"'
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_multipart_upload_on_error():
+    storage = _storage(multipart_chunk_bytes=4)
+    session = _Session()
+    storage._session = session
+
+    with pytest.raises(RuntimeError):
+        await storage.upload_stream(key="big.fb2", stream=io.BytesIO(b"0123fail"), size=8)
+
+    assert session.opened[0].calls[-1] == "abort u1"
@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import pytest
+
+from domain.exceptions import BooksNotFoundError, TooManyResultsError
+from domain.models.book import Book, BookSearchCapabilities, BookSearchPage
+from domain.services.book_service import BookService
+from infrastructure.cache.search_cache import InMemorySearchCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Generation:
+    def __init__(self) -> None:
+        self.value = 0
+
+    def __call__(self) -> int:
+        return self.value
+
+
+class _Repo:
+    def __init__(self, page: BookSearchPage) -> None:
+        self.page = page
+        self.calls = 0
+
+    def search_capabilities(self) -> BookSearchCapabilities:
+        return BookSearchCapabilities(backend="elasticsearch", filters=True, facets=True)
+
+    async def search_page(
+        self, *, q=None, author=None, title=None, limit, hydrate=None, filters=None, facets=False
+    ) -> BookSearchPage:
+        self.calls += 1
+        return self.page
+
+
+def _cache(clock: _Clock | None = None, generation: _Generation | None = None, **kwargs) -> InMemorySearchCache:
+    params = {"max_entries": 10, "ttl_s": 60.0, "negative_ttl_s": 5.0, **kwargs}
+    return InMemorySearchCache(
+        **params,
+        generation=generation or _Generation(),
+        clock=clock or _Clock(),
+    )
+
+
+def _service(repo: _Repo, cache: InMemorySearchCache) -> BookService:
+    return BookService(
+        repository=repo,  # type: ignore[arg-type]
+        storage=object(),  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=Path("/tmp"),
+        s3_bucket="books",
+        search_cache=cache,
+    )
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = _cache(max_entries=2)
+    books = [Book(id=1)]
+    cache.put(("a", None, None), books, generation=0)
+    cache.put(("b", None, None), books, generation=0)
+    assert cache.get(("a", None, None)) == books
+    cache.put(("c", None, None), books, generation=0)
+
+    assert cache.get(("b", None, None)) is None
+    assert cache.get(("a", None, None)) == books
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2, "generation": 0}
+
+
+def test_negative_outcomes_expire_sooner() -> None:
+    clock = _Clock()
+    cache = _cache(clock)
+    cache.put(("found", None, None), [Book(id=1)], generation=0)
+    cache.put(("none", None, None), BooksNotFoundError("нет"), generation=0)
+
+    clock.now = 10.0
+
+    assert cache.get(("none", None, None)) is None
+    assert cache.get(("found", None, None)) is not None
+
+
+def test_generation_change_drops_entries_and_stale_puts() -> None:
+    generation = _Generation()
+    cache = _cache(generation=generation)
+    cache.put(("a", None, None), [Book(id=1)], generation=0)
+
+    generation.value = 1
+    cache.put(("b", None, None), [Book(id=2)], generation=0)
+
+    assert cache.get(("a", None, None)) is None
+    assert cache.get(("b", None, None)) is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_service_serves_repeat_search_from_cache() -> None:
+    repo = _Repo(BookSearchPage(books=[Book(id=1, author="Акунин Борис", title="Азазель")], total=1))
+    service = _service(repo, _cache())
+
+    first = await service.search(author="Акунин", title="Азазель")
+    second = await service.search(author="  акунин ", title="Азазель")
+
+    assert [b.id for b in first] == [b.id for b in second] == [1]
+    assert repo.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_service_caches_too_many_results() -> None:
+    repo = _Repo(BookSearchPage(total=51))
+    service = _service(repo, _cache())
+
+    for _ in range(2):
+        with pytest.raises(TooManyResultsError):
+            await service.search(author="Акунин")
+
+    assert repo.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_service_keeps_facets_of_cached_too_many_results() -> None:
+    from domain.models.book import BookFacetValue, BookSearchFacets, BookSearchFilters
+
+    facets = BookSearchFacets(lang=[BookFacetValue(value="ru", count=51)])
+    repo = _Repo(BookSearchPage(total=51, facets=facets))
+    service = _service(repo, _cache())
+
+    for _ in range(2):
+        with pytest.raises(TooManyResultsError) as ex:
+            await service.search(author="Акунин", facets=True)
+        assert ex.value.facets == facets
+    with pytest.raises(TooManyResultsError):
+        await service.search(author="Акунин", filters=BookSearchFilters(genre="detective"))
+
+    # Поиск с другим фильтром — другой ключ кэша.
+    assert repo.calls == 2
+
+
+class _SuggestRepo:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def suggest(self, prefix, *, limit):
+        from domain.models.book import BookSuggestion
+
+        self.calls += 1
+        return [BookSuggestion(id=1, author="Акунин Борис", title="Азазель")]
+
+
+@pytest.mark.asyncio
+async def test_service_serves_common_prefixes_from_suggest_cache() -> None:
+    repo = _SuggestRepo()
+    service = _service(repo, _cache())  # type: ignore[arg-type]
+    service.suggest_cache = _cache()
+
+    first = await service.suggest("Аку")
+    second = await service.suggest(" аку ")
+
+    assert [s.id for s in first] == [s.id for s in second] == [1]
+    assert repo.calls == 1
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -11,12 +12,14 @@ class _Storage:
         self._exists = exists
         self.checked_key: str | None = None
 
-    async def file_exists(self, *, key: str) -> bool:
+    async def stat_object(self, *, key: str):
         self.checked_key = key
-        return self._exists
+        if not self._exists:
+            return None
+        return {"key": key, "size": 1, "etag": '"e"', "uploaded_at": datetime.now(timezone.utc)}
 
-    async def upload_file(self, *, key, path, content_type=None) -> None:  # pragma: no cover
-        raise AssertionError("upload_file не должен вызываться в этом тесте")
+    async def upload_stream(self, *, key, stream, size, content_type=None) -> None:  # pragma: no cover
+        raise AssertionError("upload_stream не должен вызываться в этом тесте")
 
 
 class _EmailSender:
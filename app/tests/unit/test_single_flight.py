@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from domain.models.book import Book
+from domain.services.book_service import BookService
+from domain.util import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+
+    async def _work() -> int:
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return 42
+
+    tasks = [asyncio.create_task(flight.do("k", _work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [42] * 5
+    assert runs == 1
+    assert not flight.in_flight("k")
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_waiters() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def _fail() -> None:
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flight.do("k", _fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_waiter_retries_when_leader_is_cancelled() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+
+    async def _work() -> str:
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", _work))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("k", _work))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "done"
+    assert runs == 2
+
+
+class _Repo:
+    async def read(self, *, filters) -> Book:
+        await asyncio.sleep(0)
+        return Book(id=filters["id"], author="Акунин Борис", title="Азазель", archive_name="a.zip", file_name="1.fb2")
+
+
+class _Storage:
+    def __init__(self) -> None:
+        self.exists_calls = 0
+
+    async def stat_object(self, *, key: str):
+        self.exists_calls += 1
+        await asyncio.sleep(0)
+        return {"key": key, "size": 1, "etag": '"e"', "uploaded_at": datetime.now(timezone.utc)}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_exports_of_one_book_are_coalesced() -> None:
+    storage = _Storage()
+    service = BookService(
+        repository=_Repo(),  # type: ignore[arg-type]
+        storage=storage,  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=Path("/tmp"),
+        s3_bucket="books",
+        single_flight=SingleFlight(),
+    )
+
+    results = await asyncio.gather(*(service.export_book_to_s3(7) for _ in range(4)))
+
+    assert storage.exists_calls == 1
+    assert len({r["key"] for r in results}) == 1
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from infrastructure.archives.zip_handles import ZipHandleCache
+
+
+def _write_archive(path: Path, *members: str) -> Path:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name in members:
+            zf.writestr(name, f"<FictionBook>{name}</FictionBook>".encode() * 20)
+    return path
+
+
+def _read(cache: ZipHandleCache, path: Path, name: str) -> bytes:
+    stream, size = cache.open_member(path, name)
+    with stream:
+        data = stream.read()
+    assert len(data) == size
+    return data
+
+
+@pytest.fixture
+def parses(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    real = zipfile.ZipFile._RealGetContents
+
+    def _counting(self):
+        calls.append(self.filename)
+        return real(self)
+
+    monkeypatch.setattr(zipfile.ZipFile, "_RealGetContents", _counting)
+    return calls
+
+
+def test_repeat_reads_reuse_parsed_archive(tmp_path, parses):
+    path = _write_archive(tmp_path / "a.zip", "1.fb2", "2.fb2")
+    cache = ZipHandleCache(max_handles=4, max_bytes=1 << 20)
+
+    assert _read(cache, path, "1.fb2") == b"<FictionBook>1.fb2</FictionBook>" * 20
+    assert _read(cache, path, "2.fb2") == b"<FictionBook>2.fb2</FictionBook>" * 20
+    with pytest.raises(KeyError):
+        cache.open_member(path, "missing.fb2")
+
+    assert len(parses) == 1
+    assert cache.stats()["hits"] == 2
+    cache.close()
+
+
+def test_changed_archive_is_reopened(tmp_path, parses):
+    path = _write_archive(tmp_path / "a.zip", "1.fb2")
+    cache = ZipHandleCache(max_handles=4, max_bytes=1 << 20)
+    _read(cache, path, "1.fb2")
+
+    _write_archive(path, "1.fb2", "new.fb2")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert _read(cache, path, "new.fb2")
+    assert len(parses) == 2
+    assert cache.stats()["handles"] == 1
+    cache.close()
+
+
+def test_cache_is_bounded_by_handles_and_memory(tmp_path):
+    paths = [_write_archive(tmp_path / f"{i}.zip", "1.fb2") for i in range(3)]
+    cache = ZipHandleCache(max_handles=2, max_bytes=1 << 20)
+
+    stream, _ = cache.open_member(paths[0], "1.fb2")
+    for path in paths[1:]:
+        _read(cache, path, "1.fb2")
+
+    # Вытеснение закрыло ZipFile, но уже открытый поток дочитывается.
+    assert stream.read() == b"<FictionBook>1.fb2</FictionBook>" * 20
+    stream.close()
+    assert cache.stats()["handles"] == 2
+
+    tiny = ZipHandleCache(max_handles=2, max_bytes=10)
+    assert _read(tiny, paths[0], "1.fb2")
+    assert tiny.stats()["handles"] == 0
+
+
+def test_concurrent_reads_share_one_handle(tmp_path):
+    path = _write_archive(tmp_path / "a.zip", *(f"{i}.fb2" for i in range(8)))
+    cache = ZipHandleCache(max_handles=4, max_bytes=1 << 20)
+    _read(cache, path, "0.fb2")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: _read(cache, path, f"{i % 8}.fb2"), range(64)))
+
+    assert results == [f"<FictionBook>{i % 8}.fb2</FictionBook>".encode() * 20 for i in range(64)]
+    assert cache.stats()["misses"] == 1
+    cache.close()
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+import os
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from domain.models.book import Book
+from domain.services.book_service import BookService
+from infrastructure.archives.zip_index import ZipArchiveIndex, ensure_archive_index, index_zip_archives
+
+
+def _write_archive(path: Path) -> None:
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("1.fb2", b"<FictionBook>1</FictionBook>" * 50, compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("2.fb2", b"<FictionBook>2</FictionBook>", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("dir/", b"")
+
+
+@pytest.fixture
+async def archive_index(async_engine, async_session):
+    await ensure_archive_index(async_engine)
+    return ZipArchiveIndex(async_session)
+
+
+@pytest.mark.asyncio
+async def test_indexed_member_is_read_from_its_offset(tmp_path, async_session, archive_index):
+    _write_archive(tmp_path / "lib.zip")
+
+    stats = await index_zip_archives(async_session, tmp_path)
+
+    assert (stats["indexed"], stats["members"]) == (1, 2)
+    for name, content in (("1.fb2", b"<FictionBook>1</FictionBook>" * 50), ("2.fb2", b"<FictionBook>2</FictionBook>")):
+        member = await archive_index.find_member(tmp_path / "lib.zip", name)
+        assert member is not None
+        assert member["file_size"] == len(content)
+        with archive_index.open_member(tmp_path / "lib.zip", name, member) as stream:
+            assert stream.read() == content
+    assert await archive_index.find_member(tmp_path / "lib.zip", "missing.fb2") is None
+
+
+@pytest.mark.asyncio
+async def test_changed_archive_is_not_trusted_until_rescanned(tmp_path, async_session, archive_index):
+    path = tmp_path / "lib.zip"
+    _write_archive(path)
+    await index_zip_archives(async_session, tmp_path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert await archive_index.find_member(path, "1.fb2") is None
+
+    stats = await index_zip_archives(async_session, tmp_path)
+    assert (stats["indexed"], stats["skipped"]) == (1, 0)
+    assert (await index_zip_archives(async_session, tmp_path))["skipped"] == 1
+    assert await archive_index.find_member(path, "1.fb2") is not None
+
+    path.unlink()
+    assert (await index_zip_archives(async_session, tmp_path))["removed"] == 1
+
+
+class _Repo:
+    async def read(self, *, filters) -> Book:
+        return Book(id=1, author="Акунин Борис", title="Азазель", archive_name="lib.zip", file_name="1.fb2")
+
+
+class _Storage:
+    def __init__(self) -> None:
+        self.body: bytes | None = None
+
+    async def stat_object(self, *, key: str):
+        return None
+
+    async def upload_stream(self, *, key, stream, size, content_type=None):
+        self.body = stream.read()
+        return {"key": key, "size": size, "etag": '"e"', "uploaded_at": datetime.now(timezone.utc)}
+
+
+@pytest.mark.asyncio
+async def test_export_of_indexed_archive_skips_central_directory(tmp_path, async_session, archive_index, monkeypatch):
+    _write_archive(tmp_path / "lib.zip")
+    await index_zip_archives(async_session, tmp_path)
+    storage = _Storage()
+    service = BookService(
+        repository=_Repo(),  # type: ignore[arg-type]
+        storage=storage,  # type: ignore[arg-type]
+        email_sender=object(),  # type: ignore[arg-type]
+        archives_path=tmp_path,
+        s3_bucket="books",
+        archive_index=archive_index,
+    )
+    monkeypatch.setattr(zipfile.ZipFile, "_RealGetContents", lambda self: pytest.fail("центральный каталог разобран"))
+
+    await service.export_book_to_s3(1)
+
+    assert storage.body == b"<FictionBook>1</FictionBook>" * 50
@@ -0,0 +1,143 @@
+"""
+Бенчмарк режимов клиента Elasticsearch (sync + asyncio.to_thread против нативного AsyncElasticsearch).
+
+Поднимает локальную заглушку ES (HTTP/1.1 keep-alive, фиксированная задержка ответа) и гоняет
+поисковые запросы через тот же `es_call`, что и BookRepo.search, с заданной конкурентностью.
+Печатает p50/p99 латентности и RPS для каждого режима.
+
+Запуск (из корня репозитория):
+    PYTHONPATH=app python scripts/bench_es_client.py --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import statistics
+import threading
+import time
+
+
+_SEARCH_RESPONSE = json.dumps(
+    {
+        "took": 1,
+        "timed_out": False,
+        "hits": {"total": {"value": 3, "relation": "eq"}, "hits": [{"_id": str(i)} for i in range(1, 4)]},
+    }
+).encode("utf-8")
+_INFO_RESPONSE = json.dumps({"version": {"number": "8.19.4"}, "tagline": "You Know, for Search"}).encode("utf-8")
+
+
+def _make_handler(latency_s: float):
+    class _FakeElasticsearchHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Заголовки и тело уходят одним write: иначе Nagle + delayed ACK добавляют ~40 мс к каждому ответу.
+        wbufsize = 1 << 16
+
+        def log_message(self, format, *args):  # noqa: A002
+            return
+
+        def _reply(self, body: bytes) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("X-Elastic-Product", "Elasticsearch")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):  # noqa: N802
+            self._reply(_INFO_RESPONSE)
+
+        def do_POST(self):  # noqa: N802
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            if latency_s:
+                time.sleep(latency_s)
+            self._reply(_SEARCH_RESPONSE)
+
+    return _FakeElasticsearchHandler
+
+
+class _FakeElasticsearchServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Дефолтный backlog (5) при всплеске подключений даёт SYN-ретраи по 1-3 сек. и искажает p99.
+    request_queue_size = 1024
+
+
+def start_fake_elasticsearch(latency_s: float) -> ThreadingHTTPServer:
+    server = _FakeElasticsearchServer(("127.0.0.1", 0), _make_handler(latency_s))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run_mode(mode: str, url: str, *, total: int, concurrency: int, pool: int) -> list[float]:
+    from config.config import settings
+    from infrastructure.search import es_client
+
+    settings.ELASTICSEARCH_URL = url
+    settings.ELASTICSEARCH_CLIENT_MODE = mode  # type: ignore[assignment]
+    settings.ELASTICSEARCH_MAX_CONNECTIONS = pool
+
+    await es_client.init_elasticsearch()
+    client = es_client.get_elasticsearch()
+    body = {"query": {"match_all": {}}, "size": 50, "_source": False}
+
+    latencies: list[float] = []
+    remaining = total
+
+    async def _worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await es_client.es_call(client.search, index="books", body=body)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        # Прогрев: установка соединений пула не должна попадать в замеры.
+        await asyncio.gather(*(es_client.es_call(client.search, index="books", body=body) for _ in range(pool)))
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    finally:
+        await es_client.close_elasticsearch()
+    return latencies
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Сколько поисковых запросов на режим")
+    parser.add_argument("--concurrency", type=int, default=64, help="Одновременных запросов")
+    parser.add_argument("--pool", type=int, default=10, help="ELASTICSEARCH_MAX_CONNECTIONS")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Искусственная задержка ответа заглушки ES")
+    args = parser.parse_args()
+
+    server = start_fake_elasticsearch(args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(
+        f"stand-in ES: {url}  requests={args.requests} concurrency={args.concurrency} "
+        f"pool={args.pool} latency={args.latency_ms}ms"
+    )
+
+    try:
+        for mode in ("sync", "async"):
+            started = time.perf_counter()
+            latencies = await _run_mode(mode, url, total=args.requests, concurrency=args.concurrency, pool=args.pool)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:>5}: p50={_percentile(latencies, 50) * 1000:7.2f}ms "
+                f"p99={_percentile(latencies, 99) * 1000:7.2f}ms "
+                f"mean={statistics.fmean(latencies) * 1000:7.2f}ms "
+                f"rps={len(latencies) / elapsed:8.0f}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Бенчмарк префиксных запросов SQLite FTS5: books_fts старого формата (без prefix=) против текущего
+(prefix='2 3 4', detail=full, см. infrastructure/db/fts.py); для сравнения — тот же prefix с detail=column.
+
+Строит во временной БД синтетический каталог (авторы/названия из русских «слогов»), создаёт FTS-таблицы
+и гоняет одинаковый набор type-ahead запросов (префиксы 2–4 символа, как у build_books_fts5_match_query)
+тем же SQL, что и SqliteFtsBookSearch: MATCH + bm25 + JOIN books + LIMIT 51.
+Печатает время построения, размер индекса и p50/p99 латентности.
+
+Запуск (из корня репозитория):
+    PYTHONPATH=app python scripts/bench_fts_prefix.py --books 1000000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Iterator
+
+from infrastructure.db.fts import books_fts_ddl
+from infrastructure.db.fts_query import build_books_fts5_match_query
+
+
+_SYLLABLES = [
+    "ка", "ло", "ми", "ра", "то", "ве", "на", "ск", "ин", "ов", "ев", "ар", "ли", "до", "се", "жу", "по", "бе",
+    "гра", "сто", "вол", "мор", "чёр", "зем", "пра", "кни", "сло", "ден", "тин", "ник", "лев", "бор", "мир",
+]  # fmt: skip
+
+
+def _word(rnd: random.Random, syllables: int) -> str:
+    return "".join(rnd.choice(_SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def synthetic_books(count: int, rnd: random.Random) -> Iterator[tuple[int, str, str]]:
+    """Синтетический каталог: (id, автор, название); на одного автора в среднем 20 книг."""
+    authors = [f"{_word(rnd, 3)}ов {_word(rnd, 2)}" for _ in range(max(count // 20, 1))]
+    for book_id in range(1, count + 1):
+        title = " ".join(_word(rnd, rnd.randint(2, 4)) for _ in range(rnd.randint(1, 4)))
+        yield book_id, rnd.choice(authors), title
+
+
+def synthetic_queries(books: list[tuple[int, str, str]], count: int, rnd: random.Random) -> list[dict[str, str]]:
+    """Type-ahead запросы по случайным книгам: префиксы слов 2–4 символа по названию, автору или обоим."""
+    queries: list[dict[str, str]] = []
+    for _, author, title in rnd.sample(books, min(count, len(books))):
+        prefix = rnd.choice(title.split())[: rnd.randint(2, 4)]
+        kind = rnd.random()
+        if kind < 0.4:
+            queries.append({"title": prefix})
+        elif kind < 0.7:
+            queries.append({"author": author.split()[0][: rnd.randint(2, 4)]})
+        else:
+            queries.append({"author": author.split()[0][:4], "title": prefix})
+    return queries
+
+
+def _fill_catalog(conn: sqlite3.Connection, books: int, rnd: random.Random) -> None:
+    conn.execute("CREATE TABLE books (id INTEGER PRIMARY KEY, author TEXT, title TEXT)")
+    batch: list[tuple[int, str, str]] = []
+    for book in synthetic_books(books, rnd):
+        batch.append(book)
+        if len(batch) == 50_000:
+            conn.executemany("INSERT INTO books VALUES (?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO books VALUES (?, ?, ?)", batch)
+    conn.commit()
+
+
+def _build_fts(conn: sqlite3.Connection, ddl: str, name: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    conn.execute(ddl)
+    conn.execute(f"INSERT INTO {name}({name}) VALUES('rebuild')")
+    conn.execute(f"INSERT INTO {name}({name}) VALUES('optimize')")
+    conn.commit()
+    pages = conn.execute(f"SELECT count(*) FROM {name}_data").fetchone()[0]
+    return time.perf_counter() - started, pages
+
+
+def _run(conn: sqlite3.Connection, name: str, queries: list[dict[str, str]]) -> list[float]:
+    sql = (
+        f"SELECT books.* FROM {name} JOIN books ON books.id = {name}.rowid "
+        f"WHERE {name} MATCH ? ORDER BY bm25({name}) LIMIT 51"
+    )
+    latencies: list[float] = []
+    for params in queries:
+        match = build_books_fts5_match_query(**params)
+        started = time.perf_counter()
+        conn.execute(sql, (match,)).fetchall()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _report(label: str, build_s: float, pages: int, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[int(len(ordered) * 0.99) - 1] * 1000
+    print(f"{label:<34} build={build_s:6.1f}s pages={pages:>8}  p50={p50:7.2f}ms  p99={p99:7.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="bench_fts_") as tmp_dir:
+        path = os.path.join(tmp_dir, "catalog.sqlite3")
+        conn = sqlite3.connect(path)
+        print(f"Каталог: {args.books} книг ({path})", flush=True)
+        _fill_catalog(conn, args.books, rnd)
+
+        variants = [
+            ("без prefix, detail=full", "fts_plain", books_fts_ddl(name="fts_plain", prefix=None, detail="full")),
+            ("prefix='2 3 4', detail=column", "fts_column", books_fts_ddl(name="fts_column", detail="column")),
+            ("prefix='2 3 4', detail=full", "fts_prefix", books_fts_ddl(name="fts_prefix")),
+        ]
+        built = {name: _build_fts(conn, ddl, name) for _, name, ddl in variants}
+
+        sample = conn.execute("SELECT id, author, title FROM books ORDER BY random() LIMIT ?", (args.queries,))
+        queries = synthetic_queries(sample.fetchall(), args.queries, rnd)
+        for label, name, _ in variants:
+            _run(conn, name, queries[:50])  # прогрев кэша страниц
+            _report(label, *built[name], _run(conn, name, queries))
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Бенчмарк in-memory инвертированного индекса книг (SEARCH_BACKEND=memory, infrastructure/search/memory_index.py).
+
+Строит индекс по синтетическому каталогу (тот же генератор, что в bench_fts_prefix.py), печатает время сборки,
+память (оценка memory_bytes и прирост по tracemalloc, в пересчёте на 1 млн книг) и p50/p99 type-ahead запросов
+с тем же вердиктом «слишком много», что у поиска (limit 50, count=True).
+
+Запуск (из корня репозитория):
+    PYTHONPATH=app python scripts/bench_memory_index.py --books 1000000 --queries 2000
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+from bench_fts_prefix import synthetic_books, synthetic_queries
+
+from infrastructure.search.memory_index import BookMemoryIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    books = list(synthetic_books(args.books, rnd))
+    queries = synthetic_queries(books, args.queries, rnd)
+
+    started = time.perf_counter()
+    index = BookMemoryIndex.build(books)
+    build_s = time.perf_counter() - started
+
+    # Память меряем отдельной сборкой: tracemalloc сильно замедляет аллокации и исказил бы время.
+    del index
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    index = BookMemoryIndex.build(books)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    retained -= baseline
+    per_million = 1_000_000 / args.books
+    print(f"Книг: {index.books}, термов: {index.terms}, сборка: {build_s:.1f} сек.")
+    print(
+        f"Память: memory_bytes={index.memory_bytes() / 2**20:.1f} МиБ, tracemalloc={retained / 2**20:.1f} МиБ "
+        f"(пик сборки {(peak - baseline) / 2**20:.1f} МиБ); "
+        f"на 1 млн книг ≈ {retained * per_million / 2**20:.0f} МиБ"
+    )
+
+    latencies: list[float] = []
+    too_many = 0
+    for params in queries:
+        started = time.perf_counter()
+        total, _ = index.search(q=None, author=params.get("author"), title=params.get("title"), limit=50, count=True)
+        latencies.append(time.perf_counter() - started)
+        too_many += total > 50
+
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[int(len(ordered) * 0.99) - 1] * 1000
+    print(f"Запросов: {len(queries)} (too_many: {too_many})  p50={p50:.2f}ms  p99={p99:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
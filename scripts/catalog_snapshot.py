@@ -0,0 +1,62 @@
+"""
+Снимок каталога книг для быстрого холодного старта воркеров (CATALOG_SNAPSHOT_PATH).
+
+Команды:
+    write  — записать снимок таблицы books (колоночный бинарный формат, атомарная подмена файла);
+    info   — показать версию формата, число книг, max(id) и дату снимка.
+
+Снимок неизменяемый: после импорта/правок каталога его нужно перезаписать и перезапустить воркеры.
+
+Запуск в контейнере приложения:
+    python /scripts/catalog_snapshot.py write --output /app/catalog.snap
+    python /scripts/catalog_snapshot.py info
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import time
+
+from config.config import settings
+from config.logger import configure_logger
+from infrastructure.db.catalog_snapshot import CatalogSnapshot, write_catalog_snapshot
+from infrastructure.db.db import sessionmanager
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["write", "info"])
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Путь к файлу снимка (по умолчанию CATALOG_SNAPSHOT_PATH)"
+    )
+    parser.add_argument("--partition-size", type=int, default=10_000, help="Сколько строк читать из БД за раз")
+    args = parser.parse_args()
+
+    path = args.output or settings.CATALOG_SNAPSHOT_PATH
+    if path is None:
+        parser.error("укажи --output или CATALOG_SNAPSHOT_PATH")
+
+    configure_logger()
+    started = time.perf_counter()
+    if args.command == "write":
+        try:
+            async with sessionmanager.session() as session:
+                rows = await write_catalog_snapshot(session, path, partition_size=args.partition_size)
+        finally:
+            await sessionmanager.close()
+        print(f"Записано книг: {rows}", flush=True)
+
+    snapshot = CatalogSnapshot(path)
+    try:
+        info = snapshot.info()
+    finally:
+        snapshot.close()
+    print(
+        f"{info['path']}: формат v{info['version']}, книг {info['rows']}, max(id) {info['max_id']}, "
+        f"создан {info['created_at']}, {info['size_bytes'] / 1024 / 1024:.1f} МиБ"
+    )
+    print(f"Готово за {time.perf_counter() - started:.1f} сек.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Обслуживание локальных FTS5-индексов книг (books_fts и books_fts_trigram, SEARCH_BACKEND=sqlite_fts).
+
+Команды:
+    ensure    — создать таблицы (books_fts старого формата без префиксных индексов пересоздаётся);
+    merge     — постепенное слияние сегментов короткими транзакциями (приложение может продолжать писать);
+    optimize  — слить все сегменты в один за одну транзакцию (быстрее, но блокирует запись на всё время);
+    rebuild   — перестроить индекс из таблицы books.
+
+Запуск в контейнере приложения:
+    python /scripts/fts_maintenance.py merge --pages 500
+    python /scripts/fts_maintenance.py optimize
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from config.logger import configure_logger
+from infrastructure.db.db import sessionmanager
+from infrastructure.db.fts import (
+    BOOKS_FTS_TABLES,
+    ensure_books_fts,
+    ensure_books_fts_trigram,
+    merge_books_fts,
+    optimize_books_fts,
+)
+
+
+async def _pages(table: str) -> int:
+    async with sessionmanager.connect() as conn:
+        return int((await conn.execute(text(f"SELECT count(*) FROM {table}_data;"))).scalar_one())
+
+
+def _print_progress(step: int, written: int) -> None:
+    print(f"  шаг {step:>5}: записано {written:>10} страниц", flush=True)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["ensure", "merge", "optimize", "rebuild"])
+    parser.add_argument("--pages", type=int, default=500, help="Сколько страниц писать за один шаг merge")
+    args = parser.parse_args()
+
+    configure_logger()
+    engine = sessionmanager.engine
+    started = time.perf_counter()
+    try:
+        await ensure_books_fts(engine)
+        await ensure_books_fts_trigram(engine)
+
+        for table in BOOKS_FTS_TABLES:
+            before = await _pages(table)
+            print(f"{table}: {before} страниц до «{args.command}»", flush=True)
+
+            if args.command == "merge":
+                await merge_books_fts(engine, table=table, pages=args.pages, on_progress=_print_progress)
+            elif args.command == "optimize":
+                await optimize_books_fts(engine, table=table)
+            elif args.command == "rebuild":
+                async with sessionmanager.connect() as conn:
+                    await conn.execute(text(f"INSERT INTO {table}({table}) VALUES('rebuild');"))
+
+            print(f"{table}: {before} → {await _pages(table)} страниц", flush=True)
+    finally:
+        await sessionmanager.close()
+
+    print(f"Готово за {time.perf_counter() - started:.1f} сек.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
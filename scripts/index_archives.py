@@ -0,0 +1,46 @@
+"""
+Индекс файлов в zip-архивах книг (таблица archive_members) для быстрого экспорта.
+
+Для каждого архива в BOOKS_ARCHIVES_PATH записывает смещение локального заголовка, размеры, метод сжатия
+и CRC каждого файла. Экспорт по индексу открывает книгу сразу по смещению, не разбирая центральный
+каталог архива (десятки тысяч файлов). Архивы с прежними mtime и размером пропускаются, поэтому
+команду можно запускать повторно после добавления/замены архивов; изменённый архив без переиндексации
+просто читается через ZipFile, как раньше.
+
+Запуск в контейнере приложения:
+    python /scripts/index_archives.py
+    python /scripts/index_archives.py --force
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from config.config import settings
+from config.logger import configure_logger
+from infrastructure.archives.zip_index import ensure_archive_index, index_zip_archives
+from infrastructure.db.db import sessionmanager
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=None, help="Каталог с архивами (по умолчанию BOOKS_ARCHIVES_PATH)")
+    parser.add_argument("--force", action="store_true", help="Пересканировать и неизменённые архивы")
+    args = parser.parse_args()
+
+    configure_logger()
+    try:
+        await ensure_archive_index(sessionmanager.engine)
+        async with sessionmanager.session() as session:
+            stats = await index_zip_archives(session, args.path or settings.BOOKS_ARCHIVES_PATH, force=args.force)
+    finally:
+        await sessionmanager.close()
+
+    print(
+        f"Архивов: {stats['archives']}, проиндексировано {stats['indexed']} ({stats['members']} файлов), "
+        f"без изменений {stats['skipped']}, с ошибками {stats['failed']}, удалено из индекса {stats['removed']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
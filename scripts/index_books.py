@@ -0,0 +1,66 @@
+"""
+Полная индексация книг из БД в Elasticsearch с параллельной bulk-загрузкой.
+
+Чтение `books` (session.stream) идёт конвейером в N конкурентных bulk-воркеров; чанки ограничены
+и по числу документов, и по размеру тела; 429 от ES ретраится с паузой. По ходу и в конце печатается
+скорость (док/сек) и общее время.
+
+Запуск в контейнере приложения:
+    python /scripts/index_books.py --workers 8 --chunk-docs 2000 --chunk-bytes 10485760
+    python /scripts/index_books.py --reindex   # blue/green: новый индекс + переключение алиаса
+"""
+
+import argparse
+import asyncio
+import time
+
+from config.config import settings
+from config.logger import configure_logger
+from infrastructure.db.db import sessionmanager
+from infrastructure.search.books_index import index_all_books, reindex_books
+from infrastructure.search.bulk_indexer import BulkIndexStats
+from infrastructure.search.es_client import close_elasticsearch, elasticsearch_enabled, init_elasticsearch
+
+
+def _print_progress(stats: BulkIndexStats) -> None:
+    print(
+        f"  {stats['docs']:>10} док. за {stats['elapsed_s']:7.1f} сек. ({stats['docs_per_s']:8.0f} док/сек)",
+        flush=True,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.ELASTICSEARCH_BULK_WORKERS)
+    parser.add_argument("--chunk-docs", type=int, default=settings.ELASTICSEARCH_BULK_CHUNK_DOCS)
+    parser.add_argument("--chunk-bytes", type=int, default=settings.ELASTICSEARCH_BULK_CHUNK_BYTES)
+    parser.add_argument("--reindex", action="store_true", help="Собрать новый индекс и переключить на него алиас")
+    args = parser.parse_args()
+
+    configure_logger()
+    if not elasticsearch_enabled():
+        raise SystemExit("ELASTICSEARCH_URL не задан — индексировать некуда.")
+
+    settings.ELASTICSEARCH_BULK_WORKERS = args.workers
+    settings.ELASTICSEARCH_BULK_CHUNK_DOCS = args.chunk_docs
+    settings.ELASTICSEARCH_BULK_CHUNK_BYTES = args.chunk_bytes
+    print(f"Индексация: workers={args.workers} chunk_docs={args.chunk_docs} chunk_bytes={args.chunk_bytes}")
+
+    await init_elasticsearch()
+    started = time.perf_counter()
+    try:
+        async with sessionmanager.session() as session:
+            if args.reindex:
+                target = await reindex_books(session, on_progress=_print_progress, sync_engine=sessionmanager.engine)
+            else:
+                await index_all_books(session, on_progress=_print_progress)
+                target = settings.ELASTICSEARCH_INDEX
+    finally:
+        await close_elasticsearch()
+        await sessionmanager.close()
+
+    print(f"Готово: индекс {target}, всего {time.perf_counter() - started:.1f} сек.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""
+Blue/green-переиндексация книг в Elasticsearch без простоя поиска.
+
+Строит новый версионированный индекс (`<ELASTICSEARCH_INDEX>-<timestamp>`), загружает в него книги из БД
+и атомарно переключает на него алиас ELASTICSEARCH_INDEX. Старые индексы за алиасом удаляются
+(если не передан --keep-old).
+
+Запуск в контейнере приложения:
+    python /scripts/reindex_books.py
+"""
+
+import argparse
+import asyncio
+import logging
+
+from config.logger import configure_logger
+from infrastructure.db.db import sessionmanager
+from infrastructure.search.books_index import reindex_books
+from infrastructure.search.es_client import close_elasticsearch, elasticsearch_enabled, init_elasticsearch
+
+
+logger = logging.getLogger("reindex_books")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-old", action="store_true", help="Не удалять старые индексы после переключения алиаса")
+    args = parser.parse_args()
+
+    configure_logger()
+    if not elasticsearch_enabled():
+        raise SystemExit("ELASTICSEARCH_URL не задан — переиндексировать нечего.")
+
+    await init_elasticsearch()
+    try:
+        async with sessionmanager.session() as session:
+            new_index = await reindex_books(session, keep_old=args.keep_old, sync_engine=sessionmanager.engine)
+        logger.info("Готово: поиск работает по индексу %s", new_index)
+    finally:
+        await close_elasticsearch()
+        await sessionmanager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())